@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: `sessions <command>` startup (api/__main__.py + api/router.py)
+
+Runs the commands Claude and the protocols issue most often, each in a fresh
+interpreter against a throwaway project laid out like an install (hooks and
+api copied under sessions/, _version.py pinned). Reports the median wall
+time per command and which api command modules it loaded - with lazy
+routing, only the one it routes to (none for help).
+
+Usage:
+    python benchmarks/api_startup.py [--runs N]
+"""
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from pathlib import Path
+import argparse, os, shutil, statistics, subprocess, sys, tempfile, time
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+REPO_PYTHON = Path(__file__).resolve().parent.parent / "cc_sessions" / "python"
+
+COMMANDS = [
+    ["slash", "help"],
+    ["version"],
+    ["protocol", "startup-load"],
+    ["todos", "clear"],
+    ["state", "show"],
+    ["mode", "discussion"],
+    ["config", "show"],
+    ["tasks", "idx", "list"],
+]
+
+def make_project(root: Path) -> None:
+    (root / ".claude").mkdir()
+    for part in ("hooks", "api"):
+        shutil.copytree(REPO_PYTHON / part, root / "sessions" / part, ignore=shutil.ignore_patterns("__pycache__"))
+    (root / "sessions" / "hooks" / "_version.py").write_text("__version__ = '0.0.0'\n", encoding="utf-8")
+    (root / "sessions" / "tasks").mkdir()
+
+# `python -m sessions.api`, reporting sys.modules at exit (-X importtime misses importlib.import_module)
+LIST_MODULES = ("import atexit, runpy, sys; "
+                "atexit.register(lambda: sys.stderr.write('\\nMODULES ' + ' '.join(sys.modules) + '\\n')); "
+                "runpy.run_module('sessions.api', run_name='__main__', alter_sys=True)")
+#-#
+
+# ===== FUNCTIONS ===== #
+
+def run(root: Path, command, list_modules: bool = False) -> subprocess.CompletedProcess:
+    env = {**os.environ, "CLAUDE_PROJECT_DIR": str(root)}
+    argv = [sys.executable, *(["-c", LIST_MODULES] if list_modules else ["-m", "sessions.api"]), *command]
+    return subprocess.run(argv, capture_output=True, text=True, cwd=root, env=env, timeout=60)
+
+def api_modules(stderr: str):
+    """api.*_commands modules loaded by the end of the run."""
+    names = next((line.split()[1:] for line in stderr.splitlines() if line.startswith("MODULES ")), [])
+    return sorted({name.rsplit(".", 1)[1] for name in names if name.startswith(("api.", "sessions.api.")) and name.endswith("_commands")})
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=9)
+    args = parser.parse_args()
+
+    print(f"{'command':<24} {'median ms':>10}  command modules imported")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        make_project(root)
+        for command in COMMANDS:
+            run(root, command)  # Warm-up: state/config files and __pycache__
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                run(root, command)
+                times.append(time.perf_counter() - start)
+            modules = api_modules(run(root, command, list_modules=True).stderr)
+            print(f"{' '.join(command):<24} {statistics.median(times) * 1000:>10.1f}  {', '.join(modules) or '-'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hook cold-start import time (python -X importtime)
+
+Runs every hook as Claude Code would - a fresh interpreter per call, no hook
+daemon - inside a throwaway project laid out like an install (hooks copied
+to sessions/hooks, _version.py pinned, update check already cached). The
+import time of each hook is the summed cumulative time of its top-level
+imports, minus what a bare `python -c pass` imports anyway.
+
+Absolute milliseconds depend on the machine and its load, so every hook run
+is paired with a run that imports only the stdlib modules shared_state needs
+(REFERENCE_IMPORTS). The median of --runs hook/reference ratios (after a
+warm-up that fills __pycache__) is compared against the hook's budget.
+
+Fails (exit 1) when a hook goes over budget or imports a module that should
+stay off the hook path (BANNED_IMPORTS) - e.g. importlib.metadata, which
+scans site-packages.
+
+Usage:
+    python benchmarks/hook_importtime.py [--runs N] [--scale FACTOR] [--verbose]
+        --scale multiplies every budget
+"""
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from pathlib import Path
+import argparse, json, os, shutil, statistics, subprocess, sys, tempfile
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+REPO_HOOKS = Path(__file__).resolve().parent.parent / "cc_sessions" / "python" / "hooks"
+
+# The stdlib floor of every hook, imported on its own in the same run as the yardstick
+REFERENCE_IMPORTS = ("json", "pathlib", "typing", "dataclasses", "enum", "contextlib", "functools")
+
+# hook: (stdin payload, import budget as a multiple of the reference) - the hooks measure 1.65-1.85x,
+# the old eager imports 2.55-2.8x; 2.2x leaves room for noise and still catches that regression
+HOOK_BUDGETS = {
+    "sessions_enforce": ({"tool_name": "Read", "tool_input": {"file_path": "README.md"}}, 2.2),
+    "post_tool_use": ({"tool_name": "Read", "tool_input": {"file_path": "README.md"}}, 2.2),
+    "user_messages": ({"prompt": "hello"}, 2.2),
+    "subagent_hooks": ({"tool_name": "Read", "tool_input": {}}, 2.2),
+    "session_start": ({}, 2.2),
+}
+
+# Never needed to answer a hook call
+BANNED_IMPORTS = {"importlib.metadata", "tempfile", "requests", "email", "zipfile", "platform", "subprocess"}
+#-#
+
+# ===== FUNCTIONS ===== #
+
+def parse_importtime(stderr: str):
+    """{top-level module: cumulative µs} and the set of every module imported."""
+    top, seen = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip() == "cumulative": continue
+        seen.add(name.strip())
+        if not name.startswith("  "): top[name.strip()] = int(cumulative)
+    return top, seen
+
+def make_project(root: Path) -> None:
+    """Mirror what the installer leaves behind, minus everything the hooks don't read."""
+    (root / ".claude").mkdir()
+    shutil.copytree(REPO_HOOKS, root / "sessions" / "hooks", ignore=shutil.ignore_patterns("__pycache__"))
+    (root / "sessions" / "hooks" / "_version.py").write_text("__version__ = '0.0.0'\n", encoding="utf-8")
+    (root / "README.md").write_text("benchmark\n", encoding="utf-8")
+    # Let one hook call write the default state and config, then cache the update flag so session_start stays off the network
+    run_hook(root, "sessions_enforce", HOOK_BUDGETS["sessions_enforce"][0])
+    state_file = root / "sessions" / "sessions-state.json"
+    state = json.loads(state_file.read_text(encoding="utf-8"))
+    state.setdefault("metadata", {})["update_available"] = False
+    state_file.write_text(json.dumps(state), encoding="utf-8")
+
+def run_hook(root: Path, hook: str, payload) -> subprocess.CompletedProcess:
+    env = {**os.environ, "CLAUDE_PROJECT_DIR": str(root)}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Installed hooks run from their __pycache__
+    return subprocess.run([sys.executable, "-X", "importtime", str(root / "sessions" / "hooks" / f"{hook}.py")],
+                          input=json.dumps(payload), capture_output=True, text=True, cwd=root, env=env, timeout=60)
+
+def import_ms(top, baseline) -> float:
+    """Summed cumulative ms of the top-level imports a bare interpreter doesn't already make."""
+    return sum(us for name, us in top.items() if name not in baseline) / 1000
+
+def reference_ms(baseline) -> float:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(REFERENCE_IMPORTS)}"],
+                          capture_output=True, text=True, timeout=60)
+    return import_ms(parse_importtime(proc.stderr)[0], baseline)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--verbose", action="store_true", help="list each hook's slowest top-level imports")
+    args = parser.parse_args()
+
+    baseline = parse_importtime(subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True).stderr)[1]
+    failures = 0
+    print(f"{'hook':<18} {'median ms':>10} {'ref ms':>8} {'ratio':>6} {'budget':>7}  result")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        make_project(root)
+        for hook, (payload, budget) in HOOK_BUDGETS.items():
+            budget *= args.scale
+            try: compile((REPO_HOOKS / f"{hook}.py").read_text(encoding="utf-8"), hook, "exec")
+            except SyntaxError as e:
+                print(f"{hook:<18} {'-':>10} {'-':>8} {'-':>6} {budget:>7.2f}  skipped (does not compile on Python {sys.version.split()[0]}: line {e.lineno})")
+                continue
+
+            run_hook(root, hook, payload)  # Warm-up: writes this hook's bytecode cache
+            totals, references, ratios, banned, slowest = [], [], [], set(), {}
+            for _ in range(args.runs):
+                # Back to back, so both runs see the same machine load
+                reference = reference_ms(baseline)
+                proc = run_hook(root, hook, payload)
+                if proc.returncode not in (0, 2):
+                    tail = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")][-1:]
+                    print(f"{hook:<18} {'-':>10} {'-':>8} {'-':>6} {budget:>7.2f}  FAILED (exit {proc.returncode}: {' '.join(tail)})")
+                    break
+                top, seen = parse_importtime(proc.stderr)
+                total = import_ms(top, baseline)
+                totals.append(total); references.append(reference); ratios.append(total / reference)
+                banned |= (seen - baseline) & BANNED_IMPORTS
+                for name, us in top.items():
+                    if name not in baseline: slowest[name] = max(slowest.get(name, 0), us)
+            else:
+                ratio = statistics.median(ratios)
+                problems = ([f"over budget by {ratio - budget:.2f}x"] if ratio > budget else []) + \
+                           ([f"imports {', '.join(sorted(banned))}"] if banned else [])
+                print(f"{hook:<18} {statistics.median(totals):>10.1f} {statistics.median(references):>8.1f} {ratio:>6.2f} {budget:>7.2f}  "
+                      f"{'FAILED (' + '; '.join(problems) + ')' if problems else 'ok'}")
+                if args.verbose:
+                    for name, us in sorted(slowest.items(), key=lambda item: -item[1])[:6]: print(f"{'':<20}{us / 1000:>8.1f}  {name}")
+                if problems: failures += 1
+                continue
+            failures += 1
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
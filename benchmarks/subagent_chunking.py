@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: subagent transcript chunking (hooks/subagent_hooks.py)
+
+Compares the original in-memory chunker (whole transcript loaded, one giant
+json.dumps string walked char by char) against the streaming pipeline in
+hooks/transcripts.py. Each run happens in a fresh subprocess so peak RSS is
+measured per implementation. Chunk output of both is compared byte for byte.
+
+Usage:
+    python benchmarks/subagent_chunking.py [SIZE_MB ...]   (default: 10 100 500)
+"""
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from pathlib import Path
+import hashlib, json, os, random, subprocess, sys, tempfile, time
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+REPO_HOOKS = Path(__file__).resolve().parent.parent / "cc_sessions" / "python" / "hooks"
+MAX_BYTES = 24000
+#-#
+
+# ===== FUNCTIONS ===== #
+
+def make_transcript(path: Path, size_mb: int) -> None:
+    """Synthetic Claude Code transcript: pre-work chatter, one Edit call, then mixed traffic ending in a Task call."""
+    rng = random.Random(size_mb)
+    words = ["alpha", "beta", "gamma", "déjà", "naïve", "日本語", "emoji😀", "path/to/file.py", "\n", "    "]
+    def text(n): return " ".join(rng.choice(words) for _ in range(n))
+    def line(kind, content): return json.dumps({"type": kind, "timestamp": "2025-01-01T00:00:00Z", "message": {"role": kind, "content": content}}, ensure_ascii=False) + "\n"
+
+    target = size_mb * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(line("user", text(50)))
+        f.write(line("assistant", [{"type": "tool_use", "name": "Edit", "input": {"file_path": "x.py"}}]))
+        written = 0
+        while written < target:
+            if rng.random() < 0.5: entry = line("user", [{"type": "tool_result", "content": text(rng.randint(20, 4000))}])
+            else: entry = line("assistant", [{"type": "text", "text": text(rng.randint(5, 400))}])
+            f.write(entry); written += len(entry.encode("utf-8"))
+        f.write(line("assistant", [{"type": "tool_use", "name": "Task", "input": {"subagent_type": "logging"}}]))
+
+OLD_IMPL = r'''
+import json, sys
+from collections import deque
+transcript_path, out_dir, MAX_BYTES = sys.argv[1], sys.argv[2], int(sys.argv[3])
+with open(transcript_path, 'r', encoding='utf-8', errors='backslashreplace') as f: transcript = [json.loads(line) for line in f]
+transcript = deque(transcript)
+start_found = False
+while not start_found and transcript:
+    entry = transcript.popleft()
+    message = entry.get('message')
+    if message:
+        content = message.get('content')
+        if isinstance(content, list):
+            for block in content:
+                if block.get('type') == 'tool_use' and block.get('name') in ['Edit', 'MultiEdit', 'Write']: start_found = True
+clean_transcript = deque()
+for entry in transcript:
+    message = entry.get('message')
+    if message and entry.get('type') in ['user', 'assistant']:
+        clean_transcript.append({'role': message.get('role'), 'content': message.get('content')})
+clean_transcript_text = json.dumps(list(clean_transcript), indent=2, ensure_ascii=False)
+chunks = []; buf_chars = []; buf_bytes = 0; last_newline_idx = None; last_space_idx = None
+for ch in clean_transcript_text:
+    ch_b = len(ch.encode("utf-8"))
+    if buf_bytes + ch_b > MAX_BYTES:
+        cut_idx = None
+        if last_newline_idx is not None: cut_idx = last_newline_idx
+        elif last_space_idx is not None: cut_idx = last_space_idx
+        if cut_idx is not None and cut_idx > 0:
+            chunks.append("".join(buf_chars[:cut_idx])); buf_chars = buf_chars[cut_idx:]
+            buf_bytes = sum(len(c.encode("utf-8")) for c in buf_chars)
+        else:
+            if buf_chars: chunks.append("".join(buf_chars))
+            buf_chars = []; buf_bytes = 0
+        last_newline_idx = None; last_space_idx = None
+    buf_chars.append(ch); buf_bytes += ch_b
+    if ch == "\n": last_newline_idx = len(buf_chars); last_space_idx = None
+    elif ch == " " and last_newline_idx is None: last_space_idx = len(buf_chars)
+if buf_chars: chunks.append("".join(buf_chars))
+for idx, chunk in enumerate(chunks, start=1):
+    with open(f"{out_dir}/current_transcript_{idx:03d}.txt", 'w', encoding='utf-8', newline="\n") as f: f.write(chunk)
+'''
+
+NEW_IMPL = r'''
+import sys
+sys.path.insert(0, sys.argv[4])
+from transcripts import iter_entries, iter_json_array, iter_chunks
+transcript_path, out_dir, MAX_BYTES = sys.argv[1], sys.argv[2], int(sys.argv[3])
+def iter_work_entries(entries):
+    entries = iter(entries)
+    for entry in entries:
+        message = entry.get('message')
+        if not message: continue
+        content = message.get('content')
+        if isinstance(content, list) and any(b.get('type') == 'tool_use' and b.get('name') in ['Edit', 'MultiEdit', 'Write'] for b in content): break
+    for entry in entries:
+        message = entry.get('message')
+        if message and entry.get('type') in ['user', 'assistant']: yield {'role': message.get('role'), 'content': message.get('content')}
+for idx, chunk in enumerate(iter_chunks(iter_json_array(iter_work_entries(iter_entries(transcript_path))), MAX_BYTES), start=1):
+    with open(f"{out_dir}/current_transcript_{idx:03d}.txt", 'wb') as f: f.write(chunk)
+'''
+
+def run(impl: str, transcript: Path, out_dir: Path):
+    """Run one implementation in a child process. Returns (wall seconds, peak RSS MB)."""
+    out_dir.mkdir()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", impl, str(transcript), str(out_dir), str(MAX_BYTES), str(REPO_HOOKS)])
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    if status != 0: raise RuntimeError(f"benchmark child failed with status {status}")
+    return wall, usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def digest(out_dir: Path) -> str:
+    h = hashlib.sha256()
+    for p in sorted(out_dir.iterdir()): h.update(p.name.encode()); h.update(p.read_bytes())
+    return h.hexdigest()
+
+def main(sizes):
+    print(f"{'size':>7} {'impl':>9} {'wall s':>8} {'peak RSS MB':>12} {'chunks':>7}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            transcript = tmp / "transcript.jsonl"
+            make_transcript(transcript, size)
+            results = {}
+            for name, impl in (("streaming", NEW_IMPL), ("original", OLD_IMPL)):
+                out = tmp / name
+                wall, rss = run(impl, transcript, out)
+                results[name] = digest(out)
+                print(f"{size:>5}MB {name:>9} {wall:>8.2f} {rss:>12.1f} {len(list(out.iterdir())):>7}")
+            print(f"{'':>7} identical output: {results['streaming'] == results['original']}")
+
+#-#
+
+# ===== EXECUTION ===== #
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10, 100, 500])
+
+#-#
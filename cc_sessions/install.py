@@ -3,9 +3,9 @@
 # ===== IMPORTS ===== #
 
 ## ===== STDLIB ===== ##
-import shutil, json, sys, os, subprocess, tempfile, contextlib, re, io, builtins
+import shutil, json, sys, os, subprocess, tempfile, contextlib, re, io, builtins, marshal, statistics
 from pathlib import Path
-from time import sleep
+from time import sleep, perf_counter
 ##-##
 
 ## ===== 3RD-PARTY ===== ##
@@ -549,6 +549,15 @@ def copy_file(src, dest):
             # Ignore chmod errors
             pass
 
+def write_version_file(hooks_dir):
+    """Pin the installed version next to the hooks so they never have to scan package metadata for it."""
+    from importlib.metadata import version, PackageNotFoundError
+    try: pkg_version = version('cc-sessions')
+    except PackageNotFoundError:
+        (hooks_dir / '_version.py').unlink(missing_ok=True)  # Don't leave a previous install's pin behind
+        return
+    (hooks_dir / '_version.py').write_text(f'# Generated by the cc-sessions installer\n__version__ = {pkg_version!r}\n', encoding='utf-8')
+
 def copy_directory(src, dest):
     if not src.exists():
         return
@@ -1146,6 +1155,7 @@ def copy_files(script_dir, project_root):
 
     # Copy hooks
     copy_directory(py_root / 'hooks', project_root / 'sessions' / 'hooks')
+    write_version_file(project_root / 'sessions' / 'hooks')
 
     # Copy protocols from shared directory
     copy_directory(script_dir / 'protocols', project_root / 'sessions' / 'protocols')
@@ -1165,6 +1175,148 @@ def copy_files(script_dir, project_root):
     copy_file(templates_dir / 'INDEX_TEMPLATE.md', project_root / 'sessions' / 'tasks' / 'indexes' / 'INDEX_TEMPLATE.md')
 #!<
 
+#!> Hook launchers
+# Hooks registered in settings.json (session_start replaces kickstart_session_start after onboarding)
+HOOK_SCRIPTS = ['user_messages', 'sessions_enforce', 'subagent_hooks', 'post_tool_use', 'kickstart_session_start', 'session_start']
+# Any sessions hook command, old (sessions/hooks/<name>.py) or launcher (sessions/hooks/launch/<name>.py)
+HOOK_COMMAND = re.compile(r'sessions[/\\]+hooks[/\\]+(?:launch[/\\]+)?(\w+)\.py')
+# Interpreter flag sets tried for the launchers, cheapest-looking last; the fastest usable one wins
+HOOK_FLAG_CANDIDATES = [[], ['-s'], ['-I'], ['-I', '-S']]
+# Imported by hooks when available - a flag set that hides one of these (e.g. -S hiding site-packages) is unusable
+HOOK_OPTIONAL_IMPORTS = ['requests']
+
+# settings.json only ever says `python` (it is shared); the stub moves onto the interpreter pinned at install
+# time, with its flags, and stays on whatever `python` started it when that interpreter isn't on this machine
+LAUNCHER_STUB = '''# Generated by the cc-sessions installer: runs sessions/hooks/{name}.py from its compiled bytecode
+import os, sys
+PYTHON, FLAGS = {python!r}, {flags!r}
+if os.environ.pop('CC_SESSIONS_LAUNCHED', None) is None and os.path.abspath(sys.executable) != PYTHON and os.path.isfile(PYTHON):
+    os.environ['CC_SESSIONS_LAUNCHED'] = '1'
+    if os.name == 'nt':
+        import subprocess
+        sys.exit(subprocess.call([PYTHON, *FLAGS, __file__, *sys.argv[1:]]))
+    os.execv(PYTHON, [PYTHON, *FLAGS, __file__, *sys.argv[1:]])
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import {name}
+'''
+
+def hook_interpreter() -> str:
+    """The interpreter hooks are pinned to: the one running the installer, so packages from its venv (requests) stay importable."""
+    return os.path.abspath(sys.executable)
+
+def _startup_time(python, flags, runs=7):
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run([python, *flags, '-c', 'pass'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(perf_counter() - start)
+    return statistics.median(times)
+
+def _importable(python, flags):
+    probe = 'import importlib.util as u, sys; print(",".join(m for m in sys.argv[1:] if u.find_spec(m)))'
+    result = subprocess.run([python, *flags, '-c', probe, *HOOK_OPTIONAL_IMPORTS], capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def choose_hook_flags(python):
+    """
+    Time interpreter startup under every HOOK_FLAG_CANDIDATES entry and pick the fastest one
+    that still sees the same optional modules as a plain interpreter.
+
+    Returns:
+        (flags, {' '.join(flags) or 'default': seconds})
+    """
+    expected = _importable(python, [])
+    timings = {}
+    for flags in HOOK_FLAG_CANDIDATES:
+        if _importable(python, flags) != expected: continue
+        timings[' '.join(flags) or 'default'] = _startup_time(python, flags)
+    best = min(timings, key=timings.get)
+    return ([] if best == 'default' else best.split()), timings
+
+def compile_hooks(python, hooks_dir):
+    """Precompile the hooks with the interpreter that will run them (bytecode is per Python version)."""
+    result = subprocess.run([python, '-m', 'compileall', '-q', str(hooks_dir)], capture_output=True, text=True)
+    return result.returncode == 0
+
+def _compile_time(path):
+    source = path.read_text(encoding='utf-8')
+    start = perf_counter()
+    try: compile(source, str(path), 'exec')
+    except SyntaxError: return None
+    return perf_counter() - start
+
+def _load_time(path):
+    import importlib.util
+    try: data = Path(importlib.util.cache_from_source(str(path))).read_bytes()
+    except (OSError, NotImplementedError): return None
+    start = perf_counter()
+    try: marshal.loads(data[16:])
+    except (EOFError, ValueError, TypeError): return None
+    return perf_counter() - start
+
+def hook_command(name, launcher=None):
+    """settings.json command for a hook - through its launcher when one was installed, always on plain `python`."""
+    if sys.platform == 'win32':
+        script = f'launch\\{name}' if launcher else name
+        return f'python "%CLAUDE_PROJECT_DIR%\\sessions\\hooks\\{script}.py"'
+    script = f'launch/{name}' if launcher else name
+    return f'python $CLAUDE_PROJECT_DIR/sessions/hooks/{script}.py'
+
+def install_hook_launchers(project_root):
+    """
+    Precompile sessions/hooks and write a launcher stub per hook into sessions/hooks/launch.
+
+    A hook run as `python hook.py` is compiled from source on every call (only imported
+    modules get a __pycache__ entry); the stub imports it instead. Each stub re-executes on
+    the interpreter running this install, with the startup flags that measured fastest here,
+    unless that is already the `python` on PATH or isn't installed (see LAUNCHER_STUB).
+
+    Returns:
+        {python, flags, timings, report: {hook: (before s, after s)}}, or None to keep plain `python hook.py` commands
+    """
+    print(color('Precompiling hooks...', Colors.CYAN))
+    hooks_dir = project_root / 'sessions' / 'hooks'
+    python = hook_interpreter()
+    try:
+        flags, timings = choose_hook_flags(python)
+        available = (_importable(python, flags) or '').split(',')
+        missing = [module for module in HOOK_OPTIONAL_IMPORTS if module not in available]
+        if missing:
+            print(color(f'   ⚠️  {python} cannot import {", ".join(missing)} - the session start update check stays off until it is installed there', Colors.YELLOW))
+        if not compile_hooks(python, hooks_dir):
+            print(color('   ⚠️  Some hooks could not be precompiled (they will compile on first use)', Colors.YELLOW))
+        launch_dir = hooks_dir / 'launch'
+        launch_dir.mkdir(parents=True, exist_ok=True)
+        for name in HOOK_SCRIPTS:
+            (launch_dir / f'{name}.py').write_text(LAUNCHER_STUB.format(name=name, python=python, flags=flags), encoding='utf-8')
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(color(f'   ⚠️  Could not set up hook launchers ({e}), hooks will run from source', Colors.YELLOW))
+        return None
+
+    # Per hook: interpreter startup + compiling the script, against startup + loading its bytecode, plus the
+    # stub's re-exec onto the pinned interpreter (with the chosen flags) when `python` on PATH is another one
+    on_path = shutil.which('python')
+    reexec = not on_path or os.path.abspath(on_path) != python
+    startup = timings['default'] + (timings[' '.join(flags) or 'default'] if reexec else 0)
+    report = {}
+    for name in HOOK_SCRIPTS:
+        path = hooks_dir / f'{name}.py'
+        if not path.exists(): continue
+        compiled, loaded = _compile_time(path), _load_time(path)
+        if compiled is None or loaded is None: continue
+        report[name] = (timings['default'] + compiled, startup + loaded)
+    return {'python': python, 'flags': flags, 'timings': timings, 'reexec': reexec, 'report': report}
+
+def print_hook_startup_report(launcher):
+    if not launcher or not launcher['report']: return
+    flags = ' '.join(launcher['flags']) or 'no flags'
+    via = ', re-executed from `python` on PATH' if launcher['reexec'] else ''
+    print(color(f'Hook startup (launchers on {launcher["python"]}, {flags}{via}):', Colors.BOLD))
+    for name, (before, after) in launcher['report'].items():
+        print(f'  {name:<24} {before * 1000:6.1f} ms → {after * 1000:6.1f} ms  ({(before - after) * 1000:.1f} ms saved)')
+    print()
+#!<
+
 #!> v0.2.6/v0.2.7 Migration Functions
 # Detection patterns for v0.2.6 and v0.2.7 installations (identical versions)
 V026_PATTERNS = {
@@ -1851,21 +2003,19 @@ def get_settings(project_root: Path) -> dict:
             print(color(f'⚠️  Error reading settings.json: {e}', Colors.YELLOW))
     return settings
 
-def configure_settings(project_root: Path):
+def configure_settings(project_root: Path, launcher=None):
     print(color('Configuring Claude Code hooks...', Colors.CYAN))
 
     settings = get_settings(project_root)
 
     # Define sessions hooks
-    is_windows = sys.platform == 'win32'
     sessions_hooks = {
         'UserPromptSubmit': [
             {
                 'hooks': [
                     {
                         'type': 'command',
-                        'command': 'python "%CLAUDE_PROJECT_DIR%\\sessions\\hooks\\user_messages.py"' if is_windows
-                                 else 'python $CLAUDE_PROJECT_DIR/sessions/hooks/user_messages.py'
+                        'command': hook_command('user_messages', launcher)
                     }
                 ]
             }
@@ -1876,8 +2026,7 @@ def configure_settings(project_root: Path):
                 'hooks': [
                     {
                         'type': 'command',
-                        'command': 'python "%CLAUDE_PROJECT_DIR%\\sessions\\hooks\\sessions_enforce.py"' if is_windows
-                                 else 'python $CLAUDE_PROJECT_DIR/sessions/hooks/sessions_enforce.py'
+                        'command': hook_command('sessions_enforce', launcher)
                     }
                 ]
             },
@@ -1886,8 +2035,7 @@ def configure_settings(project_root: Path):
                 'hooks': [
                     {
                         'type': 'command',
-                        'command': 'python "%CLAUDE_PROJECT_DIR%\\sessions\\hooks\\subagent_hooks.py"' if is_windows
-                                 else 'python $CLAUDE_PROJECT_DIR/sessions/hooks/subagent_hooks.py'
+                        'command': hook_command('subagent_hooks', launcher)
                     }
                 ]
             }
@@ -1897,8 +2045,7 @@ def configure_settings(project_root: Path):
                 'hooks': [
                     {
                         'type': 'command',
-                        'command': 'python "%CLAUDE_PROJECT_DIR%\\sessions\\hooks\\post_tool_use.py"' if is_windows
-                                 else 'python $CLAUDE_PROJECT_DIR/sessions/hooks/post_tool_use.py'
+                        'command': hook_command('post_tool_use', launcher)
                     }
                 ]
             }
@@ -1909,8 +2056,7 @@ def configure_settings(project_root: Path):
                 'hooks': [
                     {
                         'type': 'command',
-                        'command': 'python "%CLAUDE_PROJECT_DIR%\\sessions\\hooks\\kickstart_session_start.py"' if is_windows
-                                 else 'python $CLAUDE_PROJECT_DIR/sessions/hooks/kickstart_session_start.py'
+                        'command': hook_command('kickstart_session_start', launcher)
                     }
                 ]
             }
@@ -1921,6 +2067,13 @@ def configure_settings(project_root: Path):
     if 'hooks' not in settings or not isinstance(settings['hooks'], dict):
         settings['hooks'] = {}
 
+    # Point commands from a previous install (plain scripts or older launchers) at this install's
+    for existing_cfgs in settings['hooks'].values():
+        for existing_cfg in existing_cfgs if isinstance(existing_cfgs, list) else []:
+            for existing_hook in existing_cfg.get('hooks', []) if isinstance(existing_cfg, dict) else []:
+                match = HOOK_COMMAND.search(existing_hook.get('command', '') if isinstance(existing_hook, dict) else '')
+                if match and match.group(1) in HOOK_SCRIPTS: existing_hook['command'] = hook_command(match.group(1), launcher)
+
     def find_hook_in_settings(hook_type: str, hook_block: dict) -> bool:
         """Return True if any command in hook_block already exists under hook_type."""
         for existing_cfg in settings['hooks'].get(hook_type, []) or []:
@@ -1988,26 +2141,31 @@ def configure_gitignore(project_root):
     print(color('Configuring .gitignore...', Colors.CYAN))
 
     gitignore_path = project_root / '.gitignore'
-    gitignore_entries = [
-        '',
-        '# cc-sessions runtime files',
+    runtime_entries = [
         'sessions/sessions-state.json',
+        'sessions/sessions-state.flock',
+        'sessions/sessions-state.pending.jsonl',
         'sessions/transcripts/',
         'sessions/.archived/',
-        ''
+        'sessions/.hookd.*',
+        'sessions/.cache/',
+        'sessions/tasks/.index.json',
     ]
 
     if gitignore_path.exists():
         content = gitignore_path.read_text(encoding='utf-8')
-
-        # Only add if not already present
-        if 'sessions/sessions-state.json' not in content:
-            # Append to end of file
-            content += '\n'.join(gitignore_entries)
+        existing = {line.strip() for line in content.splitlines()}
+
+        # Only add entries that are not already present (upgrades pick up new runtime files)
+        missing = [entry for entry in runtime_entries if entry not in existing]
+        if missing:
+            header = [] if 'sessions/sessions-state.json' in existing else ['', '# cc-sessions runtime files']
+            if content and not content.endswith('\n'): content += '\n'
+            content += '\n'.join(header + missing + [''])
             gitignore_path.write_text(content, encoding='utf-8')
     else:
         # Create new .gitignore with our entries
-        gitignore_path.write_text('\n'.join(gitignore_entries), encoding='utf-8')
+        gitignore_path.write_text('\n'.join(['', '# cc-sessions runtime files'] + runtime_entries + ['']), encoding='utf-8')
 #!<
 
 #!> Setup shared state and initialize config/state
@@ -2149,6 +2307,7 @@ def kickstart_cleanup(project_root):
         py_hook.unlink()
         info_lines.append(color('✓ Deleted kickstart_session_start.py', Colors.GREEN))
         set_info(info_lines)
+    (sessions_dir / 'hooks' / 'launch' / 'kickstart_session_start.py').unlink(missing_ok=True)
 
     # 2. Delete kickstart protocols directory
     protocols_dir = sessions_dir / 'protocols' / 'kickstart'
@@ -3084,7 +3243,8 @@ def main():
         # Phase: install files
         create_directory_structure(PROJECT_ROOT)
         copy_files(SCRIPT_DIR, PROJECT_ROOT)
-        configure_settings(PROJECT_ROOT)
+        launcher = install_hook_launchers(PROJECT_ROOT)
+        configure_settings(PROJECT_ROOT, launcher)
         configure_claude_md(PROJECT_ROOT)
         configure_gitignore(PROJECT_ROOT)
 
@@ -3111,6 +3271,7 @@ def main():
 
         # Output final message
         print(color('\n✅ cc-sessions installed successfully!\n', Colors.GREEN))
+        print_hook_startup_report(launcher)
 
         # Show v0.2.6/v0.2.7 archive message if applicable
         if v026_archive_info.get('archived'):
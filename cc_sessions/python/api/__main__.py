@@ -5,8 +5,12 @@
 ## ===== STDLIB ===== ##
 import sys
 import json
+import shlex
 import argparse
+from io import StringIO
+from contextlib import redirect_stdout
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, TextIO
 ##-##
 
 ## ===== 3RD-PARTY ===== ##
@@ -15,13 +19,14 @@ from pathlib import Path
 ## ===== LOCAL ===== ##
 # Add parent directory to path for imports (sessions directory)
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from hooks.shared_state import load_state, load_config, edit_state, edit_config, Mode
 from api.router import route_command
 ##-##
 
 #-#
 
 # ===== GLOBALS ===== #
+# Commands that only touch sessions-state.json / sessions-config.json - consecutive ones share one transaction in a batch
+TRANSACTIONAL_COMMANDS = {'state', 'mode', 'flags', 'status', 'version', 'todos', 'config', 'protocol', 'tasks'}
 #-#
 
 # ===== DECLARATIONS ===== #
@@ -32,6 +37,65 @@ from api.router import route_command
 
 # ===== FUNCTIONS ===== #
 
+## ===== BATCH ===== ##
+def parse_batch(text: str) -> List[List[str]]:
+    """
+    Commands for `sessions batch`: a JSON array (of command strings or argument lists) or one
+    command per line (blank lines and # comments skipped). A leading `sessions` is dropped.
+    """
+    if text.lstrip().startswith('['):
+        commands = []
+        for i, entry in enumerate(json.loads(text)):
+            if isinstance(entry, str): commands.append(shlex.split(entry))
+            elif isinstance(entry, list) and all(isinstance(arg, (str, int, float)) for arg in entry): commands.append([str(arg) for arg in entry])
+            else: raise ValueError(f"entry {i} ({json.dumps(entry)}) is not a command string or a list of arguments")
+    else:
+        commands = [shlex.split(line, comments=True) for line in text.splitlines()]
+    return [argv[1:] if argv[:1] == ['sessions'] else argv for argv in commands if argv and argv != ['sessions']]
+
+def _run_one(argv: List[str]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"command": argv}
+    args = [arg for arg in argv[1:] if arg not in ('--json', '--from-slash')]
+    captured = StringIO()
+    try:
+        if argv[0] == 'batch': raise ValueError("batch cannot be nested")
+        with redirect_stdout(captured): record["result"] = route_command(argv[0], args, json_output=True)
+    except Exception as e: record["error"] = str(e)
+    except SystemExit as e: record["error"] = f"exited with status {e.code}"
+    if captured.getvalue(): record["output"] = captured.getvalue()
+    return record
+
+def run_batch(commands: List[List[str]]) -> Iterator[Dict[str, Any]]:
+    """
+    Run commands in order in this process, yielding one result record per command.
+
+    Consecutive TRANSACTIONAL_COMMANDS run inside one shared_state.transaction(): a single
+    lock cycle, state/config loaded once and written once. A command that fails inside the
+    group has its own edits rolled back; the others still commit.
+    """
+    from hooks.shared_state import transaction
+    i = 0
+    while i < len(commands):
+        if commands[i][0] not in TRANSACTIONAL_COMMANDS:
+            yield _run_one(commands[i])
+            i += 1
+            continue
+        end = i
+        while end < len(commands) and commands[end][0] in TRANSACTIONAL_COMMANDS: end += 1
+        # Records are held back until the group commits, so nothing is reported that was not written
+        with transaction(): records = [_run_one(argv) for argv in commands[i:end]]
+        yield from records
+        i = end
+
+def handle_batch(stream: TextIO) -> int:
+    """`sessions batch`: commands from stdin, NDJSON results (in order) on stdout. Exit status 1 if any failed."""
+    failed = False
+    for record in run_batch(parse_batch(stream.read())):
+        failed = failed or "error" in record
+        print(json.dumps(record), flush=True)
+    return 1 if failed else 0
+##-##
+
 def main():
     """Main entry point for sessions.api commands."""
     parser = argparse.ArgumentParser(
@@ -39,13 +103,19 @@ def main():
         usage="sessions <command> [<subcommand>] [args] [--json]"
     )
     
-    parser.add_argument('command', help='Main command (state, config, mode, flags, status, version)')
+    parser.add_argument('command', help='Main command (state, config, mode, flags, status, version, batch)')
     parser.add_argument('args', nargs='*', help='Command arguments')
     parser.add_argument('--json', action='store_true', help='Output in JSON format')
     parser.add_argument('--from-slash', action='store_true', help='Indicates call from slash command')
 
     args = parser.parse_args()
 
+    if args.command == 'batch':
+        try: sys.exit(handle_batch(sys.stdin))
+        except ValueError as e:
+            print(json.dumps({"error": f"Could not parse batch: {e}"}))
+            sys.exit(1)
+
     try:
         result = route_command(args.command, args.args, json_output=args.json, from_slash=args.from_slash)
         if result is not None:
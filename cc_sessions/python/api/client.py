@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, List, Optional, Tuple, Union
+from pathlib import Path
+import os, sys
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+# shared_state picks its project root when first imported, so it is imported in SessionsClient.__init__
+if TYPE_CHECKING:
+    from hooks.shared_state import (SessionsState, SessionsConfig, TaskState, SessionsTodos, SessionsFlags, SessionsProtocol, Mode,
+                                    TriggerPhrases, GitPreferences, SessionsEnv, BlockingPatterns, EnabledFeatures)
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+# sessions/ (hooks and api side by side) - the same import root api/__main__.py uses
+SESSIONS_PACKAGE_DIR = Path(__file__).resolve().parent.parent
+if str(SESSIONS_PACKAGE_DIR) not in sys.path: sys.path.insert(0, str(SESSIONS_PACKAGE_DIR))
+#-#
+
+"""
+╔═════════════════════════════════════════════════════╗
+║     ██╗ █████╗██╗     ██████╗██████╗██╗  ██╗██████╗ ║
+║    ██╔╝██╔═══╝██║     ╚═██╔═╝██╔═══╝███╗ ██║╚═██╔═╝ ║
+║   ██╔╝ ██║    ██║       ██║  █████╗ ████╗██║  ██║   ║
+║  ██╔╝  ██║    ██║       ██║  ██╔══╝ ██╔████║  ██║   ║
+║ ██╔╝   ╚█████╗███████╗██████╗██████╗██║╚███║  ██║   ║
+║ ╚═╝     ╚════╝╚══════╝╚═════╝╚═════╝╚═╝ ╚══╝  ╚═╝   ║
+╚═════════════════════════════════════════════════════╝
+In-process client for the sessions API
+
+For tools that would otherwise spawn `sessions/bin/sessions ... --json` per query:
+
+    sys.path.insert(0, "<project>/sessions")
+    from api.client import SessionsClient
+
+    client = SessionsClient("<project>")
+    client.mode(), client.current_task().name, client.features().branch_enforcement
+    client.run("config", "read", "add", "pytest")   # same handlers and output as the CLI's --json
+
+State and config are parsed once and reused while their file's (mtime, size) is
+unchanged, so a query costs one stat.
+"""
+
+# ===== CLASSES ===== #
+
+class SessionsClient:
+    """
+    Typed, cached access to one project's sessions state, config and tasks.
+
+    Returned objects are shared snapshots - treat them as read-only and change things
+    through run() (or shared_state's edit_state()/edit_config()), which is what the CLI does.
+
+    shared_state keeps its paths in module globals, so a process serves a single project:
+    the first client binds it (setting CLAUDE_PROJECT_DIR if it isn't imported yet) and a
+    client for any other root raises ValueError.
+    """
+
+    def __init__(self, project_root: Optional[Union[str, Path]] = None):
+        root = Path(project_root).resolve() if project_root is not None else None
+        if root is not None and 'hooks.shared_state' not in sys.modules: os.environ['CLAUDE_PROJECT_DIR'] = str(root)
+        try: from hooks import shared_state
+        except SystemExit: raise ValueError("No sessions project found (pass project_root or set CLAUDE_PROJECT_DIR)")
+        if root is not None and Path(shared_state.PROJECT_ROOT).resolve() != root:
+            raise ValueError(f"shared_state is already bound to {shared_state.PROJECT_ROOT}; one project per process")
+
+        self._ss = shared_state
+        self.project_root = Path(shared_state.PROJECT_ROOT)
+        self._snapshots: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+
+    ## ===== SNAPSHOTS ===== ##
+    def _snapshot(self, path: Path, load: Callable[[], Any]) -> Any:
+        # Stamp before loading: a write landing in between leaves a stale stamp, which only forces another reload
+        try: st = os.stat(path)
+        except OSError: return load()  # load_* creates the missing file; cache from the next call
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._snapshots.get(path)
+        if cached is not None and cached[0] == stamp: return cached[1]
+        value = load()
+        self._snapshots[path] = (stamp, value)
+        return value
+
+    def refresh(self) -> None:
+        """Drop cached snapshots (e.g. after editing the files on a filesystem with coarse mtimes)."""
+        self._snapshots.clear()
+    ##-##
+
+    ## ===== STATE ===== ##
+    def state(self) -> SessionsState: return self._snapshot(self._ss.STATE_FILE, self._ss.load_state)
+
+    def mode(self) -> Mode: return self.state().mode
+
+    def current_task(self) -> TaskState: return self.state().current_task
+
+    def todos(self) -> SessionsTodos: return self.state().todos
+
+    def flags(self) -> SessionsFlags: return self.state().flags
+
+    def active_protocol(self) -> Optional[SessionsProtocol]: return self.state().active_protocol
+    ##-##
+
+    ## ===== CONFIG ===== ##
+    def config(self) -> SessionsConfig: return self._snapshot(self._ss.CONFIG_FILE, self._ss.load_config)
+
+    def trigger_phrases(self) -> TriggerPhrases: return self.config().trigger_phrases
+
+    def git_preferences(self) -> GitPreferences: return self.config().git_preferences
+
+    def environment(self) -> SessionsEnv: return self.config().environment
+
+    def blocked_actions(self) -> BlockingPatterns: return self.config().blocked_actions
+
+    def features(self) -> EnabledFeatures: return self.config().features
+    ##-##
+
+    ## ===== TASKS ===== ##
+    def task_index(self) -> Dict[str, Any]:
+        """shared_state.load_task_index(): {"tasks", "indexes"}, re-reading only task files that changed."""
+        return self._ss.load_task_index()
+
+    def tasks(self, status: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Task index entries keyed by path relative to sessions/tasks, optionally only those with this status."""
+        tasks = self.task_index()["tasks"]
+        return tasks if status is None else {name: task for name, task in tasks.items() if task.get("status") == status}
+
+    def task(self, name: str) -> Optional[Dict[str, Any]]:
+        """One task index entry ('foo.md', 'h-dir' or 'h-dir/01-sub.md'; a leading @ or trailing / is ignored)."""
+        return self.task_index()["tasks"].get(name.lstrip('@').rstrip('/'))
+
+    def task_indexes(self) -> List[Dict[str, Any]]:
+        """shared_state.task_index_groups(): index files with their task references resolved."""
+        return self._ss.task_index_groups(self.task_index())
+    ##-##
+
+    ## ===== COMMANDS ===== ##
+    def run(self, command: str, *args: str) -> Any:
+        """
+        Run an API command in-process, as `sessions <command> <args> --json` would.
+
+        Raises:
+            ValueError: For unknown commands or invalid arguments (the CLI's "Error: ..." cases)
+        """
+        from api.router import route_command
+        return route_command(command, list(args), json_output=True)
+
+    def transaction(self) -> ContextManager[None]:
+        """shared_state.transaction(): run() calls inside the block commit once, or not at all if it raises."""
+        return self._ss.transaction()
+    ##-##
+
+#-#
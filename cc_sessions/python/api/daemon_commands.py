@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, List
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+from hooks.hook_daemon import start_daemon, stop_daemon, daemon_status, is_supported
+##-##
+
+#-#
+
+"""
+╔═════════════════════════════════════════════════════════╗
+║     ██╗█████╗  █████╗ ██████╗███╗  ███╗ █████╗ ██╗  ██╗ ║
+║    ██╔╝██╔═██╗██╔══██╗██╔═══╝████╗████║██╔══██╗███╗ ██║ ║
+║   ██╔╝ ██║ ██║███████║█████╗ ██╔███║██║██║  ██║████╗██║ ║
+║  ██╔╝  ██║ ██║██╔══██║██╔══╝ ██║╚══╝██║██║  ██║██╔████║ ║
+║ ██╔╝   █████╔╝██║  ██║██████╗██║    ██║╚█████╔╝██║╚███║ ║
+║ ╚═╝    ╚════╝ ╚═╝  ╚═╝╚═════╝╚═╝    ╚═╝ ╚════╝ ╚═╝ ╚══╝ ║
+╚═════════════════════════════════════════════════════════╝
+Hook daemon lifecycle commands (start, stop, status)
+"""
+
+# ===== FUNCTIONS ===== #
+
+def handle_daemon_command(args: List[str], json_output: bool = False) -> Any:
+    """
+    Manage the per-project hook daemon.
+
+    Usage:
+        daemon start   - Start the daemon (no-op if already running)
+        daemon stop    - Stop the daemon; hooks fall back to running in-process
+        daemon status  - Show whether the daemon is running
+    """
+    args = [a for a in args if a != '--from-slash']
+    subcommand = args[0] if args else 'status'
+
+    if subcommand == 'start':
+        try: result = start_daemon()
+        except RuntimeError as e:
+            if json_output: return {"error": str(e)}
+            return str(e)
+        if json_output: return result
+        verb = "Started" if result.get("started") else "Already running:"
+        return f"{verb} hook daemon (pid {result.get('pid')}, socket {result.get('socket')})"
+
+    if subcommand == 'stop':
+        stopped = stop_daemon()
+        if json_output: return {"stopped": stopped}
+        return "Hook daemon stopped" if stopped else "Hook daemon was not running"
+
+    if subcommand == 'status':
+        status = daemon_status()
+        if json_output: return {"running": status is not None, "supported": is_supported(), **(status or {})}
+        if not is_supported(): return "Hook daemon is not supported on this platform"
+        if not status: return "Hook daemon is not running"
+        return f"Hook daemon running (pid {status['pid']}, uptime {status['uptime']}s, {status['served']} hooks served)"
+
+    error_msg = f"Unknown daemon command: {subcommand}. Valid commands: start, stop, status"
+    if json_output: return {"error": error_msg}
+    return error_msg
+
+#-#
@@ -271,6 +271,8 @@ def complete_kickstart(json_output: bool = False) -> Any:
     if py_hook.exists():
         with contextlib.suppress(Exception):
             py_hook.unlink()
+    with contextlib.suppress(Exception):
+        (sessions_dir / 'hooks' / 'launch' / 'kickstart_session_start.py').unlink(missing_ok=True)
 
     # 2. Delete kickstart protocols directory
     protocols_dir = sessions_dir / 'protocols' / 'kickstart'
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from pathlib import Path
+import json, re, sys, time
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+from hooks.shared_state import CACHE_DIR, load_config
+from hooks.bash_policy import BashPolicy, compile_policy, explain, load_policy
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+# zsh EXTENDED_HISTORY prefix (`: 1700000000:0;git status`)
+ZSH_HISTORY_PREFIX = re.compile(r'^: \d+:\d+;')
+#-#
+
+"""
+╔═══════════════════════════════════════════════════════╗
+║     ██╗██████╗  █████╗ ██╗     ██████╗ █████╗██╗  ██╗ ║
+║    ██╔╝██╔══██╗██╔══██╗██║     ╚═██╔═╝██╔═══╝╚██╗██╔╝ ║
+║   ██╔╝ ██████╔╝██║  ██║██║       ██║  ██║     ╚███╔╝  ║
+║  ██╔╝  ██╔═══╝ ██║  ██║██║       ██║  ██║      ██╔╝   ║
+║ ██╔╝   ██║     ╚█████╔╝███████╗██████╗╚█████╗  ██║    ║
+║ ╚═╝    ╚═╝      ╚════╝ ╚══════╝╚═════╝ ╚════╝  ╚═╝    ║
+╚═══════════════════════════════════════════════════════╝
+Bulk evaluation of the Bash read/write policy
+
+Classifies commands with the same compiled policy and engine sessions_enforce
+uses (hooks/bash_policy.py), without going through the PreToolUse hook.
+"""
+
+# ===== FUNCTIONS ===== #
+
+## ===== INPUT ===== ##
+def iter_commands(stream: TextIO) -> Iterator[str]:
+    """
+    Commands from a shell history file or a transcript, one line at a time.
+
+    Lines that are JSON may be a string, an object with `command` (or `tool_input.command`),
+    or a transcript entry - every Bash tool_use in it is yielded. Anything else is taken as a
+    plain command line (zsh extended-history timestamps are stripped).
+    """
+    for line in stream:
+        line = line.rstrip('\n')
+        if not line.strip(): continue
+        if line[0] in '{"':
+            try: entry = json.loads(line)
+            except ValueError: entry = None
+            if isinstance(entry, str):
+                yield entry
+                continue
+            if isinstance(entry, dict):
+                yield from _entry_commands(entry)
+                continue
+        yield ZSH_HISTORY_PREFIX.sub('', line)
+
+def _entry_commands(entry: Dict[str, Any]) -> Iterator[str]:
+    if isinstance(entry.get('command'), str):
+        yield entry['command']
+        return
+    tool_input = entry.get('tool_input')
+    if isinstance(tool_input, dict) and isinstance(tool_input.get('command'), str):
+        yield tool_input['command']
+        return
+    content = (entry.get('message') or {}).get('content') if isinstance(entry.get('message'), dict) else None
+    if not isinstance(content, list): return
+    for block in content:
+        if isinstance(block, dict) and block.get('type') == 'tool_use' and block.get('name') == 'Bash':
+            command = (block.get('input') or {}).get('command')
+            if isinstance(command, str): yield command
+##-##
+
+## ===== POLICIES ===== ##
+def current_policy() -> BashPolicy:
+    """The policy sessions_enforce would load right now."""
+    blocked = load_config().blocked_actions
+    return load_policy(CACHE_DIR, blocked.bash_read_patterns, blocked.bash_write_patterns, blocked.extrasafe)
+
+def policy_from_file(path: Path) -> BashPolicy:
+    """A policy from a sessions-config.json (its blocked_actions) or a compiled bash-policy.json."""
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    if not isinstance(data, dict): raise ValueError(f"{path} is not a sessions config or compiled policy")
+    if isinstance(data.get('trie'), dict):
+        return BashPolicy(trie=data['trie'], extrasafe=bool(data.get('extrasafe')), fingerprint=str(data.get('fingerprint', '')))
+    blocked = data.get('blocked_actions') or {}
+    return compile_policy(blocked.get('bash_read_patterns', []), blocked.get('bash_write_patterns', []), bool(blocked.get('extrasafe', False)))
+##-##
+
+## ===== EVAL ===== ##
+def evaluate(commands: Iterator[str], policy: BashPolicy, previous: Optional[BashPolicy] = None, out: TextIO = sys.stdout) -> Dict[str, Any]:
+    """
+    Write one NDJSON verdict per command to out and return summary counts.
+
+    With a previous policy, records whose verdict differs carry `previous` (its verdict) and
+    `changed: true`.
+    """
+    summary: Dict[str, Any] = {"commands": 0, "read_only": 0, "write_like": 0}
+    if previous is not None: summary.update({"changed": 0, "now_read_only": 0, "now_write_like": 0})
+    reasons: Dict[str, int] = {}
+    seen: Dict[str, Any] = {}   # Histories repeat themselves; verdicts are pure per (command, policy)
+
+    start = time.perf_counter()
+    for command in commands:
+        if command not in seen: seen[command] = (explain(command, policy), explain(command, previous) if previous is not None else None)
+        verdict, before = seen[command]
+        record = {"command": command, **verdict}
+        summary["commands"] += 1
+        summary["read_only" if verdict["read_only"] else "write_like"] += 1
+        reasons[verdict["reason"]] = reasons.get(verdict["reason"], 0) + 1
+
+        if before is not None:
+            if before["read_only"] != verdict["read_only"]:
+                record.update({"changed": True, "previous": before})
+                summary["changed"] += 1
+                summary["now_read_only" if verdict["read_only"] else "now_write_like"] += 1
+
+        out.write(json.dumps(record) + "\n")
+    elapsed = time.perf_counter() - start
+
+    summary["reasons"] = reasons
+    summary["seconds"] = round(elapsed, 3)
+    summary["commands_per_second"] = round(summary["commands"] / elapsed) if elapsed > 0 else None
+    summary["policy"] = policy.fingerprint
+    if previous is not None: summary["previous_policy"] = previous.fingerprint
+    return summary
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    lines = [f"Evaluated {summary['commands']} commands in {summary['seconds']}s ({summary['commands_per_second'] or '-'} commands/s)",
+             f"  read-only:  {summary['read_only']}",
+             f"  write-like: {summary['write_like']}"]
+    for reason, count in sorted(summary['reasons'].items(), key=lambda item: -item[1]): lines.append(f"    {reason}: {count}")
+    if 'changed' in summary:
+        lines.append(f"Changed vs previous policy: {summary['changed']} "
+                     f"({summary['now_read_only']} now read-only, {summary['now_write_like']} now write-like)")
+    return "\n".join(lines)
+##-##
+
+## ===== COMMAND ===== ##
+def handle_policy_command(args: List[str], json_output: bool = False) -> Any:
+    """
+    Evaluate the Bash read/write policy.
+
+    Usage:
+        policy eval [<file>|-] [against <config>]
+            Classify every command in <file> (or stdin) and stream NDJSON verdicts to stdout.
+            <file> may be a shell history or JSONL (strings, {"command": ...} or transcript entries).
+            `against` diffs the verdicts with the policy in another sessions-config.json or
+            compiled bash-policy.json. The summary (throughput, reasons, changes) goes to stderr,
+            or is the last NDJSON line ({"summary": ...}) with --json.
+    """
+    args = [a for a in args if a != '--from-slash']
+    if not args: return "Usage: policy eval [<file>|-] [against <config>]"
+    if args[0] != 'eval':
+        error_msg = f"Unknown policy command: {args[0]}. Valid commands: eval"
+        if json_output: return {"error": error_msg}
+        return error_msg
+    args = args[1:]
+
+    previous = None
+    if 'against' in args:
+        at = args.index('against')
+        if at + 1 >= len(args): raise ValueError("Usage: policy eval [<file>|-] [against <config>]")
+        previous = policy_from_file(Path(args[at + 1]))
+        args = args[:at] + args[at + 2:]
+
+    source = args[0] if args else '-'
+    if source == '-': summary = evaluate(iter_commands(sys.stdin), current_policy(), previous)
+    else:
+        with open(source, encoding='utf-8', errors='replace') as stream: summary = evaluate(iter_commands(stream), current_policy(), previous)
+
+    if json_output: print(json.dumps({"summary": summary}))
+    else: print(format_summary(summary), file=sys.stderr)
+    return None
+##-##
+
+#-#
@@ -3,46 +3,43 @@
 # ===== IMPORTS ===== #
 
 ## ===== STDLIB ===== ##
-from typing import Any, List
+from typing import Any, Callable, List
+from importlib import import_module
+import os
 ##-##
 
 ## ===== 3RD-PARTY ===== ##
 ##-##
 
 ## ===== LOCAL ===== ##
-from api.state_commands import handle_state_command, handle_mode_command, handle_flags_command, handle_status_command, handle_version_command, handle_todos_command
-try:
-    from api.kickstart_commands import handle_kickstart_command  # optional
-    _HAS_KICKSTART = True
-except Exception:
-    handle_kickstart_command = None  # type: ignore
-    _HAS_KICKSTART = False
-from api.protocol_commands import handle_protocol_command
-from api.config_commands import handle_config_command
-from api.task_commands import handle_task_command
-from api.uninstall_commands import handle_uninstall_command
+# Command modules are imported on first use (see get_handler) - a call only loads the subsystem it routes to
 ##-##
 
 #-#
 
 # ===== GLOBALS ===== #
 
+# command: "module:handler"
 COMMAND_HANDLERS = {
-    'protocol': handle_protocol_command,
-    'state': handle_state_command,
-    'mode': handle_mode_command,
-    'flags': handle_flags_command,
-    'status': handle_status_command,
-    'version': handle_version_command,
-    'config': handle_config_command,
-    'todos': handle_todos_command,
-    'tasks': handle_task_command,
-    'uninstall': handle_uninstall_command,
+    'protocol': 'api.protocol_commands:handle_protocol_command',
+    'state': 'api.state_commands:handle_state_command',
+    'mode': 'api.state_commands:handle_mode_command',
+    'flags': 'api.state_commands:handle_flags_command',
+    'status': 'api.state_commands:handle_status_command',
+    'version': 'api.state_commands:handle_version_command',
+    'config': 'api.config_commands:handle_config_command',
+    'todos': 'api.state_commands:handle_todos_command',
+    'tasks': 'api.task_commands:handle_task_command',
+    'uninstall': 'api.uninstall_commands:handle_uninstall_command',
+    'daemon': 'api.daemon_commands:handle_daemon_command',
+    'statusline': 'api.statusline_commands:handle_statusline_command',
+    'policy': 'api.policy_commands:handle_policy_command',
 }
 
-# Register kickstart handler only if the module is available
-if _HAS_KICKSTART and callable(handle_kickstart_command):
-    COMMAND_HANDLERS['kickstart'] = handle_kickstart_command
+# Register kickstart handler only if the module is available (it is deleted once onboarding is done)
+_HAS_KICKSTART = os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kickstart_commands.py'))
+if _HAS_KICKSTART:
+    COMMAND_HANDLERS['kickstart'] = 'api.kickstart_commands:handle_kickstart_command'
 
 # Help dictionary for progressive disclosure
 HELP_MESSAGES = {
@@ -51,6 +48,10 @@ HELP_MESSAGES = {
   config   - show, phrases, git, env, features, read, write, tools
   tasks    - idx, start
   protocol - startup-load
+  daemon   - start, stop, status
+  statusline - timings
+  policy   - eval
+  batch    - Run commands from stdin in one process (NDJSON results)
   uninstall - Remove cc-sessions framework""" + ("""
   kickstart - full, subagents, next, complete""" if _HAS_KICKSTART else ""),
 
@@ -120,6 +121,17 @@ Features: branch_enforcement, task_detection, auto_ultrathink, icon_style, warn_
   idx list        - List all task indexes
   idx <name>      - Show tasks in specific index
   start @<task>   - Start working on a task""",
+
+    "daemon": """Available daemon commands:
+  start           - Start the hook daemon for this project
+  stop            - Stop the hook daemon (hooks run in-process again)
+  status          - Show whether the hook daemon is running""",
+
+    "statusline": """Available statusline commands:
+  timings         - Per-segment timings of the latest statusline renders""",
+
+    "policy": """Available policy commands:
+  eval [<file>|-] [against <config>]  - Classify commands in bulk with the Bash read/write policy (NDJSON)""",
 }
 
 #-#
@@ -156,6 +168,11 @@ def resolve_help(command_path: List[str]) -> str:
     # Return help for this level, or root help if not found
     return HELP_MESSAGES.get(key, HELP_MESSAGES["root"])
 
+def get_handler(command: str) -> Callable[..., Any]:
+    """Import the module behind COMMAND_HANDLERS[command] and return its handler."""
+    module, _, name = COMMAND_HANDLERS[command].partition(':')
+    return getattr(import_module(module), name)
+
 def route_command(command: str, args: List[str], json_output: bool = False, from_slash: bool = False) -> Any:
     """
     Route a command to the appropriate handler.
@@ -180,21 +197,21 @@ def route_command(command: str, args: List[str], json_output: bool = False, from
         subsystem_args = args[1:] if len(args) > 1 else []
 
         # Route to appropriate subsystem
-        subsystems = ['tasks', 'state', 'config', 'uninstall']
+        subsystems = ['tasks', 'state', 'config', 'uninstall', 'daemon', 'statusline', 'policy']
         if _HAS_KICKSTART: subsystems.append('kickstart')
         if subsystem in subsystems: return route_command(subsystem, subsystem_args,
                                                          json_output=json_output, from_slash=True)
         elif subsystem == 'bypass': return route_command('mode', ['bypass'], json_output=json_output, from_slash=True)
         elif subsystem == 'help': return format_slash_help()
         else:
-            return f"Unknown subsystem: {subsystem}\n\nValid subsystems: tasks, state, config, uninstall, bypass{', kickstart' if _HAS_KICKSTART else ''}\n\nUse '/sessions help' for full usage information."
+            return f"Unknown subsystem: {subsystem}\n\nValid subsystems: tasks, state, config, uninstall, daemon, statusline, policy, bypass{', kickstart' if _HAS_KICKSTART else ''}\n\nUse '/sessions help' for full usage information."
 
     if command not in COMMAND_HANDLERS:
         if from_slash:
             return resolve_help([])
         raise ValueError(f"Unknown command: {command}. Available commands: {', '.join(COMMAND_HANDLERS.keys())}")
 
-    handler = COMMAND_HANDLERS[command]
+    handler = get_handler(command)
 
     # Wrap handler calls with error recovery when called from slash
     if from_slash:
@@ -254,6 +271,11 @@ def format_slash_help() -> str:
             "",
         ]
     lines += [
+        "### Daemon", "  /sessions daemon start          - Keep hooks warm in a background daemon",
+        "  /sessions daemon stop           - Stop the daemon (hooks run in-process)",
+        "  /sessions daemon status         - Show daemon status", "",
+        "### Statusline", "  /sessions statusline timings    - Show per-segment render timings", "",
+        "### Policy", "  /sessions policy eval <file>    - Classify commands in bulk with the Bash read/write policy", "",
         "### Uninstall", "  /sessions uninstall             - Safely remove cc-sessions framework",
         "  /sessions uninstall --dry-run   - Preview what would be removed", "",
         "### Quick Shortcuts", "  /sessions bypass                - Disable bypass mode (return to normal)", "",
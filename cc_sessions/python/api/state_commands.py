@@ -3,7 +3,6 @@
 # ===== IMPORTS ===== #
 
 ## ===== STDLIB ===== ##
-from importlib.metadata import version, PackageNotFoundError
 from typing import Any, List
 import json
 ##-##
@@ -12,7 +11,7 @@ import json
 ##-##
 
 ## ===== LOCAL ===== ##
-from hooks.shared_state import load_state, edit_state, Mode, TodoStatus, TaskState
+from hooks.shared_state import load_state, edit_state, package_version, Mode, TodoStatus, TaskState
 from dataclasses import asdict
 ##-##
 
@@ -517,8 +516,7 @@ def handle_version_command(args: List[str], json_output: bool = False) -> Any:
     """
     Handle version command - show package version.
     """
-    try: pkg_version = version("cc-sessions")
-    except PackageNotFoundError: pkg_version = "development"
+    pkg_version = package_version() or "development"
 
     if json_output: return {"version": pkg_version}
     return f"cc-sessions version: {pkg_version}"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, List
+import time
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+from hooks.shared_state import CACHE_DIR
+from hooks.statusline_cache import segment_timings
+##-##
+
+#-#
+
+"""
+╔══════════════════════════════════════════════════════════════════════════════════╗
+║     ██╗██████╗██████╗ █████╗ ██████╗██╗ ██╗██████╗██╗     ██████╗██╗  ██╗██████╗ ║
+║    ██╔╝██╔═══╝╚═██╔═╝██╔══██╗╚═██╔═╝██║ ██║██╔═══╝██║     ╚═██╔═╝███╗ ██║██╔═══╝ ║
+║   ██╔╝ ██████╗  ██║  ███████║  ██║  ██║ ██║██████╗██║       ██║  ████╗██║█████╗  ║
+║  ██╔╝  ╚═══██║  ██║  ██╔══██║  ██║  ██║ ██║╚═══██║██║       ██║  ██╔████║██╔══╝  ║
+║ ██╔╝   ██████║  ██║  ██║  ██║  ██║  ╚████╔╝██████║███████╗██████╗██║╚███║██████╗ ║
+║ ╚═╝    ╚═════╝  ╚═╝  ╚═╝  ╚═╝  ╚═╝   ╚═══╝ ╚═════╝╚══════╝╚═════╝╚═╝ ╚══╝╚═════╝ ║
+╚══════════════════════════════════════════════════════════════════════════════════╝
+Statusline diagnostics (per-segment render timings)
+"""
+
+# ===== FUNCTIONS ===== #
+
+def handle_statusline_command(args: List[str], json_output: bool = False) -> Any:
+    """
+    Inspect statusline rendering.
+
+    Usage:
+        statusline timings   - Per-segment timings of the latest render of each session
+    """
+    args = [a for a in args if a != '--from-slash']
+    subcommand = args[0] if args else 'timings'
+
+    if subcommand == 'timings':
+        renders = segment_timings(CACHE_DIR)
+        if json_output: return {"renders": renders}
+        if not renders: return "No statusline renders recorded yet"
+
+        lines = []
+        for render in renders:
+            age = int(time.time() - (render.get('rendered') or 0))
+            lines.append(f"Session {render.get('session_id')} (rendered {age}s ago):")
+            deadlines = render.get('deadlines') or {}
+            for segment, ms in (render.get('timings') or {}).items():
+                deadline_ms = int(deadlines.get(segment, 0) * 1000)
+                shown = f"{ms} ms" if ms is not None else "missed deadline, showed last value"
+                lines.append(f"  {segment:<8} {shown} (deadline {deadline_ms} ms)")
+            lines.append("")
+        return "\n".join(lines).rstrip()
+
+    error_msg = f"Unknown statusline command: {subcommand}. Valid commands: timings"
+    if json_output: return {"error": error_msg}
+    return error_msg
+
+#-#
@@ -20,8 +20,9 @@ from hooks.shared_state import (
     TaskState,
     SessionsProtocol,
     PROJECT_ROOT,
-    get_task_file_path,
-    is_directory_task
+    load_task_index,
+    task_index_groups,
+    top_level_task_statuses
 )
 ##-##
 
@@ -54,105 +55,28 @@ def load_protocol_file(relative_path: str) -> Optional[str]:
     return None
 #!<
 
-#!> Index file parsing
-def parse_index_file(index_path: Path) -> Optional[Tuple[Dict, List[str]]]:
-    """Parse an index file and extract metadata and task lines."""
-    if not index_path.exists():
-        return None
-
-    try:
-        content = index_path.read_text()
-        lines = content.split('\n')
-    except (IOError, UnicodeDecodeError):
-        return None
-
-    # Extract frontmatter using simple string parsing
-    metadata = {}
-    if lines and lines[0] == '---':
-        for i, line in enumerate(lines[1:], 1):
-            if line == '---':
-                break
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
-
-    # Extract task lines (those starting with - `)
-    task_lines = []
-    for line in lines:
-        if line.strip().startswith('- `'):
-            task_lines.append(line.strip())
-
-    return metadata, task_lines
-#!<
-
 #!> Task status extraction
 def get_task_status_map() -> Dict[str, str]:
     """Build a map of task names to their status."""
-    tasks_dir = PROJECT_ROOT / 'sessions' / 'tasks'
-    task_status = {}
-
-    task_files = []
-    if tasks_dir.exists():
-        task_files = sorted([f for f in tasks_dir.glob('*.md') if f.name != 'TEMPLATE.md'])
-
-    for task_dir in sorted([d for d in tasks_dir.iterdir() if d.is_dir() and d.name not in ['done', 'indexes']]):
-        readme_file = task_dir / 'README.md'
-        if readme_file.exists():
-            task_files.append(task_dir)
-        subtask_files = sorted([f for f in task_dir.glob('*.md') if f.name not in ['TEMPLATE.md', 'README.md']])
-        task_files.extend(subtask_files)
-
-    for task_file in task_files:
-        fpath = get_task_file_path(task_file)
-        if not fpath.exists():
-            continue
-        try:
-            with fpath.open('r', encoding='utf-8') as f:
-                lines = f.readlines()[:10]
-        except (IOError, UnicodeDecodeError):
-            continue
-
-        task_name = f"{task_file.name}/" if is_directory_task(task_file) else task_file.name
-        status = None
-        for line in lines:
-            if line.startswith('status:'):
-                status = line.split(':')[1].strip()
-                break
-        if status:
-            task_status[task_name] = status
-
-    return task_status
+    return dict(top_level_task_statuses(load_task_index()))
 #!<
 
 #!> Index operations
 def handle_idx_list(json_output: bool = False) -> Any:
     """List all available index files."""
-    indexes_dir = PROJECT_ROOT / 'sessions' / 'tasks' / 'indexes'
-
-    if not indexes_dir.exists():
+    if not (PROJECT_ROOT / 'sessions' / 'tasks' / 'indexes').exists():
         if json_output:
             return {"indexes": [], "message": "No indexes directory found"}
         return "No indexes directory found at sessions/tasks/indexes"
 
-    index_files = sorted(indexes_dir.glob('*.md'))
+    groups = task_index_groups()
 
-    if not index_files:
+    if not groups:
         if json_output:
             return {"indexes": [], "message": "No index files found"}
         return "No index files found in sessions/tasks/indexes"
 
-    indexes_info = []
-    for index_file in index_files:
-        result = parse_index_file(index_file)
-        if result:
-            metadata, task_lines = result
-            indexes_info.append({
-                'file': index_file.name,
-                'id': metadata.get('index', index_file.stem),
-                'name': metadata.get('name', index_file.stem),
-                'description': metadata.get('description', ''),
-                'task_count': len(task_lines)
-            })
+    indexes_info = [{key: group[key] for key in ('file', 'id', 'name', 'description', 'task_count')} for group in groups]
 
     if json_output:
         return {"indexes": indexes_info}
@@ -171,51 +95,36 @@ def handle_idx_list(json_output: bool = False) -> Any:
 
 def handle_idx_show(index_name: str, json_output: bool = False) -> Any:
     """Show pending tasks in a specific index file."""
-    indexes_dir = PROJECT_ROOT / 'sessions' / 'tasks' / 'indexes'
-
-    # Try to find the index file (with or without .md extension)
-    index_path = indexes_dir / f"{index_name}.md" if not index_name.endswith('.md') else indexes_dir / index_name
+    index = load_task_index()
+    groups = {group['file']: group for group in task_index_groups(index)}
 
-    if not index_path.exists():
-        # Try without extension if it has one, or with if it doesn't
-        alt_name = index_name[:-3] if index_name.endswith('.md') else f"{index_name}.md"
-        index_path = indexes_dir / alt_name
+    # Accept the index name with or without its .md extension
+    file_name = index_name if index_name.endswith('.md') else f"{index_name}.md"
 
-    if not index_path.exists():
+    if file_name not in index["indexes"]:
         if json_output:
             return {"error": f"Index file not found: {index_name}"}
         return f"Index file not found: {index_name}\n\nUse '/sessions tasks idx list' to see available indexes"
 
-    result = parse_index_file(index_path)
-    if not result:
+    if file_name not in groups:
         if json_output:
             return {"error": f"Failed to parse index file: {index_name}"}
         return f"Failed to parse index file: {index_name}"
 
-    metadata, task_lines = result
-    task_status = get_task_status_map()
+    group = groups[file_name]
+    metadata = group['metadata']
+    task_status = dict(top_level_task_statuses(index))
 
-    # Extract task names and filter by status
+    # Filter listed tasks by status
     pending_tasks = []
-    for line in task_lines:
-        if '`' in line:
-            try:
-                start = line.index('`') + 1
-                end = line.index('`', start)
-                task_name = line[start:end]
-                status = task_status.get(task_name, 'unknown')
-                if status in ['pending', 'in-progress']:
-                    # Extract description if present
-                    desc = line[end+1:].strip()
-                    if desc.startswith(' - '):
-                        desc = desc[3:].strip()
-                    pending_tasks.append({
-                        'name': task_name,
-                        'status': status,
-                        'description': desc
-                    })
-            except ValueError:
-                continue
+    for entry in group['tasks']:
+        status = task_status.get(entry['ref'], 'unknown')
+        if status in ['pending', 'in-progress']:
+            pending_tasks.append({
+                'name': entry['ref'],
+                'status': status,
+                'description': entry['description']
+            })
 
     if json_output:
         return {
@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib, json, os, re
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+try: from .sessions_cache import read_json, write_json
+except ImportError: from sessions_cache import read_json, write_json
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+# Bump whenever the classification code changes so policies compiled and verdicts cached by older code stop matching
+# (edits to the built-in rule tables below are picked up through BUILTIN_RULES_DIGEST on their own)
+POLICY_ENGINE_VERSION = 2
+# Most recently used verdicts kept in sessions/.cache/bash-verdicts.log
+VERDICT_CACHE_SIZE = 512
+VERDICT_KEY = 20                 # Hex digits of sha1(policy fingerprint, command)
+VERDICT_LINE = VERDICT_KEY + 3   # `<key> <0|1>\n`
+# Shorter commands lex faster than the cache file can be read, so they skip it
+VERDICT_CACHE_MIN_LENGTH = 2048
+
+# Longest first, so `>>` wins over `>` and `&&` over `&`
+OPERATORS = ('<<<', '&>>', '<<-', '&&', '||', '|&', ';;', '>>', '<<', '<&', '<>', '>&', '>|', '&>', '|', '&', ';', '<', '>')
+REDIRECTS = {'<<<', '&>>', '<<-', '>>', '<<', '<&', '<>', '>&', '>|', '&>', '<', '>'}
+FILE_WRITES = {'>', '>>', '>|', '&>', '&>>', '<>'}
+# Characters with no special meaning mid-word, consumed in one step
+PLAIN_RUN = re.compile(r"[^\s|&;<>()$`'\"\\]+")
+# Words that can precede the actual command name
+SHELL_KEYWORDS = {'if', 'then', 'else', 'elif', 'fi', 'do', 'done', 'while', 'until', '!', '{', '}', 'time'}
+
+# Compiled policy artifact (see load_policy)
+POLICY_FILE = "bash-policy.json"
+
+## ===== BUILT-IN RULES ===== ##
+# Space-separated token prefixes; the longest matching rule decides, write beats read on a tie
+BUILTIN_READ = {
+    # Basic file reading
+    'cat', 'less', 'more', 'head', 'tail', 'wc', 'nl', 'tac', 'rev',
+    # Text search and filtering
+    'grep', 'egrep', 'fgrep', 'rg', 'ripgrep', 'ag', 'ack',
+    # Text processing (all safe for reading)
+    'sort', 'uniq', 'cut', 'paste', 'join', 'comm', 'column',
+    'tr', 'expand', 'unexpand', 'fold', 'fmt', 'pr', 'shuf', 'tsort',
+    # Comparison
+    'diff', 'cmp', 'sdiff', 'vimdiff',
+    # Checksums
+    'md5sum', 'sha1sum', 'sha256sum', 'sha512sum', 'cksum', 'sum',
+    # Binary inspection
+    'od', 'hexdump', 'xxd', 'strings', 'file', 'readelf', 'objdump', 'nm',
+    # File system inspection
+    'ls', 'dir', 'vdir', 'pwd', 'which', 'type', 'whereis', 'locate', 'find',
+    'basename', 'dirname', 'readlink', 'realpath', 'stat',
+    # User/system info
+    'whoami', 'id', 'groups', 'users', 'who', 'w', 'last', 'lastlog',
+    'hostname', 'uname', 'arch', 'lsb_release', 'hostnamectl',
+    'date', 'cal', 'uptime', 'df', 'du', 'free', 'vmstat', 'iostat',
+    # Process monitoring
+    'ps', 'pgrep', 'pidof', 'top', 'htop', 'iotop', 'atop',
+    'lsof', 'jobs', 'pstree', 'fuser',
+    # Network monitoring
+    'netstat', 'ss', 'ip', 'ifconfig', 'route', 'arp',
+    'ping', 'traceroute', 'tracepath', 'mtr', 'nslookup', 'dig', 'host', 'whois',
+    # Environment
+    'printenv', 'env', 'set', 'export', 'alias', 'history', 'fc',
+    # Output
+    'echo', 'printf', 'yes', 'seq', 'jot',
+    # Testing
+    'test', '[', '[[', 'true', 'false',
+    # Calculation
+    'bc', 'dc', 'expr', 'factor', 'units',
+    # Modern tools
+    'jq', 'yq', 'xmlstarlet', 'xmllint', 'xsltproc',
+    'bat', 'fd', 'fzf', 'tree', 'ncdu', 'exa', 'lsd',
+    'tldr', 'cheat',
+    # Note: awk/sed are here but need special argument checking
+    'awk', 'sed', 'gawk', 'mawk', 'gsed',
+    # Navigation
+    'cd',
+    # Read-only subcommands of write-like tools
+    'pip show', 'pip list', 'pip search', 'pip check', 'pip freeze', 'pip help',
+    'pip3 show', 'pip3 list', 'pip3 search', 'pip3 check', 'pip3 freeze', 'pip3 help',
+    'npm list', 'npm ls', 'npm view', 'npm show', 'npm search', 'npm help',
+    'yarn list', 'yarn ls', 'yarn view', 'yarn show', 'yarn search', 'yarn help',
+    # python -c for simple expressions and python -m for module execution
+    'python -c', 'python -m', 'python3 -c', 'python3 -m',
+}
+
+BUILTIN_WRITE = {
+    # File operations
+    'rm', 'rmdir', 'unlink', 'shred',
+    'mv', 'rename', 'cp', 'install', 'dd',
+    'mkdir', 'mkfifo', 'mknod', 'mktemp', 'touch', 'truncate',
+    # Permissions
+    'chmod', 'chown', 'chgrp', 'umask',
+    'ln', 'link', 'symlink',
+    'setfacl', 'setfattr', 'chattr',
+    # System management
+    'useradd', 'userdel', 'usermod', 'groupadd', 'groupdel',
+    'passwd', 'chpasswd', 'systemctl', 'service',
+    # Package managers
+    'apt', 'apt-get', 'dpkg', 'snap', 'yum', 'dnf', 'rpm',
+    'pip', 'pip3', 'npm', 'yarn', 'gem', 'cargo',
+    # Build tools
+    'make', 'cmake', 'ninja', 'meson',
+    # Other dangerous
+    'sudo', 'doas', 'su', 'crontab', 'at', 'batch',
+    'kill', 'pkill', 'killall', 'tee',
+    # Other python invocations are potentially write-like
+    'python', 'python3',
+}
+
+# Digest of the built-in tables, part of policy_fingerprint()
+BUILTIN_RULES_DIGEST = hashlib.sha1(json.dumps([sorted(BUILTIN_READ), sorted(BUILTIN_WRITE)]).encode('utf-8')).hexdigest()
+##-##
+#-#
+
+"""
+╔════════════════════════════════════════════════════════════════════════════════════╗
+║ █████╗  █████╗ ██████╗██╗  ██╗      ██████╗  █████╗ ██╗     ██████╗ █████╗██╗  ██╗ ║
+║ ██╔═██╗██╔══██╗██╔═══╝██║  ██║      ██╔══██╗██╔══██╗██║     ╚═██╔═╝██╔═══╝╚██╗██╔╝ ║
+║ █████╔╝███████║██████╗███████║      ██████╔╝██║  ██║██║       ██║  ██║     ╚███╔╝  ║
+║ ██╔═██╗██╔══██║╚═══██║██╔══██║      ██╔═══╝ ██║  ██║██║       ██║  ██║      ██╔╝   ║
+║ █████╔╝██║  ██║██████║██║  ██║      ██║     ╚█████╔╝███████╗██████╗╚█████╗  ██║    ║
+║ ╚════╝ ╚═╝  ╚═╝╚═════╝╚═╝  ╚═╝      ╚═╝      ╚════╝ ╚══════╝╚═════╝ ╚════╝  ╚═╝    ║
+╚════════════════════════════════════════════════════════════════════════════════════╝
+Read-only classification of Bash commands for sessions_enforce
+
+split_commands() is a single-pass shell lexer: it understands quoting,
+escapes, comments, heredocs, every list/pipeline operator (`;`, newline, `&`,
+`|`, `|&`, `&&`, `||`), subshells, and descends into `$(...)`, backticks and
+process substitutions, so every command that would actually run is checked.
+Redirections are reported separately - only ones that write a file (anything
+but /dev/null) make a command write-like.
+
+Each command is then matched against a token trie of read/write rules (the
+built-ins below plus the user's bash_read_patterns / bash_write_patterns), so
+multi-word rules like `git status` (read) and `git push` (write) work. The
+trie is compiled when the config is saved and loaded from
+sessions/.cache/bash-policy.json by the hook.
+
+Verdicts for long commands (heredocs, pasted scripts) are cached across hook
+processes in sessions/.cache/bash-verdicts.log, keyed on the command text and
+a hash of the policy that produced them.
+
+Like sessions_cache, this module must not import shared_state - callers pass the cache dir.
+"""
+
+# ===== CLASSES ===== #
+
+## ===== LEXER ===== ##
+class _ShellLexer:
+    """Splits shell source into argv lists plus (operator, target) redirections."""
+
+    def __init__(self, text: str):
+        self.text, self.pos = text, 0
+        self.commands: List[List[str]] = []
+        self.redirects: List[Tuple[str, str]] = []
+
+    def scan(self, closer: Optional[str] = None) -> str:
+        """Lex up to the unmatched `closer` (or end of input) and return the raw source consumed."""
+        text, start = self.text, self.pos
+        words: List[str] = []
+        word: Optional[List[str]] = None    # None until a word has started ('' is still a word)
+        redirect: Optional[str] = None      # Operator waiting for its target word
+        heredocs: List[Tuple[str, bool]] = []
+        depth = 0                           # Open ( subshells inside this scan
+
+        def add(piece: str) -> None:
+            nonlocal word
+            if word is None: word = []
+            word.append(piece)
+
+        def end_word() -> None:
+            nonlocal word, redirect
+            if word is None: return
+            value, word = ''.join(word), None
+            if redirect is None: words.append(value)
+            elif redirect in ('<<', '<<-'): heredocs.append((value, redirect == '<<-'))
+            else: self.redirects.append((redirect, value))
+            redirect = None
+
+        def end_command() -> None:
+            nonlocal words, redirect
+            end_word()
+            if words: self.commands.append(words)
+            words, redirect = [], None
+
+        while self.pos < len(text):
+            c, nxt = text[self.pos], text[self.pos + 1:self.pos + 2]
+
+            if c == closer and (closer == '`' or depth == 0):
+                end_command()
+                self.pos += 1
+                return text[start:self.pos - 1]
+
+            if c in ' \t':
+                end_word()
+                self.pos += 1
+            elif c == '\n':
+                end_command()
+                self.pos += 1
+                for delimiter, strip_tabs in heredocs: self._skip_heredoc(delimiter, strip_tabs)
+                heredocs = []
+            elif c == '#' and word is None:
+                newline = text.find('\n', self.pos)
+                self.pos = newline if newline >= 0 else len(text)
+            elif c == '\\':
+                if nxt != '\n': add(nxt)
+                self.pos += 2
+            elif c == "'":
+                end = text.find("'", self.pos + 1)
+                if end < 0: raise ValueError("No closing quotation")
+                add(text[self.pos + 1:end])
+                self.pos = end + 1
+            elif c == '"':
+                add(self._double_quoted())
+            elif c == '$' and text.startswith('$((', self.pos):
+                add(self._arithmetic())
+            elif (c == '$' or (c in '<>' and word is None)) and nxt == '(':
+                # Command substitution, or <(...) / >(...) process substitution
+                self.pos += 2
+                add(f"{c}({self.scan(')')})")
+            elif c == '`':
+                self.pos += 1
+                add(f"`{self.scan('`')}`")
+            elif c in '|&;<>':
+                op = next(op for op in OPERATORS if text.startswith(op, self.pos))
+                self.pos += len(op)
+                if op in REDIRECTS:
+                    # `2>file`: a bare number glued to the operator is its fd, not an argument
+                    if word is not None and ''.join(word).isdigit() and text[self.pos - len(op) - 1] not in '\'"': word = None
+                    end_word()
+                    redirect = op
+                else: end_command()
+            elif c == '(' and word is None:
+                end_command()
+                depth += 1
+                self.pos += 1
+            elif c == ')':
+                end_command()
+                depth = max(0, depth - 1)
+                self.pos += 1
+            else:
+                run = PLAIN_RUN.match(text, self.pos)
+                add(run.group() if run else c)
+                self.pos = run.end() if run else self.pos + 1
+
+        if closer: raise ValueError(f"No closing {closer!r}")
+        end_command()
+        return text[start:]
+
+    def _double_quoted(self) -> str:
+        """Contents of the "..." at pos; substitutions inside it are lexed as commands too."""
+        text, out = self.text, []
+        self.pos += 1
+        while self.pos < len(text):
+            c, nxt = text[self.pos], text[self.pos + 1:self.pos + 2]
+            if c == '"':
+                self.pos += 1
+                return ''.join(out)
+            if c == '\\' and nxt and nxt in '$`"\\\n':
+                if nxt != '\n': out.append(nxt)
+                self.pos += 2
+            elif c == '$' and nxt == '(' and not text.startswith('$((', self.pos):
+                self.pos += 2
+                out.append(f"$({self.scan(')')})")
+            elif c == '`':
+                self.pos += 1
+                out.append(f"`{self.scan('`')}`")
+            else:
+                out.append(c)
+                self.pos += 1
+        raise ValueError("No closing quotation")
+
+    def _arithmetic(self) -> str:
+        """Raw $((...)) at pos - arithmetic runs no commands."""
+        depth, start = 0, self.pos
+        self.pos += 1
+        while self.pos < len(self.text):
+            c = self.text[self.pos]
+            self.pos += 1
+            if c == '(': depth += 1
+            elif c == ')':
+                depth -= 1
+                if depth == 0: return self.text[start:self.pos]
+        raise ValueError("No closing '))'")
+
+    def _skip_heredoc(self, delimiter: str, strip_tabs: bool) -> None:
+        """Move past a heredoc body (the lines after the command, up to the delimiter line)."""
+        text = self.text
+        while self.pos < len(text):
+            newline = text.find('\n', self.pos)
+            end = newline if newline >= 0 else len(text)
+            line = text[self.pos:end]
+            self.pos = end + 1
+            if (line.lstrip('\t') if strip_tabs else line) == delimiter: return
+##-##
+
+## ===== POLICY ===== ##
+@dataclass(frozen=True)
+class BashPolicy:
+    """
+    Built-in and custom read/write rules compiled into a trie over lowercased command tokens.
+
+    A node maps the next token to its child. A rule ending at a node is stored as
+    "<verdict>:<origin>" (read/write, builtin/custom) under its "" key - or, for the
+    common leaf with no children, as the node itself, which keeps the artifact small
+    and quick to load.
+    """
+    trie: Dict[str, Any]
+    extrasafe: bool      # Commands no rule matches count as write-like
+    fingerprint: str     # policy_fingerprint() of the inputs it was compiled from
+
+    def match(self, parts: List[str]) -> Optional[Tuple[str, str, str]]:
+        """(verdict, rule, origin) of the longest rule that prefixes parts, or None."""
+        node: Any = self.trie
+        best, length = None, 0
+        for i, token in enumerate(parts):
+            if not token or not isinstance(node, dict): break  # "" is the rule key, never a token
+            node = node.get(token.lower())
+            if node is None: break
+            rule = node if isinstance(node, str) else node.get("")
+            if rule: best, length = rule, i + 1
+        if best is None: return None
+        verdict, origin = best.split(":")
+        return verdict, " ".join(token.lower() for token in parts[:length]), origin
+
+    def writes(self, parts: List[str]) -> bool:
+        rule = self.match(parts)
+        return bool(rule) and rule[0] == "write"
+##-##
+
+#-#
+
+# ===== FUNCTIONS ===== #
+
+## ===== LEXER ===== ##
+def split_commands(command: str) -> Tuple[List[List[str]], List[Tuple[str, str]]]:
+    """
+    Lex a shell command line.
+
+    Returns:
+        (argv of every simple command, including those inside substitutions,
+         [(redirect operator, target)]). Heredoc bodies are skipped.
+
+    Raises:
+        ValueError: on unterminated quotes or substitutions (like shlex.split)
+    """
+    lexer = _ShellLexer(command)
+    lexer.scan()
+    return lexer.commands, lexer.redirects
+
+def writes_file(op: str, target: str) -> bool:
+    """Whether a redirection writes to a file (fd duplication and /dev/null don't)."""
+    if target == '/dev/null': return False
+    if op == '>&': return not (target.isdigit() or target == '-')
+    return op in FILE_WRITES
+##-##
+
+## ===== POLICY ===== ##
+def policy_fingerprint(read_patterns: List[str], write_patterns: List[str], extrasafe: bool) -> str:
+    """Stable hash of everything a compiled policy (and so every verdict) depends on."""
+    raw = json.dumps([POLICY_ENGINE_VERSION, BUILTIN_RULES_DIGEST, sorted(read_patterns), sorted(write_patterns), extrasafe])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+def compile_policy(read_patterns: List[str], write_patterns: List[str], extrasafe: bool) -> BashPolicy:
+    """Build the rule trie from the built-in rules plus the user's bash_read_patterns / bash_write_patterns."""
+    rules = [(pattern, "read", "builtin") for pattern in BUILTIN_READ] + [(pattern, "read", "custom") for pattern in read_patterns]
+    # Writes go in last so they win over a read rule with the same tokens
+    rules += [(pattern, "write", "builtin") for pattern in BUILTIN_WRITE] + [(pattern, "write", "custom") for pattern in write_patterns]
+
+    trie: Dict[str, Any] = {}
+    for pattern, verdict, origin in rules:
+        tokens = pattern.lower().split()
+        if not tokens: continue
+        node = trie
+        for token in tokens: node = node.setdefault(token, {})
+        node[""] = f"{verdict}:{origin}"
+
+    def collapse(node: Dict[str, Any]) -> Any:
+        if list(node) == [""]: return node[""]
+        return {token: child if token == "" else collapse(child) for token, child in node.items()}
+    trie = {token: collapse(child) for token, child in trie.items()}
+    return BashPolicy(trie=trie, extrasafe=extrasafe, fingerprint=policy_fingerprint(read_patterns, write_patterns, extrasafe))
+
+def save_policy(cache_dir: Path, policy: BashPolicy) -> None:
+    write_json(Path(cache_dir) / POLICY_FILE, {"fingerprint": policy.fingerprint, "extrasafe": policy.extrasafe, "trie": policy.trie})
+
+def load_policy(cache_dir: Path, read_patterns: List[str], write_patterns: List[str], extrasafe: bool) -> BashPolicy:
+    """
+    The compiled policy for these patterns.
+
+    edit_config() keeps sessions/.cache/bash-policy.json up to date, so this is normally one
+    JSON read. A missing or stale artifact (hand-edited config, new built-in rules) is
+    recompiled and saved.
+    """
+    fingerprint = policy_fingerprint(read_patterns, write_patterns, extrasafe)
+    data = read_json(Path(cache_dir) / POLICY_FILE)
+    if isinstance(data, dict) and data.get("fingerprint") == fingerprint and isinstance(data.get("trie"), dict):
+        return BashPolicy(trie=data["trie"], extrasafe=extrasafe, fingerprint=fingerprint)
+    policy = compile_policy(read_patterns, write_patterns, extrasafe)
+    save_policy(cache_dir, policy)
+    return policy
+##-##
+
+## ===== CLASSIFICATION ===== ##
+def check_command_arguments(parts: List[str], policy: BashPolicy) -> bool:
+    """Check if command arguments indicate write operations"""
+    if not parts: return True
+
+    cmd = parts[0].lower()
+    args = parts[1:] if len(parts) > 1 else []
+
+    # Check sed for in-place editing
+    if cmd in ['sed', 'gsed']:
+        for arg in args:
+            if arg.startswith('-i') or arg == '--in-place':
+                return False  # sed -i is a write operation
+
+    # Check awk for file output operations
+    if cmd in ['awk', 'gawk', 'mawk']:
+        script = ' '.join(args)
+        # Check for output redirection within awk script
+        if re.search(r'>\s*["\'].*["\']', script):  # > "file" or > 'file'
+            return False
+        if re.search(r'>>\s*["\'].*["\']', script):  # >> "file" or >> 'file'
+            return False
+        if 'print >' in script or 'print >>' in script:
+            return False
+        if 'printf >' in script or 'printf >>' in script:
+            return False
+
+    # Check find for dangerous operations
+    if cmd == 'find':
+        if '-delete' in args:
+            return False
+        for i, arg in enumerate(args):
+            if arg in ['-exec', '-execdir']:
+                if i + 1 < len(args):
+                    exec_cmd = args[i + 1].lower()
+                    if policy.writes(args[i + 1:]) or exec_cmd in ['rm', 'mv', 'cp', 'shred']:
+                        return False
+
+    # Check xargs for dangerous commands
+    if cmd == 'xargs':
+        for i in range(len(args)):
+            if policy.writes(args[i:]):
+                return False
+        # Check for sed -i through xargs
+        if 'sed' in args:
+            sed_idx = args.index('sed')
+            if sed_idx + 1 < len(args) and args[sed_idx + 1].startswith('-i'):
+                return False
+
+    return True
+
+def command_verdict(parts: List[str], policy: BashPolicy) -> Tuple[bool, str, Optional[Tuple[str, str, str]]]:
+    """(read-only, reason, matched rule) for one simple command (argv, as produced by split_commands)."""
+    while parts and parts[0] in SHELL_KEYWORDS: parts = parts[1:]
+    if not parts: return True, "empty", None
+
+    rule = policy.match(parts)
+    if rule and rule[0] == "write": return False, "write rule", rule
+
+    # Check command arguments for write operations
+    if not check_command_arguments(parts, policy): return False, "write-like arguments", rule
+
+    # If extrasafe is on and no read rule matched, block it
+    if rule: return True, "read rule", rule
+    return not policy.extrasafe, "no rule", None
+
+def is_command_read_only(parts: List[str], policy: BashPolicy) -> bool:
+    return command_verdict(parts, policy)[0]
+
+def is_read_only(command: str, policy: BashPolicy) -> bool:
+    """Whether every command in a Bash command line is read-only and nothing is redirected into a file."""
+    s = (command or '').strip()
+    if not s: return True
+
+    try: commands, redirects = split_commands(s)
+    except ValueError: return not policy.extrasafe
+
+    if any(writes_file(op, target) for op, target in redirects): return False
+    return all(is_command_read_only(parts, policy) for parts in commands)
+
+def explain(command: str, policy: BashPolicy) -> Dict[str, Any]:
+    """
+    is_read_only() plus what decided it.
+
+    Returns:
+        read_only, reason (empty / unparseable / redirect / write rule / write-like arguments /
+        no rule / read rules), at (the simple command or redirection that decided a write-like
+        verdict), rule and origin (the rule that decided it, if any), rules (every rule matched
+        on the way, in command order)
+    """
+    verdict: Dict[str, Any] = {"read_only": True, "reason": "empty", "at": None, "rule": None, "origin": None, "rules": []}
+    s = (command or '').strip()
+    if not s: return verdict
+
+    try: commands, redirects = split_commands(s)
+    except ValueError: return {**verdict, "read_only": not policy.extrasafe, "reason": "unparseable"}
+
+    for op, target in redirects:
+        if writes_file(op, target): return {**verdict, "read_only": False, "reason": "redirect", "at": f"{op} {target}"}
+
+    verdict["reason"] = "read rules"
+    for parts in commands:
+        read_only, reason, rule = command_verdict(parts, policy)
+        if rule: verdict["rules"].append(rule[1])
+        if reason == "no rule": verdict["reason"] = "no rule"
+        if not read_only:
+            return {**verdict, "read_only": False, "reason": reason, "at": " ".join(parts),
+                    "rule": rule[1] if rule else None, "origin": rule[2] if rule else None}
+    return verdict
+##-##
+
+## ===== VERDICT CACHE ===== ##
+def _write_verdicts(path: Path, log: bytes, line: bytes) -> None:
+    """Append a verdict line, compacting the log to the newest VERDICT_CACHE_SIZE keys once it doubles."""
+    try:
+        if len(log) + len(line) <= 2 * VERDICT_CACHE_SIZE * VERDICT_LINE:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "ab") as f: f.write(line)
+            return
+        newest: Dict[bytes, bytes] = {}
+        for entry in reversed((log + line).splitlines(keepends=True)):
+            if len(entry) == VERDICT_LINE: newest.setdefault(entry[:VERDICT_KEY], entry)
+            if len(newest) == VERDICT_CACHE_SIZE: break
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f: f.write(b"".join(reversed(list(newest.values()))))
+        os.replace(tmp, path)
+    except OSError: pass
+
+def cached_is_read_only(command: str, policy: BashPolicy, cache_dir: Optional[Path] = None) -> bool:
+    """
+    is_read_only() behind a persistent LRU of the last VERDICT_CACHE_SIZE verdicts.
+
+    sessions/.cache/bash-verdicts.log holds fixed-width `<key> <0|1>` lines in recency order,
+    so a lookup is one read and an rfind - no parsing. Hits that have drifted into the older
+    half are appended again, and the log is compacted to its newest keys once it doubles.
+    Commands under VERDICT_CACHE_MIN_LENGTH are always classified directly.
+    """
+    if cache_dir is None or len(command) < VERDICT_CACHE_MIN_LENGTH: return is_read_only(command, policy)
+
+    path = Path(cache_dir) / "bash-verdicts.log"
+    key = hashlib.sha1(f"{policy.fingerprint}\0{command}".encode("utf-8")).hexdigest()[:VERDICT_KEY].encode("ascii")
+    try:
+        with open(path, "rb") as f: log = f.read()
+    except OSError: log = b""
+
+    at = log.rfind(key)
+    if at >= 0 and log[at + VERDICT_KEY:at + VERDICT_LINE] in (b" 0\n", b" 1\n"):
+        verdict = log[at + VERDICT_KEY + 1] == ord("1")
+        if len(log) - at > VERDICT_CACHE_SIZE // 2 * VERDICT_LINE: _write_verdicts(path, log, log[at:at + VERDICT_LINE])
+        return verdict
+
+    verdict = is_read_only(command, policy)
+    _write_verdicts(path, log, key + (b" 1\n" if verdict else b" 0\n"))
+    return verdict
+##-##
+
+#-#
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+import os, re, time
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+try: from .sessions_cache import cache_file, read_json, write_json
+except ImportError: from sessions_cache import cache_file, read_json, write_json
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+# Working tree edits don't touch .git/index, so a cached status is trusted for at most this long
+GIT_STATUS_MAX_AGE = 5.0
+# `[submodule "name"]` headers and their `path = ...` lines in .gitmodules
+GITMODULES_ENTRY = re.compile(r'^\s*\[submodule\s+"(?P<name>[^"]*)"\]|^\s*path\s*=\s*(?P<path>.+?)\s*$', re.M)
+# read_head results per HEAD file, valid while their stamp (see _head_stamp) is unchanged
+_HEAD_CACHE: Dict[str, Tuple[List[Any], Dict[str, Any]]] = {}
+# repo_map results per root, revalidated against their stamp on every call
+_MAP_CACHE: Dict[str, Dict[str, Any]] = {}
+#-#
+
+"""
+╔═══════════════════════════════════════════════════════════╗
+║  █████╗██████╗██████╗      ██████╗██╗  ██╗██████╗ █████╗  ║
+║ ██╔═══╝╚═██╔═╝╚═██╔═╝      ╚═██╔═╝███╗ ██║██╔═══╝██╔══██╗ ║
+║ ██║      ██║    ██║          ██║  ████╗██║█████╗ ██║  ██║ ║
+║ ██║ ██╗  ██║    ██║          ██║  ██╔████║██╔══╝ ██║  ██║ ║
+║ ╚█████║██████╗  ██║        ██████╗██║╚███║██║    ╚█████╔╝ ║
+║  ╚════╝╚═════╝  ╚═╝        ╚═════╝╚═╝ ╚══╝╚═╝     ╚════╝  ║
+╚═══════════════════════════════════════════════════════════╝
+Branch, upstream and change counts from one `git status --porcelain=v2 --branch --untracked-files=no`
+
+The parsed status is cached under sessions/.cache, keyed on the mtimes of the
+repo's index, HEAD, current branch ref and upstream ref (plus packed-refs), so
+renders of an unchanged repo don't spawn git at all.
+
+read_head() answers "which branch is checked out" straight from HEAD and the
+refs (loose or packed) without spawning git at all.
+
+repo_map() lists the super-repo and every initialized submodule (recursively,
+from .gitmodules), cached until a .gitmodules changes or a submodule's .git
+appears or disappears, so a task's submodule names resolve without spawning git.
+
+Like sessions_cache, this module must not import shared_state.
+"""
+
+# ===== FUNCTIONS ===== #
+
+## ===== REPO LAYOUT ===== ##
+def git_dirs(repo_root: Path) -> Optional[Dict[str, Path]]:
+    """The repo's git dir and common dir, following `.git` files (worktrees, submodules)."""
+    dot_git = Path(repo_root) / ".git"
+    if dot_git.is_dir(): git_dir = dot_git
+    else:
+        try: content = dot_git.read_text(encoding="utf-8").strip()
+        except (OSError, UnicodeDecodeError): return None
+        if not content.startswith("gitdir:"): return None
+        git_dir = Path(content[len("gitdir:"):].strip())
+        if not git_dir.is_absolute(): git_dir = (Path(repo_root) / git_dir).resolve()
+    common_dir = git_dir
+    try: common_dir = (git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()).resolve()
+    except (OSError, UnicodeDecodeError): pass
+    return {"git_dir": git_dir, "common_dir": common_dir}
+
+def _mtime(path: Any) -> Optional[int]:
+    try: return os.stat(path).st_mtime_ns
+    except OSError: return None
+
+def status_stamp(repo_root: Path, status: Optional[Dict[str, Any]] = None) -> Optional[List[Any]]:
+    """mtimes of everything a parsed status depends on (the branch/upstream refs are taken from `status`)."""
+    dirs = git_dirs(repo_root)
+    if not dirs: return None
+    git_dir, common_dir = dirs["git_dir"], dirs["common_dir"]
+    refs = []
+    if status and status.get("branch"): refs.append(f"refs/heads/{status['branch']}")
+    if status and status.get("upstream"): refs += [f"refs/remotes/{status['upstream']}", f"refs/heads/{status['upstream']}"]
+    return [_mtime(git_dir / "index"), _mtime(git_dir / "HEAD"), _mtime(common_dir / "packed-refs")] + [[ref, _mtime(common_dir / ref)] for ref in refs]
+##-##
+
+## ===== REFS ===== ##
+def _read_text(path: Path) -> Optional[str]:
+    try: return path.read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError): return None
+
+def _packed_ref(common_dir: Path, ref: str) -> Optional[str]:
+    packed = _read_text(common_dir / "packed-refs")
+    for line in (packed or "").splitlines():
+        if line[:1] in ("#", "^"): continue
+        oid, _, name = line.partition(" ")
+        if name == ref: return oid
+    return None
+
+def resolve_ref(dirs: Dict[str, Path], ref: str) -> Optional[str]:
+    """Commit a ref points to, following symbolic refs; None for an unborn branch."""
+    for _ in range(5):
+        # Per-worktree refs (HEAD, bisect...) live in the git dir, shared ones in the common dir
+        content = _read_text(dirs["git_dir"] / ref)
+        if content is None and dirs["common_dir"] != dirs["git_dir"]: content = _read_text(dirs["common_dir"] / ref)
+        if content is None: return _packed_ref(dirs["common_dir"], ref)
+        if not content.startswith("ref:"): return content or None
+        ref = content[len("ref:"):].strip()
+    return None
+
+def _head_stamp(dirs: Dict[str, Path], head: Optional[Dict[str, Any]] = None) -> List[Any]:
+    ref = head.get("ref") if head else None
+    return [_mtime(dirs["git_dir"] / "HEAD"), _mtime(dirs["common_dir"] / "packed-refs"), _mtime(dirs["common_dir"] / ref) if ref else None]
+
+def read_head(repo_root: Path) -> Optional[Dict[str, Any]]:
+    """
+    The checked-out branch and commit, read from the repo's files instead of running git.
+
+    Returns:
+        ref (None when detached), branch (the ref without refs/heads/, like
+        `git branch --show-current`), oid (None on an unborn branch) - or None if
+        repo_root has no readable .git
+    """
+    dirs = git_dirs(repo_root)
+    if not dirs: return None
+    key = str(dirs["git_dir"])
+    cached = _HEAD_CACHE.get(key)
+    if cached and cached[0] == _head_stamp(dirs, cached[1]): return cached[1]
+
+    # Stamped before reading, so a concurrent checkout invalidates rather than hides
+    stamp = _head_stamp(dirs)
+    head = _read_text(dirs["git_dir"] / "HEAD")
+    if head is None: return None
+    if head.startswith("ref:"):
+        ref = head[len("ref:"):].strip()
+        stamp[2] = _mtime(dirs["common_dir"] / ref)
+        result = {"ref": ref, "branch": ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref, "oid": resolve_ref(dirs, ref)}
+    else: result = {"ref": None, "branch": None, "oid": head or None}
+    _HEAD_CACHE[key] = (stamp, result)
+    return result
+##-##
+
+## ===== REPO MAP ===== ##
+def _gitmodules(repo: Path) -> List[Tuple[str, str]]:
+    """(name, path) of every submodule declared in repo/.gitmodules."""
+    try: text = (repo / ".gitmodules").read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError): return []
+    entries, name = [], None
+    for match in GITMODULES_ENTRY.finditer(text):
+        if match.group("name") is not None: name = match.group("name")
+        elif name is not None: entries.append((name, match.group("path").strip('"')))
+    return entries
+
+def _map_stamp(root: str, rel: str) -> Any:
+    # .gitmodules by mtime; .git by existence only (a .git dir's mtime changes on every git command).
+    # Plain strings: this runs for every stamped path on every lookup, and pathlib dominated it
+    path = os.path.join(root, rel)
+    return _mtime(path) if rel.endswith(".gitmodules") else os.path.lexists(path)
+
+def build_repo_map(root: Path) -> Dict[str, Any]:
+    """
+    Walk .gitmodules from root down.
+
+    Returns:
+        repos: {path relative to root ("" for root itself): submodule name ("" for root)} for
+        every repo with a .git, stamp: [[relative path, _map_stamp]] of everything read
+    """
+    root = Path(root)
+    repos: Dict[str, str] = {}
+    stamp: List[List[Any]] = [[".git", _map_stamp(str(root), ".git")]]
+    if stamp[0][1]: repos[""] = ""
+
+    pending = [""]
+    while pending:
+        rel = pending.pop()
+        gitmodules = f"{rel}/.gitmodules" if rel else ".gitmodules"
+        stamp.append([gitmodules, _map_stamp(str(root), gitmodules)])
+        for name, path in _gitmodules(root / rel):
+            sub = Path(rel, path).as_posix()
+            stamp.append([f"{sub}/.git", _map_stamp(str(root), f"{sub}/.git")])
+            if stamp[-1][1]:
+                repos[sub] = name
+                pending.append(sub)
+    return {"repos": repos, "stamp": stamp}
+
+def repo_map(root: Path, cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """build_repo_map(root), reused (in process, then from cache_dir) while every stamped path is unchanged."""
+    key = str(root)
+    def fresh(cached: Any) -> bool:
+        return (isinstance(cached, dict) and isinstance(cached.get("repos"), dict) and isinstance(cached.get("stamp"), list)
+                and all(_map_stamp(key, rel) == value for rel, value in cached["stamp"]))
+
+    if fresh(cached := _MAP_CACHE.get(key)): return cached
+    path = cache_file(cache_dir, "repo-map", key) if cache_dir else None
+    if not (path and fresh(cached := read_json(path))):
+        cached = build_repo_map(root)
+        if path: write_json(path, cached)
+    _MAP_CACHE[key] = cached
+    return cached
+##-##
+
+## ===== STATUS ===== ##
+def parse_porcelain_v2(output: str) -> Dict[str, Any]:
+    """
+    Parse `git status --porcelain=v2 --branch` output.
+
+    Returns:
+        branch (None when detached), oid (None before the first commit), upstream,
+        ahead/behind (None without an upstream), and staged/unstaged counts matching
+        `git diff --cached --name-only` and `git diff --name-only`. Untracked files are not counted.
+    """
+    status: Dict[str, Any] = {"branch": None, "oid": None, "upstream": None, "ahead": None, "behind": None, "staged": 0, "unstaged": 0}
+    for line in output.split("\n"):
+        if line.startswith("# branch.head "):
+            head = line[len("# branch.head "):]
+            status["branch"] = head if head != "(detached)" else None
+        elif line.startswith("# branch.oid "):
+            oid = line[len("# branch.oid "):]
+            status["oid"] = oid if oid != "(initial)" else None
+        elif line.startswith("# branch.upstream "): status["upstream"] = line[len("# branch.upstream "):]
+        elif line.startswith("# branch.ab "):
+            ahead, behind = line[len("# branch.ab "):].split()
+            status["ahead"], status["behind"] = int(ahead), abs(int(behind))
+        elif line[:2] in ("1 ", "2 "):
+            xy = line[2:4]
+            if xy[0] != ".": status["staged"] += 1
+            if xy[1] != ".": status["unstaged"] += 1
+        elif line.startswith("u "):
+            # Unmerged paths show up in both diffs
+            status["staged"] += 1
+            status["unstaged"] += 1
+    return status
+
+def git_status(repo_root: Path, cache_dir: Optional[Path] = None, max_age: float = GIT_STATUS_MAX_AGE) -> Optional[Dict[str, Any]]:
+    """
+    Parsed porcelain v2 status for the repo at repo_root, or None if git failed.
+
+    A cached result is reused while its stamp (see status_stamp) is unchanged and it is younger than max_age.
+    """
+    repo_root = Path(repo_root)
+    path = cache_file(cache_dir, "git", str(repo_root.resolve())) if cache_dir else None
+    cached = read_json(path) if path else None
+    if isinstance(cached, dict) and time.time() - cached.get("checked", 0) < max_age:
+        if cached.get("stamp") is not None and cached["stamp"] == status_stamp(repo_root, cached.get("status")): return cached.get("status")
+
+    import subprocess  # Deferred: the statusline render cache imports this module on its hot path
+    try:
+        output = subprocess.check_output(
+            # Untracked files aren't counted, and walking the worktree for them dominates in large repos
+            ["git", "-C", str(repo_root.resolve()), "status", "--porcelain=v2", "--branch", "--untracked-files=no"],
+            stderr=subprocess.PIPE, encoding="utf-8", errors="replace")
+        status = parse_porcelain_v2(output)
+    except (subprocess.CalledProcessError, OSError, ValueError): return None
+
+    # Stamped after the call: `git status` may refresh the index itself
+    if path: write_json(path, {"checked": time.time(), "stamp": status_stamp(repo_root, status), "status": status})
+    return status
+##-##
+
+#-#
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+# Every hook imports this module before it can relay, so import-time work stays at os/sys/json
+from __future__ import annotations
+import json, os, sys
+TYPE_CHECKING = False
+if TYPE_CHECKING: from typing import Any, Dict, Optional, Tuple
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+if (p := os.environ.get("CLAUDE_PROJECT_DIR")): SESSIONS_DIR = os.path.abspath(os.path.join(p, "sessions"))
+else: SESSIONS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOOKS_DIR = os.path.join(SESSIONS_DIR, "hooks")
+PID_FILE = os.path.join(SESSIONS_DIR, ".hookd.pid")
+
+# Marker set inside forked workers so hooks run by the daemon never relay back to it
+DAEMON_ENV = "CC_SESSIONS_HOOKD"
+IDLE_TIMEOUT = 3600.0
+CONNECT_TIMEOUT = 30.0
+#-#
+
+"""
+╔════════════════════════════════════════════════════════════════════════════════════════╗
+║ ██╗  ██╗ █████╗  █████╗ ██╗  ██╗      █████╗  █████╗ ██████╗███╗  ███╗ █████╗ ██╗  ██╗ ║
+║ ██║  ██║██╔══██╗██╔══██╗██║ ██╔╝      ██╔═██╗██╔══██╗██╔═══╝████╗████║██╔══██╗███╗ ██║ ║
+║ ███████║██║  ██║██║  ██║█████╔╝       ██║ ██║███████║█████╗ ██╔███║██║██║  ██║████╗██║ ║
+║ ██╔══██║██║  ██║██║  ██║██╔═██╗       ██║ ██║██╔══██║██╔══╝ ██║╚══╝██║██║  ██║██╔████║ ║
+║ ██║  ██║╚█████╔╝╚█████╔╝██║  ██╗      █████╔╝██║  ██║██████╗██║    ██║╚█████╔╝██║╚███║ ║
+║ ╚═╝  ╚═╝ ╚════╝  ╚════╝ ╚═╝  ╚═╝      ╚════╝ ╚═╝  ╚═╝╚═════╝╚═╝    ╚═╝ ╚════╝ ╚═╝ ╚══╝ ║
+╚════════════════════════════════════════════════════════════════════════════════════════╝
+Per-project hook daemon
+
+Optional long-lived process that keeps the interpreter, shared_state and the
+compiled hook scripts warm. Every hook script starts with relay_to_daemon():
+- If sessions/.hookd.sock is not there, it returns and the hook runs in-process
+- Otherwise the hook's stdin, cwd, argv and environment are sent to the daemon
+- The daemon forks a worker that runs the hook exactly as `python <hook>.py` would
+- The worker's stdout, stderr and exit code are relayed back byte-for-byte
+
+Forking per request keeps hooks isolated from each other (module globals, sys.exit,
+os.environ) while only paying for interpreter startup and imports once.
+
+Usage:
+    python sessions/hooks/hook_daemon.py start|stop|status|serve
+    sessions daemon start|stop|status
+"""
+
+# ===== FUNCTIONS ===== #
+
+## ===== HELPERS ===== ##
+def socket_path() -> Optional[str]:
+    """
+    Unix socket location. When the project path is too long for AF_UNIX it falls back to a
+    per-user private directory; None if no such directory can be had.
+    """
+    preferred = os.path.join(SESSIONS_DIR, ".hookd.sock")
+    if len(preferred) < 100: return preferred
+    if (runtime_dir := _private_dir()) is None: return None
+    import hashlib
+    digest = hashlib.sha1(SESSIONS_DIR.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(runtime_dir, f"cc-sessions-{digest}.sock")
+
+def _private_dir() -> Optional[str]:
+    """$XDG_RUNTIME_DIR, else <tmp>/cc-sessions-<uid> (created 0700) - only if it is ours and closed to everyone else."""
+    if (runtime_dir := os.environ.get("XDG_RUNTIME_DIR")): path = runtime_dir
+    else:
+        path = os.path.join(os.environ.get("TMPDIR") or "/tmp", f"cc-sessions-{os.getuid()}")
+        try: os.mkdir(path, 0o700)
+        except FileExistsError: pass
+        except OSError: return None
+    import stat
+    try: st = os.lstat(path)
+    except OSError: return None
+    # Another user can pre-create a predictable /tmp name: refuse anything we don't own exclusively
+    return path if stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077 else None
+
+def _owned(path: str) -> bool:
+    """path (not followed if it is a symlink) belongs to this user."""
+    try: return os.lstat(path).st_uid == os.getuid()
+    except (OSError, AttributeError): return False  # AttributeError: no getuid() (Windows)
+
+def is_supported() -> bool:
+    """The daemon needs Unix sockets and fork()."""
+    import socket
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "fork")
+
+def _recv_all(sock) -> bytes:
+    chunks = []
+    while True:
+        data = sock.recv(65536)
+        if not data: break
+        chunks.append(data)
+    return b"".join(chunks)
+
+def _request(header: Dict[str, Any], payload: bytes = b"", timeout: Optional[float] = CONNECT_TIMEOUT) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Send one request to the daemon. Returns (header, body) or None if the daemon is unreachable.
+
+    Requests carry the hook's environment and its verdict comes back unchecked, so only a socket
+    owned by this user, in a directory owned by this user, is ever connected to.
+    """
+    import socket
+    path = socket_path()
+    if not hasattr(socket, "AF_UNIX") or path is None or not (_owned(path) and _owned(os.path.dirname(path))): return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(header).encode("utf-8") + b"\n" + payload)
+        sock.shutdown(socket.SHUT_WR)
+        response = _recv_all(sock)
+    except OSError: return None
+    finally: sock.close()
+    head, sep, body = response.partition(b"\n")
+    if not sep: return None
+    try: return json.loads(head.decode("utf-8")), body
+    except (json.JSONDecodeError, UnicodeDecodeError): return None
+##-##
+
+## ===== CLIENT ===== ##
+def relay_to_daemon(script_path: str) -> None:
+    """Run this hook invocation through the daemon if one is listening.
+
+    Returns normally when there is no daemon (or it drops the request) so the
+    caller falls through to its in-process implementation. Otherwise writes the
+    daemon's stdout/stderr and exits with the hook's exit code.
+    """
+    if os.environ.get(DAEMON_ENV) == str(os.getpid()): return
+    if (path := socket_path()) is None or not os.path.exists(path): return
+
+    payload = sys.stdin.buffer.read()
+    header = {
+        "op": "run",
+        "script": os.path.abspath(script_path),
+        "cwd": os.getcwd(),
+        "argv": sys.argv,
+        "env": dict(os.environ),
+    }
+    result = _request(header, payload, timeout=None)
+    if result is None:
+        # Daemon went away mid-request - replay stdin for the in-process fallback
+        import io
+        sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding=sys.stdin.encoding or "utf-8")
+        return
+
+    meta, body = result
+    out_len = meta.get("stdout", 0)
+    sys.stdout.buffer.write(body[:out_len]); sys.stdout.buffer.flush()
+    sys.stderr.buffer.write(body[out_len:]); sys.stderr.buffer.flush()
+    sys.exit(meta.get("code", 0))
+##-##
+
+## ===== SERVER ===== ##
+def _exit_code(exc: SystemExit) -> int:
+    """Mirror the interpreter's handling of SystemExit.code."""
+    if exc.code is None: return 0
+    if isinstance(exc.code, int): return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+def _run_worker(conn, code, header: Dict[str, Any], payload: bytes) -> None:
+    """Forked child: execute one hook script with the client's process context, send the result, exit."""
+    import builtins, io
+    try:
+        os.chdir(header.get("cwd") or os.path.dirname(SESSIONS_DIR))
+        os.environ.clear(); os.environ.update(header.get("env") or {})
+        os.environ[DAEMON_ENV] = str(os.getpid())
+        sys.argv = header.get("argv") or [header["script"]]
+
+        out_buf, err_buf = io.BytesIO(), io.BytesIO()
+        sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+        sys.stdout = io.TextIOWrapper(out_buf, encoding="utf-8", write_through=True)
+        sys.stderr = io.TextIOWrapper(err_buf, encoding="utf-8", errors="backslashreplace", write_through=True)
+
+        rc = 0
+        try: exec(code, {"__name__": "__main__", "__file__": header["script"], "__builtins__": builtins})
+        except SystemExit as e: rc = _exit_code(e)
+        except BaseException: sys.excepthook(*sys.exc_info()); rc = 1  # As the interpreter would
+        sys.stdout.flush(); sys.stderr.flush()
+
+        out, err = out_buf.getvalue(), err_buf.getvalue()
+        conn.sendall(json.dumps({"code": rc, "stdout": len(out)}).encode("utf-8") + b"\n" + out + err)
+    finally:
+        _close_quietly(conn)
+        os._exit(0)
+
+def _close_quietly(conn) -> None:
+    try: conn.close()
+    except OSError: pass
+
+def _allowed_script(script: str) -> bool:
+    """Only hooks shipped in this sessions directory may be executed."""
+    return script.endswith(".py") and os.path.dirname(script) in (HOOKS_DIR, SESSIONS_DIR)
+
+def serve(idle_timeout: float = IDLE_TIMEOUT) -> None:
+    """Accept hook requests until stopped, idle for idle_timeout seconds, or shared code changes."""
+    import signal, socket, time
+
+    if not is_supported(): print("Hook daemon requires Unix sockets and fork()", file=sys.stderr); sys.exit(1)
+
+    # Warm everything the hooks import so forked workers start hot
+    project_root = os.path.dirname(SESSIONS_DIR)
+    os.environ.setdefault("CLAUDE_PROJECT_DIR", project_root)
+    for entry in (project_root, HOOKS_DIR):
+        if entry not in sys.path: sys.path.insert(0, entry)
+    import shared_state, bash_policy, git_info  # noqa: F401
+    try: import sessions.hooks.shared_state  # noqa: F401  (statusline import path)
+    except ImportError: pass
+
+    # Every module the warm-up loaded from sessions/hooks (helpers like sessions_cache included) plus this one
+    hooks_dir = os.path.realpath(HOOKS_DIR)
+    loaded = {os.path.realpath(module.__file__) for module in list(sys.modules.values()) if getattr(module, "__file__", None)}
+    watched = sorted({path for path in loaded if os.path.dirname(path) == hooks_dir} | {os.path.realpath(__file__)})
+    def fingerprint(): return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else 0 for p in watched)
+    started_fp = fingerprint()
+
+    code_cache: Dict[str, Tuple[int, Any]] = {}
+    def compiled(script: str):
+        mtime = os.stat(script).st_mtime_ns
+        hit = code_cache.get(script)
+        if hit and hit[0] == mtime: return hit[1]
+        with open(script, "rb") as f: code = compile(f.read(), script, "exec")
+        code_cache[script] = (mtime, code)
+        return code
+
+    if (path := socket_path()) is None:
+        print("Hook daemon: no private directory for the socket (check $XDG_RUNTIME_DIR / $TMPDIR)", file=sys.stderr); sys.exit(1)
+    _unlink_quietly(path)
+    old_umask = os.umask(0o077)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try: server.bind(path)
+    finally: os.umask(old_umask)
+    server.listen(64)
+    server.settimeout(idle_timeout)
+    with open(PID_FILE, "w") as f: f.write(str(os.getpid()))
+
+    def shutdown(*_):
+        server.close()
+        _unlink_quietly(path)
+        try:
+            with open(PID_FILE) as f: ours = f.read().strip() == str(os.getpid())
+        except OSError: ours = False
+        if ours: _unlink_quietly(PID_FILE)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # auto-reap workers
+
+    started, served = time.time(), 0
+    while True:
+        try: conn, _ = server.accept()
+        except socket.timeout: shutdown()
+        except InterruptedError: continue
+        try:
+            conn.settimeout(CONNECT_TIMEOUT)
+            head, _, payload = _recv_all(conn).partition(b"\n")
+            header = json.loads(head.decode("utf-8"))
+            conn.settimeout(None)
+        except (OSError, ValueError):
+            _close_quietly(conn); continue
+
+        op = header.get("op")
+        if op == "ping":
+            status = {"pid": os.getpid(), "uptime": round(time.time() - started, 1), "served": served, "socket": path}
+            conn.sendall(json.dumps(status).encode("utf-8") + b"\n")
+            _close_quietly(conn); continue
+        if op == "stop":
+            conn.sendall(b'{"stopped": true}\n'); _close_quietly(conn)
+            shutdown()
+        if op != "run" or not _allowed_script(header.get("script", "")):
+            _close_quietly(conn); continue
+
+        if fingerprint() != started_fp:
+            # Shared code was upgraded underneath us: drop this request (client runs it in-process) and restart fresh
+            _close_quietly(conn); server.close(); _unlink_quietly(path)
+            os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), "serve"])
+
+        try: code = compiled(header["script"])
+        except (OSError, SyntaxError):
+            _close_quietly(conn); continue
+
+        served += 1
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            _run_worker(conn, code, header, payload)
+        _close_quietly(conn)
+
+def _unlink_quietly(path: str) -> None:
+    try: os.unlink(path)
+    except OSError: pass
+##-##
+
+## ===== LIFECYCLE ===== ##
+def daemon_status() -> Optional[Dict[str, Any]]:
+    """Ping the daemon. Returns its status dict, or None if it is not running."""
+    result = _request({"op": "ping"}, timeout=2.0)
+    return result[0] if result else None
+
+def start_daemon(wait: float = 3.0) -> Dict[str, Any]:
+    """Spawn a detached daemon for this project (no-op if one is already running)."""
+    import subprocess, time
+    if not is_supported(): raise RuntimeError("The hook daemon requires Unix sockets and fork() (not available on this platform)")
+    if (status := daemon_status()): return {"started": False, **status}
+    if socket_path() is None: raise RuntimeError("No private directory for the hook daemon socket (check $XDG_RUNTIME_DIR / $TMPDIR)")
+
+    env = dict(os.environ)
+    env["CLAUDE_PROJECT_DIR"] = os.path.dirname(SESSIONS_DIR)
+    env.pop(DAEMON_ENV, None)
+    subprocess.Popen([sys.executable, os.path.join(HOOKS_DIR, "hook_daemon.py"), "serve"],
+                     cwd=os.path.dirname(SESSIONS_DIR), env=env, start_new_session=True, close_fds=True,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if (status := daemon_status()): return {"started": True, **status}
+        time.sleep(0.05)
+    raise RuntimeError("Hook daemon did not come up in time")
+
+def stop_daemon() -> bool:
+    """Ask a running daemon to exit. Returns True if one was stopped."""
+    if _request({"op": "stop"}, timeout=2.0) is None:
+        # Nothing listening - clear a stale socket of ours so hooks stop probing it
+        if (path := socket_path()) is not None and _owned(path): _unlink_quietly(path)
+        return False
+    return True
+##-##
+
+#-#
+
+# ===== EXECUTION ===== #
+
+if __name__ == "__main__":
+    action = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if action == "serve": serve()
+    elif action == "start": print(json.dumps(start_daemon()))
+    elif action == "stop": print("Hook daemon stopped" if stop_daemon() else "Hook daemon was not running")
+    elif action == "status": print(json.dumps(daemon_status() or {"running": False}))
+    else: print("Usage: hook_daemon.py start|stop|status|serve", file=sys.stderr); sys.exit(2)
+
+#-#
@@ -2,11 +2,16 @@
 
 # ===== IMPORTS ===== #
 
+## ===== DAEMON HANDOFF ===== ##
+# Hand the whole invocation to the hook daemon when one is running (see hook_daemon.py)
+from hook_daemon import relay_to_daemon
+relay_to_daemon(__file__)
+##-##
+
 ## ===== STDLIB ===== ##
 import sys
 import json
 import os
-import platform
 from datetime import datetime
 from pathlib import Path
 ##-##
@@ -114,7 +119,7 @@ if not mode:
 
 #!> 2. Output deterministic instructions for Claude to begin kickstart via API
 # Detect OS for correct sessions command
-is_windows = platform.system() == "Windows"
+is_windows = sys.platform == "win32"
 sessions_cmd = "sessions/bin/sessions.bat" if is_windows else "sessions/bin/sessions"
 
 begin_cmd = f'{sessions_cmd} kickstart subagents' if mode == 'subagents' else f'{sessions_cmd} kickstart full'
@@ -2,9 +2,14 @@
 
 # ===== IMPORTS ===== #
 
+## ===== DAEMON HANDOFF ===== ##
+# Hand the whole invocation to the hook daemon when one is running (see hook_daemon.py)
+from hook_daemon import relay_to_daemon
+relay_to_daemon(__file__)
+##-##
+
 ## ===== STDLIB ===== ##
-from importlib.metadata import version, PackageNotFoundError
-import requests, json, sys, shutil, os, subprocess, platform
+import json, sys, shutil, os
 from typing import Dict, List, Optional, Tuple
 ##-##
 
@@ -12,7 +17,7 @@ from typing import Dict, List, Optional, Tuple
 ##-##
 
 ## ===== LOCAL ===== ##
-from shared_state import edit_state, PROJECT_ROOT, load_config, SessionsProtocol, get_task_file_path, is_directory_task
+from shared_state import edit_state, hook_transaction, package_version, PROJECT_ROOT, load_config, SessionsProtocol, get_task_file_path, is_directory_task, load_task_index, task_index_groups
 ##-##
 
 #-#
@@ -66,153 +71,51 @@ Initializes session state and loads task context:
 
 # ===== FUNCTIONS ===== #
 
-def parse_index_file(index_path) -> Optional[Tuple[Dict, List[str]]]:
-    """Parse an index file and extract metadata and task lines."""
-    if not index_path.exists():
-        return None
-
-    try:
-        content = index_path.read_text()
-        lines = content.split('\n')
-    except (IOError, UnicodeDecodeError):
-        return None
-
-    # Extract frontmatter using simple string parsing (like task files)
-    metadata = {}
-    if lines and lines[0] == '---':
-        for i, line in enumerate(lines[1:], 1):
-            if line == '---':
-                break
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
-
-    # Extract task lines (those starting with - `)
-    task_lines = []
-    for line in lines:
-        if line.strip().startswith('- `'):
-            task_lines.append(line.strip())
-
-    return metadata, task_lines
-
 def list_open_tasks_grouped() -> str:
     """List open tasks grouped by their indexes."""
-    tasks_dir = PROJECT_ROOT / 'sessions' / 'tasks'
-    indexes_dir = tasks_dir / 'indexes'
-
-    # Helper to get status from a task file
-    def get_task_status(task_path):
-        try:
-            with task_path.open('r', encoding='utf-8') as f:
-                lines = f.readlines()[:10]
-            for line in lines:
-                if line.startswith('status:'):
-                    status = line.split(':')[1].strip()
-                    if status != 'complete':
-                        return status
-        except (IOError, UnicodeDecodeError):
-            pass
-        return None
+    # Everything below comes from the cached task index (only changed files are re-read)
+    index = load_task_index()
+    task_index = index["tasks"]
+    def open_status(task):
+        return task["status"] if task["status"] != 'complete' else None
 
     # Step 1: Collect all .md files directly under tasks/ (exclude TEMPLATE.md)
     file_tasks_map = {}  # name -> status
-    if tasks_dir.exists():
-        for file in sorted(tasks_dir.glob('*.md')):
-            if file.name != 'TEMPLATE.md':
-                status = get_task_status(file)
-                if status:
-                    file_tasks_map[file.name] = status
+    for name, task in sorted(task_index.items()):
+        if task["kind"] == "file" and (status := open_status(task)): file_tasks_map[name] = status
 
     # Step 2: Collect all subdirectories (exclude indexes/ and done/)
     dir_tasks_map = {}  # dirname -> {status, subtasks: []}
-    if tasks_dir.exists():
-        for task_dir in sorted([d for d in tasks_dir.iterdir() if d.is_dir() and d.name not in ['done', 'indexes']]):
-            readme_file = task_dir / 'README.md'
-            if readme_file.exists():
-                status = get_task_status(readme_file)
-                if status:
-                    dir_tasks_map[task_dir.name] = {'status': status, 'subtasks': []}
-
-                    # Collect subtasks
-                    for subtask in sorted(task_dir.glob('*.md')):
-                        if subtask.name not in ['TEMPLATE.md', 'README.md']:
-                            subtask_status = get_task_status(subtask)
-                            if subtask_status:
-                                dir_tasks_map[task_dir.name]['subtasks'].append({
-                                    'name': f"{task_dir.name}/{subtask.name}",
-                                    'status': subtask_status
-                                })
-
-    # Step 3: Parse index files
+    for name, task in sorted(task_index.items()):
+        if task["kind"] != "dir" or not task["readme"] or not (status := open_status(task)): continue
+        dir_tasks_map[name] = {'status': status, 'subtasks': []}
+
+        # Collect subtasks
+        for subtask_name in task["subtasks"]:
+            if (subtask_status := open_status(task_index[subtask_name])):
+                dir_tasks_map[name]['subtasks'].append({'name': subtask_name, 'status': subtask_status})
+
+    # Step 3: Group index files by their declared index id (refs already resolved in one pass)
     index_info = {}
-    if indexes_dir.exists():
-        for index_file in sorted(indexes_dir.glob('*.md')):
-            result = parse_index_file(index_file)
-            if result:
-                metadata, task_lines = result
-                if metadata and 'index' in metadata:
-                    index_id = metadata['index']
-                    index_info[index_id] = {
-                        'name': metadata.get('name', index_id),
-                        'description': metadata.get('description', ''),
-                        'tasks': []
-                    }
-
-                    # Extract task names from the lines
-                    for line in task_lines:
-                        if '`' in line:
-                            try:
-                                start = line.index('`') + 1
-                                end = line.index('`', start)
-                                task = line[start:end]
-                                index_info[index_id]['tasks'].append(task)
-                            except ValueError:
-                                continue
-
-    # Step 4: For each index, match against file tasks
-    for index_id in index_info:
-        valid_tasks = []
-        for task in index_info[index_id]['tasks']:
+    for group in task_index_groups(index):
+        if 'index' not in group['metadata']: continue
+        info = index_info.setdefault(group['id'], {'tasks': [], 'refs': []})
+        info.update(name=group['name'], description=group['description'])
+        info['refs'] += [entry['task'] for entry in group['tasks'] if entry['task']]
+
+    # Step 4: For each index, claim its file tasks
+    for info in index_info.values():
+        for task in info['refs']:
             if task in file_tasks_map:
-                valid_tasks.append({'name': task, 'status': file_tasks_map[task]})
-                del file_tasks_map[task]  # Remove from unindexed
-        index_info[index_id]['tasks'] = valid_tasks
-
-    # Step 5: For each index, match against directory tasks and expand
-    for index_id in index_info:
-        expanded_tasks = []
-        for task in index_info[index_id]['tasks']:
-            expanded_tasks.append(task)  # Keep existing file tasks
-
-        # Re-parse to get original task list for this index
-        original_tasks = []
-        if indexes_dir.exists():
-            for index_file in sorted(indexes_dir.glob('*.md')):
-                result = parse_index_file(index_file)
-                if result:
-                    metadata, task_lines = result
-                    if metadata and metadata.get('index') == index_id:
-                        for line in task_lines:
-                            if '`' in line:
-                                try:
-                                    start = line.index('`') + 1
-                                    end = line.index('`', start)
-                                    original_tasks.append(line[start:end])
-                                except ValueError:
-                                    continue
-
-        for task in original_tasks:
-            # Check if it's a directory reference (with or without trailing /)
-            dir_name = task.rstrip('/')
-            if dir_name in dir_tasks_map:
-                # Add the directory itself with / suffix
-                expanded_tasks.append({'name': f"{dir_name}/", 'status': dir_tasks_map[dir_name]['status']})
-                # Add all subtasks
-                for subtask in dir_tasks_map[dir_name]['subtasks']:
-                    expanded_tasks.append(subtask)
-                del dir_tasks_map[dir_name]  # Remove from unindexed
-
-        index_info[index_id]['tasks'] = expanded_tasks
+                info['tasks'].append({'name': task, 'status': file_tasks_map.pop(task)})
+
+    # Step 5: For each index, claim its directory tasks and expand their subtasks
+    for info in index_info.values():
+        for task in info['refs']:
+            if task in dir_tasks_map:
+                data = dir_tasks_map.pop(task)
+                info['tasks'].append({'name': f"{task}/", 'status': data['status']})
+                info['tasks'].extend(data['subtasks'])
 
     # Step 6: Build output
     output = "No active task set. Available tasks:\n\n"
@@ -253,47 +156,52 @@ def list_open_tasks_grouped() -> str:
 #-#
 
 # ===== EXECUTION ===== #
-
-#!> 1. Clear flags and todos for new session
-with edit_state() as s: 
-    s.flags.clear_flags()
-    s.todos.clear_active()
-    restored = s.todos.restore_stashed()
-    STATE = s
-context += "Cleared session flags and active todos for new session.\n\n"
-
-if restored:
-    context += f"""Restored {restored} stashed todos from previous session:\n\n{STATE.todos.active}\n\nTo clear, use `cd .claude/hooks && python -c \"from shared_state import edit_state; with edit_state() as s: s.todos.clear_stashed()\"`\n\n"""
-#!<
-
-#!> 2. Nuke transcripts dir
-transcripts_dir = sessions_dir / 'transcripts'
-if transcripts_dir.exists(): shutil.rmtree(transcripts_dir, ignore_errors=True)
-#!<
-
-#!> 3. Load current task or list available tasks
-# Check for active task
-if (task_file := STATE.current_task.file_path) and task_file.exists():
-    # Check if task status is pending and update to in-progress
-    task_content = task_file.read_text()
-    task_updated = False
-
-    # Parse task frontmatter to check status
-    if task_content.startswith('---'):
-        lines = task_content.split('\n')
-        for i, line in enumerate(lines[1:], 1):
-            if line.startswith('---'):
-                break
-            if line.startswith('status: pending'):
-                lines[i] = 'status: in-progress'
-                task_updated = True
-                # Write back the updated content
-                task_file.write_text('\n'.join(lines))
-                task_content = '\n'.join(lines)
-                break
-
-        # Output the full task state
-        context += f"""Current task state:
+with hook_transaction():  # Session reset and update check land as one write
+
+    #!> 1. Clear flags and todos for new session
+    with edit_state() as s: 
+        s.flags.clear_flags()
+        s.todos.clear_active()
+        restored = s.todos.restore_stashed()
+        STATE = s
+    context += "Cleared session flags and active todos for new session.\n\n"
+
+    if restored:
+        context += f"""Restored {restored} stashed todos from previous session:\n\n{STATE.todos.active}\n\nTo clear, use `cd .claude/hooks && python -c \"from shared_state import edit_state; with edit_state() as s: s.todos.clear_stashed()\"`\n\n"""
+    #!<
+
+    #!> 2. Nuke transcript views (the .store snapshot cache is size-capped and kept)
+    transcripts_dir = sessions_dir / 'transcripts'
+    if transcripts_dir.exists():
+        for item in transcripts_dir.iterdir():
+            if item.name.startswith('.'): continue
+            if item.is_dir(): shutil.rmtree(item, ignore_errors=True)
+            else: item.unlink()
+    #!<
+
+    #!> 3. Load current task or list available tasks
+    # Check for active task
+    if (task_file := STATE.current_task.file_path) and task_file.exists():
+        # Check if task status is pending and update to in-progress
+        task_content = task_file.read_text()
+        task_updated = False
+
+        # Parse task frontmatter to check status
+        if task_content.startswith('---'):
+            lines = task_content.split('\n')
+            for i, line in enumerate(lines[1:], 1):
+                if line.startswith('---'):
+                    break
+                if line.startswith('status: pending'):
+                    lines[i] = 'status: in-progress'
+                    task_updated = True
+                    # Write back the updated content
+                    task_file.write_text('\n'.join(lines))
+                    task_content = '\n'.join(lines)
+                    break
+
+            # Output the full task state
+            context += f"""Current task state:
 ```json
 {json.dumps(STATE.current_task.task_state, indent=2)}
 ```
@@ -305,7 +213,7 @@ Loading task file: {STATE.current_task.file}
 
 """
 
-    context += f"""Since you are resuming an in-progress task, follow these instructions:
+        context += f"""Since you are resuming an in-progress task, follow these instructions:
 
     1. Analyze the task requirements and work completed thoroughly
     2. Analyze any next steps itemized in the task file and, if necessary, ask any questions from the user for clarification.
@@ -345,88 +253,90 @@ After completion of the last task in any todo list:
 - *Do not* try to run any write-based tools (you will be automatically put into discussion mode)
 - Repeat todo proposal and approval workflow for any additional write/edit-based work"""
 
-else:
-    context += list_open_tasks_grouped()
-#!<
-
-#!> 4. Check cc-sessions version with flag-based caching
-try: current_version = version('cc-sessions')
-except PackageNotFoundError: current_version = None
-
-# Check update flag in metadata
-update_flag = STATE.metadata.get('update_available')
-latest_version = STATE.metadata.get('latest_version')
-
-# If flag doesn't exist, check PyPI
-if update_flag is None and current_version:
-    try:
-        resp = requests.get("https://pypi.org/pypi/cc-sessions/json", timeout=2)
-        if resp.ok:
-            latest_version = resp.json().get("info", {}).get("version")
-
-            # Set flag based on semantic version comparison
-            def version_tuple(v):
-                """Convert version string to tuple for comparison."""
-                try:
-                    return tuple(map(int, v.split('.')))
-                except (ValueError, AttributeError):
-                    return (0, 0, 0)
-
-            is_newer = version_tuple(latest_version) > version_tuple(current_version)
-
-            with edit_state() as s:
-                s.metadata['current_version'] = current_version
-                s.metadata['latest_version'] = latest_version
-                s.metadata['update_available'] = is_newer
-                update_flag = s.metadata['update_available']
-    except requests.RequestException:
-        pass
-
-# Display update notification if flag is True
-if update_flag and latest_version and current_version:
-    # Detect OS for correct sessions command
-    is_windows = platform.system() == "Windows"
-    sessions_cmd = "sessions/bin/sessions.bat" if is_windows else "sessions/bin/sessions"
-
-    # Show manual update message
-    # Extract first few lines from CHANGELOG for the latest version
-    try:
-        changelog_path = PROJECT_ROOT.parent / 'CHANGELOG.md'
-        if changelog_path.exists():
-            with open(changelog_path, 'r') as f:
-                content = f.read()
-                # Find the latest version section
-                import re
-                version_pattern = rf'##\s*\[{re.escape(latest_version)}\]'
-                match = re.search(version_pattern, content)
-                if match:
-                    # Extract until next ## or end
-                    start = match.end()
-                    next_heading = content.find('\n## ', start)
-                    section = content[start:next_heading if next_heading != -1 else start+500].strip()
-                    # Get all lines of changes
-                    lines = [l.strip() for l in section.split('\n') if l.strip() and l.strip().startswith('-')]
-                    changelog_excerpt = '\n'.join(f"  {l}" for l in lines)
-                else:
-                    changelog_excerpt = None
-        else:
+    else:
+        context += list_open_tasks_grouped()
+    #!<
+
+    #!> 4. Check cc-sessions version with flag-based caching
+    current_version = package_version()
+
+    # Check update flag in metadata
+    update_flag = STATE.metadata.get('update_available')
+    latest_version = STATE.metadata.get('latest_version')
+
+    # If flag doesn't exist, check PyPI
+    if update_flag is None and current_version:
+        try:
+            import requests  # Only needed until the update flag is cached in state
+            resp = requests.get("https://pypi.org/pypi/cc-sessions/json", timeout=2)
+            if resp.ok:
+                latest_version = resp.json().get("info", {}).get("version")
+
+                # Set flag based on semantic version comparison
+                def version_tuple(v):
+                    """Convert version string to tuple for comparison."""
+                    try:
+                        return tuple(map(int, v.split('.')))
+                    except (ValueError, AttributeError):
+                        return (0, 0, 0)
+
+                is_newer = version_tuple(latest_version) > version_tuple(current_version)
+
+                with edit_state() as s:
+                    s.metadata['current_version'] = current_version
+                    s.metadata['latest_version'] = latest_version
+                    s.metadata['update_available'] = is_newer
+                    update_flag = s.metadata['update_available']
+        except ImportError:
+            pass
+        except requests.RequestException:
+            pass
+
+    # Display update notification if flag is True
+    if update_flag and latest_version and current_version:
+        # Detect OS for correct sessions command
+        is_windows = sys.platform == "win32"
+        sessions_cmd = "sessions/bin/sessions.bat" if is_windows else "sessions/bin/sessions"
+
+        # Show manual update message
+        # Extract first few lines from CHANGELOG for the latest version
+        try:
+            changelog_path = PROJECT_ROOT.parent / 'CHANGELOG.md'
+            if changelog_path.exists():
+                with open(changelog_path, 'r') as f:
+                    content = f.read()
+                    # Find the latest version section
+                    import re
+                    version_pattern = rf'##\s*\[{re.escape(latest_version)}\]'
+                    match = re.search(version_pattern, content)
+                    if match:
+                        # Extract until next ## or end
+                        start = match.end()
+                        next_heading = content.find('\n## ', start)
+                        section = content[start:next_heading if next_heading != -1 else start+500].strip()
+                        # Get all lines of changes
+                        lines = [l.strip() for l in section.split('\n') if l.strip() and l.strip().startswith('-')]
+                        changelog_excerpt = '\n'.join(f"  {l}" for l in lines)
+                    else:
+                        changelog_excerpt = None
+            else:
+                changelog_excerpt = None
+        except:
             changelog_excerpt = None
-    except:
-        changelog_excerpt = None
 
-    context += f"""
+        context += f"""
 [IMPORTANT: Update Available]
 
 A new version of cc-sessions is available: {current_version} → {latest_version}
 
 """
-    if changelog_excerpt:
-        context += f"""What's new in this version:
+        if changelog_excerpt:
+            context += f"""What's new in this version:
 {changelog_excerpt}
 
 """
 
-    context += f"""**BEFORE STARTING ANY WORK:**
+        context += f"""**BEFORE STARTING ANY WORK:**
 You must stop and ask the user about this update first.
 
 First, ask the user: "I see there's a new version of cc-sessions available ({latest_version}) with several new features. Would you like to update now? The installer will guide you through any new configuration options."
@@ -444,20 +354,20 @@ If NO:
 This notification will appear on every session start until they update or suppress it.
 
 """
-#!<
+    #!<
 
-#-#
+    #-#
 
-# Skip session start hook in CI environments
-if is_ci_environment():
-    sys.exit(0)
+    # Skip session start hook in CI environments
+    if is_ci_environment():
+        sys.exit(0)
 
-output = {
-    "hookSpecificOutput": {
-        "hookEventName": "SessionStart",
-        "additionalContext": context
+    output = {
+        "hookSpecificOutput": {
+            "hookEventName": "SessionStart",
+            "additionalContext": context
+        }
     }
-}
-print(json.dumps(output))
+    print(json.dumps(output))
 
-sys.exit(0)
+    sys.exit(0)
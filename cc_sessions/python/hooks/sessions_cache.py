@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, Optional
+from pathlib import Path
+import hashlib, json, os, re
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+##-##
+
+#-#
+
+"""
+╔═══════════════════════════════════════╗
+║  █████╗ █████╗  █████╗██╗  ██╗██████╗ ║
+║ ██╔═══╝██╔══██╗██╔═══╝██║  ██║██╔═══╝ ║
+║ ██║    ███████║██║    ███████║█████╗  ║
+║ ██║    ██╔══██║██║    ██╔══██║██╔══╝  ║
+║ ╚█████╗██║  ██║╚█████╗██║  ██║██████╗ ║
+║  ╚════╝╚═╝  ╚═╝ ╚════╝╚═╝  ╚═╝╚═════╝ ║
+╚═══════════════════════════════════════╝
+Small JSON cache files under sessions/.cache
+
+Everything in here is disposable: a missing, corrupt or half-written cache
+file reads back as None and the caller recomputes. Writes are atomic so
+concurrent hooks never observe a torn file.
+
+This module must not import shared_state (it is loaded from hooks, the API
+and the statusline under different import paths) - callers pass the cache dir.
+"""
+
+# ===== FUNCTIONS ===== #
+
+def cache_file(cache_dir: Path, kind: str, key: str) -> Path:
+    """Stable, filesystem-safe cache file path for (kind, key)."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+    if len(safe) > 80 or safe != key: safe = f"{safe[:40]}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+    return Path(cache_dir) / f"{kind}-{safe}.json"
+
+def read_json(path: Path) -> Optional[Any]:
+    """Load a cache file, or None if it is missing or unreadable."""
+    try:
+        with open(path, "rb") as f: return json.loads(f.read())
+    except (OSError, ValueError): return None
+
+def write_json(path: Path, data: Any) -> None:
+    """Atomically replace a cache file. Failures are swallowed - the cache is best-effort."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        try: tmp.unlink()
+        except OSError: pass
+
+#-#
@@ -2,8 +2,14 @@
 
 # ===== IMPORTS ===== #
 
+## ===== DAEMON HANDOFF ===== ##
+# Hand the whole invocation to the hook daemon when one is running (see hook_daemon.py)
+from hook_daemon import relay_to_daemon
+relay_to_daemon(__file__)
+##-##
+
 ## ===== STDLIB ===== ##
-import subprocess, json, sys, re, shlex, os, platform
+import json, sys, os
 from typing import Optional
 from pathlib import Path
 ##-##
@@ -12,7 +18,9 @@ from pathlib import Path
 ##-##
 
 ## ===== LOCAL ===== ##
-from shared_state import edit_state, load_state, Mode, PROJECT_ROOT, load_config, find_git_repo
+from shared_state import edit_state, update_state, load_state, Mode, PROJECT_ROOT, CACHE_DIR, load_config, find_git_repo, repo_in_task
+from bash_policy import load_policy, cached_is_read_only
+from git_info import read_head
 ##-##
 
 #-#
@@ -34,82 +42,8 @@ if tool_name == "Bash": command = tool_input.get("command", "").strip()
 if tool_name == "TodoWrite": incoming_todos = tool_input.get("todos", [])
 
 ## ===== PATTERNS ===== ##
-READONLY_FIRST = {
-    # Basic file reading
-    'cat', 'less', 'more', 'head', 'tail', 'wc', 'nl', 'tac', 'rev',
-    # Text search and filtering
-    'grep', 'egrep', 'fgrep', 'rg', 'ripgrep', 'ag', 'ack',
-    # Text processing (all safe for reading)
-    'sort', 'uniq', 'cut', 'paste', 'join', 'comm', 'column',
-    'tr', 'expand', 'unexpand', 'fold', 'fmt', 'pr', 'shuf', 'tsort',
-    # Comparison
-    'diff', 'cmp', 'sdiff', 'vimdiff',
-    # Checksums
-    'md5sum', 'sha1sum', 'sha256sum', 'sha512sum', 'cksum', 'sum',
-    # Binary inspection
-    'od', 'hexdump', 'xxd', 'strings', 'file', 'readelf', 'objdump', 'nm',
-    # File system inspection
-    'ls', 'dir', 'vdir', 'pwd', 'which', 'type', 'whereis', 'locate', 'find',
-    'basename', 'dirname', 'readlink', 'realpath', 'stat',
-    # User/system info
-    'whoami', 'id', 'groups', 'users', 'who', 'w', 'last', 'lastlog',
-    'hostname', 'uname', 'arch', 'lsb_release', 'hostnamectl',
-    'date', 'cal', 'uptime', 'df', 'du', 'free', 'vmstat', 'iostat',
-    # Process monitoring
-    'ps', 'pgrep', 'pidof', 'top', 'htop', 'iotop', 'atop',
-    'lsof', 'jobs', 'pstree', 'fuser',
-    # Network monitoring
-    'netstat', 'ss', 'ip', 'ifconfig', 'route', 'arp',
-    'ping', 'traceroute', 'tracepath', 'mtr', 'nslookup', 'dig', 'host', 'whois',
-    # Environment
-    'printenv', 'env', 'set', 'export', 'alias', 'history', 'fc',
-    # Output
-    'echo', 'printf', 'yes', 'seq', 'jot',
-    # Testing
-    'test', '[', '[[', 'true', 'false',
-    # Calculation
-    'bc', 'dc', 'expr', 'factor', 'units',
-    # Modern tools
-    'jq', 'yq', 'xmlstarlet', 'xmllint', 'xsltproc',
-    'bat', 'fd', 'fzf', 'tree', 'ncdu', 'exa', 'lsd',
-    'tldr', 'cheat',
-    # Note: awk/sed are here but need special argument checking
-    'awk', 'sed', 'gawk', 'mawk', 'gsed',
-}
-
-READONLY_FIRST.update(CONFIG.blocked_actions.bash_read_patterns)
-
-WRITE_FIRST = {
-    # File operations
-    'rm', 'rmdir', 'unlink', 'shred',
-    'mv', 'rename', 'cp', 'install', 'dd',
-    'mkdir', 'mkfifo', 'mknod', 'mktemp', 'touch', 'truncate',
-    # Permissions
-    'chmod', 'chown', 'chgrp', 'umask',
-    'ln', 'link', 'symlink',
-    'setfacl', 'setfattr', 'chattr',
-    # System management
-    'useradd', 'userdel', 'usermod', 'groupadd', 'groupdel',
-    'passwd', 'chpasswd', 'systemctl', 'service',
-    # Package managers
-    'apt', 'apt-get', 'dpkg', 'snap', 'yum', 'dnf', 'rpm',
-    'pip', 'pip3', 'npm', 'yarn', 'gem', 'cargo',
-    # Build tools
-    'make', 'cmake', 'ninja', 'meson',
-    # Other dangerous
-    'sudo', 'doas', 'su', 'crontab', 'at', 'batch',
-    'kill', 'pkill', 'killall', 'tee',
-}
-
-WRITE_FIRST.update(CONFIG.blocked_actions.bash_write_patterns)
-
-# Enhanced redirection detection (includes stderr redirections)
-REDIR_PATTERNS = [
-    r'(?:^|\s)(?:>>?|<<?|<<<)\s',           # Basic redirections
-    r'(?:^|\s)\d*>&?\d*(?:\s|$)',            # File descriptor redirections (2>&1, etc)
-    r'(?:^|\s)&>',                           # Combined stdout/stderr redirect
-]
-REDIR = re.compile('|'.join(REDIR_PATTERNS))
+# Built-in rules (bash_policy) merged with the user's bash_read_patterns / bash_write_patterns, precompiled by edit_config()
+BASH_POLICY = load_policy(CACHE_DIR, CONFIG.blocked_actions.bash_read_patterns, CONFIG.blocked_actions.bash_write_patterns, CONFIG.blocked_actions.extrasafe)
 ##-##
 
 ## ===== CI DETECTION ===== ##
@@ -150,58 +84,8 @@ Enforces DAIC (Discussion, Alignment, Implementation, Check) workflow:
 # ===== FUNCTIONS ===== #
 
 ## ===== HELPERS ===== ##
-def check_command_arguments(parts):
-    """Check if command arguments indicate write operations"""
-    if not parts: return True
-
-    cmd = parts[0].lower()
-    args = parts[1:] if len(parts) > 1 else []
-
-    # Check sed for in-place editing
-    if cmd in ['sed', 'gsed']:
-        for arg in args:
-            if arg.startswith('-i') or arg == '--in-place':
-                return False  # sed -i is a write operation
-
-    # Check awk for file output operations
-    if cmd in ['awk', 'gawk', 'mawk']:
-        script = ' '.join(args)
-        # Check for output redirection within awk script
-        if re.search(r'>\s*["\'].*["\']', script):  # > "file" or > 'file'
-            return False
-        if re.search(r'>>\s*["\'].*["\']', script):  # >> "file" or >> 'file'
-            return False
-        if 'print >' in script or 'print >>' in script:
-            return False
-        if 'printf >' in script or 'printf >>' in script:
-            return False
-
-    # Check find for dangerous operations
-    if cmd == 'find':
-        if '-delete' in args:
-            return False
-        for i, arg in enumerate(args):
-            if arg in ['-exec', '-execdir']:
-                if i + 1 < len(args):
-                    exec_cmd = args[i + 1].lower()
-                    if exec_cmd in WRITE_FIRST or exec_cmd in ['rm', 'mv', 'cp', 'shred']:
-                        return False
-
-    # Check xargs for dangerous commands
-    if cmd == 'xargs':
-        for write_cmd in WRITE_FIRST:
-            if write_cmd in args:
-                return False
-        # Check for sed -i through xargs
-        if 'sed' in args:
-            sed_idx = args.index('sed')
-            if sed_idx + 1 < len(args) and args[sed_idx + 1].startswith('-i'):
-                return False
-
-    return True
-
 # Check if a bash command is read-only (no writes, no redirections)
-def is_bash_read_only(command: str, extrasafe: bool = CONFIG.blocked_actions.extrasafe or True) -> bool:
+def is_bash_read_only(command: str) -> bool:
     """Determine if a bash command is read-only.
 
     Enhanced to check command arguments for operations like:
@@ -210,57 +94,14 @@ def is_bash_read_only(command: str, extrasafe: bool = CONFIG.blocked_actions.ext
     - find -delete or -exec rm
     - xargs with write commands
 
+    Every command on the line is checked, including ones after `;`/newlines and inside
+    $(...)/backticks (see bash_policy.split_commands), against the longest matching
+    read/write rule in BASH_POLICY - so `git status` and `git push` can differ. Unrecognized
+    commands are write-like when blocked_actions.extrasafe is on (compiled into BASH_POLICY).
+
     Args:
-        command (str): The bash command to evaluate.
-        extrasafe (bool): If True, unrecognized commands are treated as write-like."""
-    s = (command or '').strip()
-    if not s: return True
-
-    if REDIR.search(s):
-        return False
-
-    for segment in re.split(r'(?<!\|)\|(?!\|)|&&|\|\|', s):  # Split on |, && and ||
-        segment = segment.strip()
-        if not segment: continue
-        try: parts = shlex.split(segment)
-        except ValueError: return not CONFIG.blocked_actions.extrasafe
-        if not parts: continue
-
-        first = parts[0].lower()
-        if first == 'cd': continue
-
-        # Special case: Commands with read-only subcommands
-        if first in ['pip', 'pip3']:
-            subcommand = parts[1].lower() if len(parts) > 1 else ''
-            if subcommand in ['show', 'list', 'search', 'check', 'freeze', 'help']:
-                continue  # Allow read-only pip operations
-            return False  # Block write operations
-
-        if first in ['npm', 'yarn']:
-            subcommand = parts[1].lower() if len(parts) > 1 else ''
-            if subcommand in ['list', 'ls', 'view', 'show', 'search', 'help']:
-                continue  # Allow read-only npm/yarn operations
-            return False  # Block write operations
-
-        if first in ['python', 'python3']:
-            # Allow python -c for simple expressions and python -m for module execution
-            if len(parts) > 1 and parts[1] in ['-c', '-m']:
-                continue  # These are typically read-only operations in our context
-            # Block other python invocations as potentially write-like
-            return False
-
-        if first in WRITE_FIRST: return False
-
-        # Check command arguments for write operations
-        if not check_command_arguments(parts): return False
-
-        # Check if command is in user's custom readonly list
-        if first in CONFIG.blocked_actions.bash_read_patterns: continue  # Allow custom readonly commands
-
-        # If extrasafe is on and command not in readonly list, block it
-        if first not in READONLY_FIRST and CONFIG.blocked_actions.extrasafe: return False
-
-    return True
+        command (str): The bash command to evaluate."""
+    return cached_is_read_only(command, BASH_POLICY, CACHE_DIR)
 ##-##
 
 #-#
@@ -281,7 +122,7 @@ if tool_name == "Bash" and STATE.mode is Mode.NO and not STATE.flags.bypass_mode
 
     if not is_bash_read_only(command):
         # Detect OS for correct sessions command
-        is_windows = platform.system() == "Windows"
+        is_windows = sys.platform == "win32"
         sessions_cmd = "sessions/bin/sessions.bat" if is_windows else "sessions/bin/sessions"
 
         print(f"[DAIC] Blocked write-like Bash command in Discussion mode. Only the user can activate implementation mode. Explain what you want to do and seek alignment and approval first.\n"
@@ -379,9 +220,10 @@ After the user approves with a trigger phrase, you may re-submit the updated tod
             print(message, file=sys.stderr)
             sys.exit(2)
 
-    with edit_state() as s: 
+    def store_incoming_todos(s):
         if not s.todos.store_todos(incoming_todos): print("[TodoWrite Error] Failed to store todos - check format", file=sys.stderr); sys.exit(2)
-        else: STATE = s
+    # Optimistic write: only the todos field is committed, so unrelated concurrent edits are rebased
+    STATE = update_state(store_incoming_todos)
 #!<
 
 #!> TodoList modification guard
@@ -409,22 +251,16 @@ else:
     repo_path = find_git_repo(file_path.parent)
 
     if repo_path:
-        try:
-            result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                cwd=str(repo_path),
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            current_branch = result.stdout.strip()
+        head = read_head(repo_path)
+        if head is not None:
+            current_branch = head["branch"] or ""  # Detached HEAD: empty, like `git branch --show-current`
     
             # Extract the submodule name from the repo path
             submodule_name = repo_path.name
 
             # Check both conditions: branch status and task inclusion
             branch_correct = (current_branch == expected_branch)
-            in_task = (STATE.current_task.submodules and submodule_name in STATE.current_task.submodules)
+            in_task = repo_in_task(repo_path, STATE.current_task.submodules)
             if repo_path == PROJECT_ROOT: in_task = True # Root repo - always considered in task
 
             # Scenario 1: Everything is correct - allow to proceed
@@ -450,9 +286,9 @@ else:
                 print(f"To fix: cd {repo_path.relative_to(PROJECT_ROOT)} && git checkout -b {expected_branch}", file=sys.stderr)
                 print(f"Then update the task file to include '{submodule_name}' in the submodules list.", file=sys.stderr)
                 sys.exit(2)
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError) as e:
+        else:
             # Can't check branch, allow to proceed but warn
-            print(f"Warning: Could not verify branch for {repo_path.name}: {e}", file=sys.stderr)
+            print(f"Warning: Could not verify branch for {repo_path.name}: unreadable .git", file=sys.stderr)
 #!<
 
 #-#
@@ -5,12 +5,15 @@
 ## ===== STDLIB ===== ##
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any, Iterator, Literal, Union
-from importlib.metadata import version, PackageNotFoundError
+from typing import Optional, List, Dict, Any, Iterator, Literal, Union, Callable, Tuple, Set
 from dataclasses import dataclass, asdict, field
 from contextlib import contextmanager, suppress
-import json, os, tempfile, shutil, sys
+from functools import lru_cache
+from _thread import get_ident
+import json, os, sys
 from time import monotonic, sleep
+try: import fcntl
+except ImportError: fcntl = None  # Windows: only the mkdir lock is available
 from pathlib import Path
 from enum import Enum
 ##-##
@@ -19,6 +22,12 @@ from enum import Enum
 ##-##
 
 ## ===== LOCAL ===== ##
+try:
+    from .sessions_cache import read_json, write_json
+    from .git_info import repo_map
+except ImportError:
+    from sessions_cache import read_json, write_json
+    from git_info import repo_map
 ##-##
 
 #-#
@@ -35,7 +44,12 @@ def find_project_root() -> Path:
 PROJECT_ROOT = find_project_root()
 STATE_FILE = PROJECT_ROOT / "sessions" / "sessions-state.json"
 LOCK_DIR  = STATE_FILE.with_suffix(".lock")
+PENDING_STATE_FILE = STATE_FILE.with_suffix(".pending.jsonl")
 CONFIG_FILE = PROJECT_ROOT / "sessions" / "sessions-config.json"
+CACHE_DIR = PROJECT_ROOT / "sessions" / ".cache"
+TASKS_DIR = PROJECT_ROOT / "sessions" / "tasks"
+TASK_INDEX_FILE = TASKS_DIR / ".index.json"
+TASK_INDEX_VERSION = 1
 
 # Mode description strings
 DISCUSSION_MODE_MSG = "You are now in Discussion Mode and should focus on discussing and investigating with the user (no edit-based tools)"
@@ -68,6 +82,8 @@ So ppl are already asking about paralellism so we're going to maybe make this le
 ## ===== EXCEPTIONS ===== ##
 class StateError(RuntimeError): pass
 
+class LockBusyError(RuntimeError): pass
+
 class StashOccupiedError(RuntimeError): pass
 ##-##
 
@@ -222,6 +238,37 @@ class TriggerPhrases:
             TriggerCategory.CONTEXT_COMPACTION.value: self.context_compaction,
         }
 
+    def compile(self) -> "TriggerMatcher":
+        """Matcher for all categories, built once per distinct set of phrases."""
+        return _compile_trigger_phrases(tuple((category, tuple(getattr(self, category.value, []))) for category in TriggerCategory))
+
+@dataclass(frozen=True)
+class TriggerMatcher:
+    """
+    TriggerPhrases compiled for matching prompts.
+
+    ALL-CAPS phrases match case-sensitively, everything else case-insensitively. The prompt
+    is lowercased at most once per call (not once per phrase), each phrase is a single C-level
+    substring search, and a category stops being searched as soon as one of its phrases hits.
+    """
+    exact: Tuple[Tuple[TriggerCategory, Tuple[str, ...]], ...]
+    folded: Tuple[Tuple[TriggerCategory, Tuple[str, ...]], ...]
+
+    def categories(self, text: str) -> Set[TriggerCategory]:
+        """Every category with at least one phrase in text."""
+        found = {category for category, phrases in self.exact if any(phrase in text for phrase in phrases)}
+        pending = [(category, phrases) for category, phrases in self.folded if category not in found]
+        if pending:
+            lowered = text.lower()
+            found.update(category for category, phrases in pending if any(phrase in lowered for phrase in phrases))
+        return found
+
+@lru_cache(maxsize=8)
+def _compile_trigger_phrases(phrases: Tuple[Tuple[TriggerCategory, Tuple[str, ...]], ...]) -> TriggerMatcher:
+    exact = tuple((category, tuple(dict.fromkeys(p for p in ps if p.isupper()))) for category, ps in phrases)
+    folded = tuple((category, tuple(dict.fromkeys(p.lower() for p in ps if not p.isupper()))) for category, ps in phrases)
+    return TriggerMatcher(exact=tuple(e for e in exact if e[1]), folded=tuple(f for f in folded if f[1]))
+
 @dataclass
 class GitPreferences:
     add_pattern: GitAddPattern = GitAddPattern.ASK
@@ -540,16 +587,33 @@ class APIPerms:
     completion: bool = False
     todos_clear: bool = False
 
+@lru_cache(maxsize=None)
+def package_version() -> Optional[str]:
+    """
+    Installed cc-sessions version, or None when it can't be determined.
+
+    Read from hooks/_version.py (written by the installer next to the copied hooks); only
+    without it is importlib.metadata imported, which costs more than the rest of this module.
+    """
+    try:
+        try: from ._version import __version__
+        except ImportError: from _version import __version__
+        return __version__
+    except ImportError: pass
+    from importlib.metadata import version, PackageNotFoundError
+    try: return version("cc-sessions")
+    except PackageNotFoundError: return None
+
 def _get_package_version() -> str:
     """Get the installed cc-sessions package version."""
-    try: return version("cc-sessions")
-    except PackageNotFoundError: return "unknown"
+    return package_version() or "unknown"
 #!<
 
 #!> State object
 @dataclass
 class SessionsState:
     version: str = field(default_factory=_get_package_version)
+    revision: int = 0  # bumped on every committed write (optimistic concurrency, see update_state)
     current_task: TaskState = field(default_factory=TaskState)
     active_protocol: Optional[SessionsProtocol] = None
     api: APIPerms = field(default_factory=APIPerms)
@@ -569,9 +633,6 @@ class SessionsState:
 
     @classmethod
     def from_dict(cls, d: Dict[str, Any]) -> "SessionsState":
-        try: pkg_version = version("cc-sessions")
-        except PackageNotFoundError: pkg_version = "unknown"
-
         active_protocol = d.get("active_protocol")
         if active_protocol and isinstance(active_protocol, str): active_protocol = SessionsProtocol(active_protocol)
 
@@ -579,7 +640,8 @@ class SessionsState:
         if api_data and isinstance(api_data, dict): api_perms = APIPerms(**api_data)
         else: api_perms = APIPerms()
         return cls(
-            version=d.get("version", pkg_version),
+            version=d["version"] if "version" in d else _get_package_version(),
+            revision=d.get("revision", 0),
             current_task=TaskState(**d.get("current_task", {})),
             active_protocol=active_protocol,
             api=api_perms,
@@ -633,6 +695,15 @@ def find_git_repo(dir_path: Path) -> Optional[Path]:
         current = current.parent
     return None
 
+def repo_in_task(repo_path: Path, submodules: Optional[List[str]]) -> bool:
+    """Whether a task's submodules list names this repo - by directory name, path from PROJECT_ROOT or .gitmodules name."""
+    if not submodules: return False
+    try: rel = Path(repo_path).relative_to(PROJECT_ROOT).as_posix()
+    except ValueError: rel = None
+    if any(name in submodules for name in (Path(repo_path).name, rel) if name): return True
+    # Only a .gitmodules name that differs from the path needs the (cached) submodule map
+    return bool(rel) and repo_map(PROJECT_ROOT, CACHE_DIR)["repos"].get(rel) in submodules
+
 def _normalize_task_path(task_path: Union[str, Path]) -> str:
     """Normalize task path to relative string from sessions/tasks/.
     Strips absolute path prefix if present."""
@@ -708,29 +779,13 @@ def get_task_file_path(task_path: Union[str, Path]) -> Path:
 
 def list_open_tasks() -> str:
     # No active task - list available tasks
-    tasks_dir = PROJECT_ROOT / 'sessions' / 'tasks'
-    task_files = []
-
-    if tasks_dir.exists(): task_files = sorted([f for f in tasks_dir.glob('*.md') if f.name != 'TEMPLATE.md'])
-    for task_dir in sorted([d for d in tasks_dir.iterdir() if d.is_dir() and d.name != 'done']):
-        readme_file = task_dir / 'README.md'
-        if readme_file.exists(): task_files.append(task_dir)
-        subtask_files = sorted([f for f in task_dir.glob('*.md') if f.name not in ['TEMPLATE.md', 'README.md']])
-        task_files.extend(subtask_files)
+    index = load_task_index()
 
     task_startup_help = ""
-    if task_files:
+    # Anything task-like on disk (including index files, as before) switches to the listing
+    if any(t["kind"] != "dir" or t["readme"] for t in index["tasks"].values()) or any(name not in ('TEMPLATE.md', 'README.md') for name in index["indexes"]):
         task_startup_help += "No active task set. Available tasks:\n"
-        for task_file in task_files:
-            fpath = get_task_file_path(task_file)
-            if not fpath.exists(): continue
-            # Read first few lines to get task info
-            with fpath.open('r', encoding='utf-8') as f: lines = f.readlines()[:10]
-            task_name = f"{task_file.name}/" if is_directory_task(task_file) else task_file.name
-            status = None
-            for line in lines:
-                if line.startswith('status:'): status = line.split(':')[1].strip(); break
-            if not status: continue
+        for task_name, status in top_level_task_statuses(index):
             task_startup_help += f"  • {task_name} ({status})\n"
         task_startup_help += f"""
 To select a task:
@@ -750,26 +805,236 @@ To create your first task:
 
 ##-##
 
+## ===== TASK INDEX ===== ##
+def _read_task_head(path: Path) -> Dict[str, Any]:
+    """Parse only the top of a task file: its frontmatter and the first `status:` line in the first 10 lines."""
+    frontmatter: Dict[str, str] = {}
+    status = None
+    try:
+        with path.open('r', encoding='utf-8') as f:
+            in_frontmatter = False
+            for lineno, line in enumerate(f):
+                if lineno < 10 and status is None and line.startswith('status:'): status = line.split(':')[1].strip()
+                stripped = line.rstrip('\n')
+                if lineno == 0 and stripped == '---': in_frontmatter = True; continue
+                if in_frontmatter:
+                    if stripped == '---': in_frontmatter = False
+                    elif ':' in stripped:
+                        key, value = stripped.split(':', 1)
+                        frontmatter[key.strip()] = value.strip()
+                if lineno >= 9 and not in_frontmatter: break
+    except (OSError, UnicodeDecodeError): pass
+    return {"frontmatter": frontmatter, "status": status}
+
+def _read_index_file(path: Path) -> Dict[str, Any]:
+    """Parse an index file: frontmatter metadata plus its task lines (- `task` - description)."""
+    try: lines = path.read_text().split('\n')
+    except (OSError, UnicodeDecodeError): return {"metadata": None, "task_lines": [], "tasks": []}
+
+    metadata = {}
+    if lines and lines[0] == '---':
+        for line in lines[1:]:
+            if line == '---': break
+            if ':' in line:
+                key, value = line.split(':', 1)
+                metadata[key.strip()] = value.strip()
+
+    task_lines = [line.strip() for line in lines if line.strip().startswith('- `')]
+    tasks = []
+    for line in task_lines:
+        if '`' not in line: continue
+        start = line.index('`') + 1
+        end = line.find('`', start)
+        if end == -1: continue
+        desc = line[end+1:].strip()
+        if desc.startswith(' - '): desc = desc[3:].strip()
+        tasks.append([line[start:end], desc])
+    return {"metadata": metadata, "task_lines": task_lines, "tasks": tasks}
+
+def load_task_index() -> Dict[str, Any]:
+    """
+    Metadata for everything under sessions/tasks, cached in sessions/tasks/.index.json.
+
+    Only files whose (mtime, size) changed since the last call are re-read, and
+    task files are read only up to the end of their frontmatter.
+
+    Returns:
+        {"tasks": {...}, "indexes": {...}} where tasks is keyed by path relative to
+        sessions/tasks ('foo.md', 'h-dir', 'h-dir/01-sub.md') with kind file/dir/subtask,
+        frontmatter, status, index memberships and (for dirs) readme + subtasks;
+        indexes is keyed by file name in sessions/tasks/indexes.
+    """
+    cached = read_json(TASK_INDEX_FILE)
+    if not isinstance(cached, dict) or cached.get("version") != TASK_INDEX_VERSION: cached = {}
+    old_tasks, old_indexes = cached.get("tasks", {}), cached.get("indexes", {})
+    tasks: Dict[str, Dict[str, Any]] = {}
+    indexes: Dict[str, Dict[str, Any]] = {}
+    changed = False
+
+    def refresh(old: Dict[str, Any], key: str, path: str, parse) -> Optional[Dict[str, Any]]:
+        nonlocal changed
+        try: st = os.stat(path)
+        except OSError: return None
+        stamp = [st.st_mtime_ns, st.st_size]
+        prev = old.get(key)
+        if prev and prev.get("stamp") == stamp: return dict(prev)
+        changed = True
+        return {"stamp": stamp, **parse(Path(path))}
+
+    def scan(path: Path) -> List[os.DirEntry]:
+        try:
+            with os.scandir(path) as it: return sorted(it, key=lambda e: e.name)
+        except OSError: return []
+
+    for entry in scan(TASKS_DIR):
+        if entry.is_file() and entry.name.endswith('.md') and entry.name != 'TEMPLATE.md':
+            if (task := refresh(old_tasks, entry.name, entry.path, _read_task_head)): tasks[entry.name] = {**task, "kind": "file"}
+        elif entry.is_dir() and entry.name == 'indexes':
+            for idx_entry in scan(Path(entry.path)):
+                if idx_entry.is_file() and idx_entry.name.endswith('.md'):
+                    if (parsed := refresh(old_indexes, idx_entry.name, idx_entry.path, _read_index_file)): indexes[idx_entry.name] = parsed
+        elif entry.is_dir() and entry.name != 'done':
+            readme = refresh(old_tasks, entry.name, os.path.join(entry.path, 'README.md'), _read_task_head)
+            subtasks = []
+            for sub in scan(Path(entry.path)):
+                if sub.is_file() and sub.name.endswith('.md') and sub.name not in ('TEMPLATE.md', 'README.md'):
+                    key = f"{entry.name}/{sub.name}"
+                    if (task := refresh(old_tasks, key, sub.path, _read_task_head)): tasks[key] = {**task, "kind": "subtask", "parent": entry.name}; subtasks.append(key)
+            dir_entry = readme or {"stamp": None, "frontmatter": {}, "status": None}
+            tasks[entry.name] = {**dir_entry, "kind": "dir", "readme": readme is not None, "subtasks": subtasks}
+
+    # Index memberships (cheap, always recomputed from the parsed index files)
+    for task in tasks.values(): task["indexes"] = []
+    for index_name, info in indexes.items():
+        for task_ref, _ in info["tasks"]:
+            if (task := tasks.get(task_ref.rstrip('/'))) is not None and index_name not in task["indexes"]: task["indexes"].append(index_name)
+
+    if changed or tasks.keys() != old_tasks.keys() or indexes.keys() != old_indexes.keys():
+        write_json(TASK_INDEX_FILE, {"version": TASK_INDEX_VERSION, "tasks": tasks, "indexes": indexes})
+    return {"tasks": tasks, "indexes": indexes}
+
+def top_level_task_statuses(index: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str]]:
+    """(display name, status) for top-level file tasks then directory tasks, skipping tasks without a status."""
+    tasks = (index or load_task_index())["tasks"]
+    listed = [(name, task) for name, task in sorted(tasks.items()) if task["kind"] == "file"]
+    listed += [(f"{name}/", task) for name, task in sorted(tasks.items()) if task["kind"] == "dir" and task["readme"]]
+    return [(name, task["status"]) for name, task in listed if task["status"]]
+
+def task_index_groups(index: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Index files in name order, with each listed task reference resolved against the task index.
+
+    Every entry in "tasks" carries the raw reference from the index file, its description and
+    "task": the matching task index key (file and subtask refs match exactly, directory refs
+    with or without a trailing slash) or None when nothing on disk matches.
+    """
+    index = index or load_task_index()
+    tasks = index["tasks"]
+    groups = []
+    for file_name, info in sorted(index["indexes"].items()):
+        metadata = info["metadata"]
+        if metadata is None: continue
+        stem = file_name[:-3]
+        resolved = []
+        for ref, desc in info["tasks"]:
+            key = ref if ref in tasks else ref.rstrip('/')
+            if key not in tasks or (key != ref and tasks[key]["kind"] != "dir"): key = None
+            resolved.append({"ref": ref, "description": desc, "task": key})
+        groups.append({
+            "file": file_name,
+            "metadata": metadata,
+            "id": metadata.get('index', stem),
+            "name": metadata.get('name', stem),
+            "description": metadata.get('description', ''),
+            "task_count": len(info["task_lines"]),
+            "tasks": resolved,
+        })
+    return groups
+##-##
+
 ## ===== STATE PROTECTION ===== ##
+# Locks currently held by each thread of this process: {thread id: {"fd": int | None}}
+_LOCK_HOLDS: Dict[int, Dict[str, Any]] = {}
+# Open transaction() per thread: {"state": SessionsState | None, "config": SessionsConfig | None, "consumed": int, "dirty": set}
+# plus, for hook_transaction(): {"deferred": True, "base": {kind: flattened copy as first loaded}}
+_TRANSACTIONS: Dict[int, Dict[str, Any]] = {}
+# Exit statuses after which hook_transaction() commits: success, and 2 - a hook blocking the tool call
+COMMIT_EXIT_STATUSES = (0, 2)
+
 def _the_ol_in_out(path: Path, obj: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile("w", delete=False, dir=str(path.parent), encoding="utf-8") as tmp:
+    tmp_name = f"{path}.{os.getpid()}-{get_ident()}.tmp"  # unique per writer without importing tempfile
+    with open(tmp_name, "w", encoding="utf-8") as tmp:
         json.dump(obj, tmp, indent=2)
         tmp.flush()
         os.fsync(tmp.fileno())
-        tmp_name = tmp.name
     os.replace(tmp_name, path)  # atomic across filesystems on same volume
 
+def _rmtree(path: Path) -> None:
+    import shutil  # Only the mkdir lock (no fcntl) and stale-lock recovery get here
+    shutil.rmtree(path, ignore_errors=True)
+
+def _flock_open(lock_dir: Path, blocking: bool = True) -> Optional[int]:
+    """Open and exclusively flock the lock file next to lock_dir. None if advisory locks are unavailable here."""
+    if fcntl is None: return None
+    try:
+        lock_dir.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(lock_dir.with_suffix(".flock")), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError: return None
+    try: fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError: os.close(fd); raise LockBusyError(f"{lock_dir} is held by another process")
+    except OSError: os.close(fd); return None  # e.g. ENOLCK on network filesystems
+    return fd
+
+@contextmanager
+def _lock(lock_dir: Path, blocking: bool = True) -> Iterator[None]:
+    """
+    Acquire the state/config writer lock.
+
+    Uses an exclusive fcntl.flock on <lock_dir>.flock, released by the kernel if
+    the holder dies; where advisory locks are unavailable it falls back to the
+    mkdir lock. Readers never take it: every write is an atomic os.replace, so
+    load_state()/load_config() read lock-free and only lock to create, reset or
+    migrate a file. Reentrant per thread, so that load_state() inside edit_state()
+    does not deadlock.
+
+    Args:
+        lock_dir: Directory used by the mkdir fallback; the flock file sits next to it
+        blocking: Wait for the lock; if False raise LockBusyError when it is held elsewhere
+
+    Raises:
+        LockBusyError: Only when blocking is False and the lock is busy
+    """
+    me = get_ident()
+    if me in _LOCK_HOLDS:
+        yield  # Already held (exclusively) by this thread
+        return
+
+    fd = _flock_open(lock_dir, blocking)
+    if fd is None:
+        with _dir_lock(lock_dir, blocking=blocking):
+            _LOCK_HOLDS[me] = {"fd": None}
+            try: yield
+            finally: del _LOCK_HOLDS[me]
+        return
+
+    _LOCK_HOLDS[me] = {"fd": fd}
+    try: yield
+    finally:
+        del _LOCK_HOLDS[me]
+        os.close(fd)  # closing the descriptor releases the flock
+
 @contextmanager
-def _lock(lock_dir: Path, timeout: float = 1.0, poll: float = 0.05, stale_timeout: float = 30.0) -> Iterator[None]:
+def _dir_lock(lock_dir: Path, timeout: float = 1.0, poll: float = 0.05, stale_timeout: float = 30.0, blocking: bool = True) -> Iterator[None]:
     """
-    Acquire a directory-based lock with stale lock detection.
+    Acquire a directory-based lock with stale lock detection (fallback for filesystems without flock).
     
     Args:
         lock_dir: Directory to use as lock
         timeout: Seconds to wait for lock acquisition
         poll: Seconds between acquisition attempts
         stale_timeout: Seconds after which a lock is considered stale
+        blocking: If False, raise LockBusyError instead of waiting (and never force-remove a live lock)
     """
     lock_info_file = lock_dir / "lock_info.json"
     start = monotonic()
@@ -788,19 +1053,19 @@ def _lock(lock_dir: Path, timeout: float = 1.0, poll: float = 0.05, stale_timeou
                     # Check if lock is stale (older than stale_timeout)
                     if monotonic() - lock_time > stale_timeout:
                         print(f"Removing stale lock (age: {monotonic() - lock_time:.1f}s)", file=sys.stderr)
-                        with suppress(Exception): shutil.rmtree(lock_dir)
+                        _rmtree(lock_dir)
                     # Check if owning process is dead (same machine only)
                     elif lock_pid and lock_pid != os.getpid():
                         try: os.kill(lock_pid, 0) # Check if process exists (works on Unix)
                         except (OSError, ProcessLookupError):
                             # Process doesn't exist, remove stale lock
                             print(f"Removing lock from dead process {lock_pid}", file=sys.stderr)
-                            with suppress(Exception): shutil.rmtree(lock_dir)
+                            _rmtree(lock_dir)
             except (json.JSONDecodeError, KeyError, ValueError):
                 # Malformed lock info, try to remove after timeout
                 if monotonic() - start > timeout:
                     print(f"Removing malformed lock", file=sys.stderr)
-                    with suppress(Exception): shutil.rmtree(lock_dir)
+                    _rmtree(lock_dir)
         
         # Try to acquire lock
         try:
@@ -812,10 +1077,11 @@ def _lock(lock_dir: Path, timeout: float = 1.0, poll: float = 0.05, stale_timeou
             lock_info_file.write_text(json.dumps(lock_info))
             break
         except FileExistsError:
+            if not blocking: raise LockBusyError(f"{lock_dir} is held by another process")
             if monotonic() - start > timeout:
                 # Force-remove stale lock after timeout and try once more
                 print(f"Force-removing lock after {timeout}s timeout", file=sys.stderr)
-                shutil.rmtree(lock_dir, ignore_errors=True)
+                _rmtree(lock_dir)
                 # Try once more to acquire
                 try:
                     lock_dir.mkdir(exist_ok=False)
@@ -832,69 +1098,361 @@ def _lock(lock_dir: Path, timeout: float = 1.0, poll: float = 0.05, stale_timeou
     
     try: yield
     finally:
-        with suppress(Exception): shutil.rmtree(lock_dir)
+        _rmtree(lock_dir)
 ##-##
 
 ## ===== GEIPI ===== ##
 def load_state() -> SessionsState:
-    if not STATE_FILE.exists():
-        initial = SessionsState()
-        _the_ol_in_out(STATE_FILE, initial.to_dict())
-        return initial
-    try: data = json.loads(STATE_FILE.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        # Corrupt file: back it up once and start fresh
-        backup = STATE_FILE.with_suffix(".bad.json")
-        with suppress(Exception): STATE_FILE.replace(backup)
-        fresh = SessionsState()
-        _the_ol_in_out(STATE_FILE, fresh.to_dict())
-        return fresh
-    return SessionsState.from_dict(data)
+    if (tx := _TRANSACTIONS.get(get_ident())) and tx["state"] is not None: return SessionsState.from_dict(tx["state"].to_dict())
+    # Lock-free: writers replace the file atomically, so this never sees a torn write
+    try: return SessionsState.from_dict(json.loads(STATE_FILE.read_text(encoding="utf-8")))
+    except (FileNotFoundError, json.JSONDecodeError): pass
+    # Missing or corrupt: create or reset it as a writer, re-checking in case another process just did
+    with _lock(LOCK_DIR):
+        if not STATE_FILE.exists():
+            initial = SessionsState()
+            _the_ol_in_out(STATE_FILE, initial.to_dict())
+            return initial
+        try: data = json.loads(STATE_FILE.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            # Corrupt file: back it up once and start fresh
+            backup = STATE_FILE.with_suffix(".bad.json")
+            with suppress(Exception): STATE_FILE.replace(backup)
+            fresh = SessionsState()
+            _the_ol_in_out(STATE_FILE, fresh.to_dict())
+            return fresh
+        return SessionsState.from_dict(data)
 
 def load_config() -> SessionsConfig:
-    if not CONFIG_FILE.exists():
-        initial = SessionsConfig()
-        _the_ol_in_out(CONFIG_FILE, initial.to_dict())
-        return initial
-    try: data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        # Corrupt file: back it up once and start fresh
-        backup = CONFIG_FILE.with_suffix(".bad.json")
-        with suppress(Exception): CONFIG_FILE.replace(backup)
-        fresh = SessionsConfig()
-        _the_ol_in_out(CONFIG_FILE, fresh.to_dict())
-        return fresh
-
-    # Check if migration is needed from use_nerd_fonts to icon_style
-    needs_migration = False
-    if "features" in data and "use_nerd_fonts" in data["features"] and "icon_style" not in data["features"]:
-        needs_migration = True
-
-    config = SessionsConfig.from_dict(data)
-
-    # If migration happened, write back the config to remove old field
-    if needs_migration:
-        _the_ol_in_out(CONFIG_FILE, config.to_dict())
-
-    return config
+    if (tx := _TRANSACTIONS.get(get_ident())) and tx["config"] is not None: return SessionsConfig.from_dict(tx["config"].to_dict())
+    # Lock-free, as in load_state()
+    try:
+        data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+        if not _needs_migration(data): return SessionsConfig.from_dict(data)
+    except (FileNotFoundError, json.JSONDecodeError): pass
+    # Missing, corrupt or in the old format: fix it up as a writer, re-checking in case another process just did
+    with _lock(LOCK_DIR):
+        if not CONFIG_FILE.exists():
+            initial = SessionsConfig()
+            _the_ol_in_out(CONFIG_FILE, initial.to_dict())
+            return initial
+        try: data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            # Corrupt file: back it up once and start fresh
+            backup = CONFIG_FILE.with_suffix(".bad.json")
+            with suppress(Exception): CONFIG_FILE.replace(backup)
+            fresh = SessionsConfig()
+            _the_ol_in_out(CONFIG_FILE, fresh.to_dict())
+            return fresh
+
+        config = SessionsConfig.from_dict(data)
+
+        # If migration happened, write back the config to remove old field
+        if _needs_migration(data):
+            _the_ol_in_out(CONFIG_FILE, config.to_dict())
+
+        return config
+
+def peek_state() -> SessionsState:
+    """load_state() that never locks or writes, for renderers: defaults if the file is missing or unreadable."""
+    try: return SessionsState.from_dict(json.loads(STATE_FILE.read_text(encoding="utf-8")))
+    except (OSError, ValueError): return SessionsState()
+
+def peek_config() -> SessionsConfig:
+    """load_config() that never locks or writes, for renderers: defaults if the file is missing or unreadable."""
+    try: return SessionsConfig.from_dict(json.loads(CONFIG_FILE.read_text(encoding="utf-8")))
+    except (OSError, ValueError): return SessionsConfig()
+
+def _needs_migration(data: Dict[str, Any]) -> bool:
+    """Config still uses use_nerd_fonts instead of icon_style."""
+    features = data.get("features")
+    return isinstance(features, dict) and "use_nerd_fonts" in features and "icon_style" not in features
+
+def _load_state_for_edit() -> Tuple[SessionsState, int]:
+    """Latest state with deferred updates (see update_state(blocking=False)) folded in. Call with the lock held."""
+    state = load_state()
+    pending, consumed = _take_pending_changes()
+    if pending:
+        data = state.to_dict()
+        _apply(data, pending)
+        state = SessionsState.from_dict(data)
+    return state, consumed
 
 @contextmanager
 def edit_state() -> Iterator[SessionsState]:
+    if (tx := _TRANSACTIONS.get(get_ident())) is not None:
+        with _transaction_edit(tx, "state") as state: yield state
+        return
     # Acquire lock, reload (so we operate on latest), yield, then save atomically
     with _lock(LOCK_DIR):
-        state = load_state()
+        state, consumed = _load_state_for_edit()
         try: yield state
         except Exception: raise
-        else: _the_ol_in_out(STATE_FILE, state.to_dict())
+        else:
+            state.revision += 1
+            _the_ol_in_out(STATE_FILE, state.to_dict())
+            if consumed: _drop_pending_changes(consumed)
+
+def update_state(mutate: Callable[[SessionsState], Any], retries: int = 5, blocking: bool = True) -> SessionsState:
+    """
+    Optimistic alternative to edit_state() for short, independent updates.
+
+    The mutation runs on a snapshot without holding the lock. Only the field
+    paths it changed are committed, under the lock, with a compare-and-swap on
+    the state revision. If another writer committed in the meantime, changes to
+    unrelated fields are rebased onto the newer state; the mutation is re-run
+    only when both touched the same field.
+
+    With blocking=False (for low-priority writers like the statusline) the lock
+    is only tried once. If it is busy, the changed fields are appended to
+    sessions-state.pending.jsonl for the next lock holder to apply, and the
+    call returns immediately.
+
+    Args:
+        mutate: Called with a fresh SessionsState (may be called more than once)
+        retries: Attempts after a true conflict before giving up
+        blocking: Wait for the state lock (False defers the write instead)
+
+    Returns:
+        The committed state (or, if the write was deferred, the local snapshot with the mutation applied)
+
+    Raises:
+        StateError: If conflicting concurrent edits persist after all retries
+    """
+    if get_ident() in _TRANSACTIONS:
+        # Inside a transaction the lock is already ours - nothing to be optimistic about
+        with edit_state() as state: mutate(state)
+        return state
+
+    for _ in range(retries + 1):
+        state = load_state() if blocking else peek_state()
+        base_rev, base = state.revision, _flatten(state.to_dict())
+        mutate(state)
+        mine = _diff(base, _flatten(state.to_dict()))
+        if not mine: return state
+
+        try:
+            with _lock(LOCK_DIR, blocking=blocking):
+                current = load_state().to_dict()
+                # Someone committed since our snapshot - rebase unless we touched the same fields
+                if current["revision"] != base_rev and _overlaps(mine, _diff(base, _flatten(current))): continue
+                # Deferred writes are older than ours: applied first, never a conflict
+                pending, consumed = _take_pending_changes()
+                if current["revision"] == base_rev and not pending: merged = state.to_dict()
+                else:
+                    merged = current
+                    _apply(merged, pending)
+                    _apply(merged, mine)
+                merged["revision"] = current["revision"] + 1
+                _the_ol_in_out(STATE_FILE, merged)
+                if consumed: _drop_pending_changes(consumed)
+                return SessionsState.from_dict(merged)
+        except LockBusyError:
+            _queue_pending_changes(mine)
+            return state
+    raise StateError(f"update_state: conflicting concurrent edits after {retries} retries")
+
+
+@contextmanager
+def _pending_file() -> Iterator[Any]:
+    """The deferred-updates file, opened for binary read/append and flocked (where available) for the duration."""
+    PENDING_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(PENDING_STATE_FILE, "a+b") as f:
+        if fcntl is not None:
+            with suppress(OSError): fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        f.seek(0)
+        yield f
+
+def _queue_pending_changes(changes: Dict[Tuple[str, ...], Any]) -> None:
+    """Append field changes (one JSON line per deferred write) for the next state lock holder."""
+    line = json.dumps([[list(path), None if value is _MISSING else value, value is _MISSING] for path, value in changes.items()])
+    entry = line.encode("utf-8") + b"\n"
+    with _pending_file() as f:
+        # A statusline re-queues the same write every render while the lock stays busy
+        if not f.read().endswith(entry): f.write(entry)
+
+def _take_pending_changes() -> Tuple[Dict[Tuple[str, ...], Any], int]:
+    """
+    Deferred field changes, oldest first (later writes to a path win), and how many bytes of
+    the file they came from. Call with the state lock held; the file is left untouched
+    until _drop_pending_changes() confirms the changes were committed.
+    """
+    if not PENDING_STATE_FILE.exists(): return {}, 0
+    with _pending_file() as f: content = f.read()
+    changes: Dict[Tuple[str, ...], Any] = {}
+    for line in content.decode("utf-8", errors="replace").splitlines():
+        try: entries = json.loads(line)
+        except ValueError: continue
+        for path, value, removed in entries: changes[tuple(path)] = _MISSING if removed else value
+    return changes, len(content)
+
+def _drop_pending_changes(consumed: int) -> None:
+    """Remove the first `consumed` bytes (already committed) from the deferred-updates file."""
+    with _pending_file() as f:
+        rest = f.read()[consumed:]
+        f.truncate(0)
+        f.write(rest)
+
+_MISSING = object()
+
+def _flatten(d: Dict[str, Any], prefix: Tuple[str, ...] = ()) -> Dict[Tuple[str, ...], Any]:
+    """Flatten nested dicts into {field path: value}. Lists, scalars and empty dicts are leaves."""
+    flat = {}
+    for key, value in d.items():
+        if isinstance(value, dict) and value: flat.update(_flatten(value, prefix + (key,)))
+        else: flat[prefix + (key,)] = value
+    return flat
+
+def _diff(old: Dict[Tuple[str, ...], Any], new: Dict[Tuple[str, ...], Any]) -> Dict[Tuple[str, ...], Any]:
+    """Field paths whose value changed (_MISSING marks a removed path). The revision itself is ignored."""
+    changes = {path: value for path, value in new.items() if old.get(path, _MISSING) != value}
+    changes.update({path: _MISSING for path in old if path not in new})
+    changes.pop(("revision",), None)
+    return changes
+
+def _overlaps(a: Dict[Tuple[str, ...], Any], b: Dict[Tuple[str, ...], Any]) -> bool:
+    """True if any path in a equals, contains or is contained by a path in b."""
+    return any(p[:len(q)] == q or q[:len(p)] == p for p in a for q in b)
+
+def _apply(target: Dict[str, Any], changes: Dict[Tuple[str, ...], Any]) -> None:
+    # Removals first so a leaf that became a dict (or vice versa) is rebuilt cleanly
+    for path, value in sorted(changes.items(), key=lambda item: item[1] is not _MISSING):
+        node = target
+        for key in path[:-1]:
+            if not isinstance(node.get(key), dict): node[key] = {}
+            node = node[key]
+        if value is _MISSING: node.pop(path[-1], None)
+        else: node[path[-1]] = value
 
 @contextmanager
 def edit_config() -> Iterator[SessionsConfig]:
+    if (tx := _TRANSACTIONS.get(get_ident())) is not None:
+        with _transaction_edit(tx, "config") as config: yield config
+        return
     # Acquire lock, reload (so we operate on latest), yield, then save atomically
     with _lock(LOCK_DIR):
         config = load_config()
         try: yield config
         except Exception: raise
-        else: _the_ol_in_out(CONFIG_FILE, config.to_dict())
+        else:
+            _the_ol_in_out(CONFIG_FILE, config.to_dict())
+            _compile_bash_policy(config)
+
+@contextmanager
+def transaction() -> Iterator[None]:
+    """
+    Group edit_state()/edit_config()/update_state() calls into one commit.
+
+    The state lock is held for the whole block. The first edit loads the file, later edits
+    (and load_state()/load_config()) work on that same in-memory copy, and on a clean exit
+    state and config are each written once - one revision bump, one fsync. If the block
+    raises, nothing is written. An edit that raises is rolled back on its own, so callers
+    can catch it and carry on. A nested transaction() joins the outer one.
+    """
+    me = get_ident()
+    if me in _TRANSACTIONS:
+        yield
+        return
+    with _lock(LOCK_DIR):
+        tx = _TRANSACTIONS[me] = {"state": None, "config": None, "consumed": 0, "dirty": set()}
+        try: yield
+        finally: del _TRANSACTIONS[me]
+        if "state" in tx["dirty"]:
+            tx["state"].revision += 1
+            _the_ol_in_out(STATE_FILE, tx["state"].to_dict())
+            if tx["consumed"]: _drop_pending_changes(tx["consumed"])
+        if "config" in tx["dirty"]:
+            _the_ol_in_out(CONFIG_FILE, tx["config"].to_dict())
+            _compile_bash_policy(tx["config"])
+
+@contextmanager
+def hook_transaction() -> Iterator[None]:
+    """
+    Run a hook's body as one transaction, committed when the block exits.
+
+    For hooks, which make several small edits per call: wrap the execution section.
+    edit_state()/edit_config()/update_state() then work on an in-memory copy (which
+    load_state()/load_config() return too) without taking the lock. When the block ends
+    normally or through sys.exit() with a status in COMMIT_EXIT_STATUSES (0, or 2 blocking
+    a tool call), the fields they changed are rebased onto the latest state and config under
+    a single lock, and each file is written at most once. Any other status, or an exception,
+    discards them. A transaction() opened inside joins.
+
+    If the commit fails - another writer changed one of the same fields meanwhile - nothing
+    is written, the reason goes to stderr and a clean exit becomes exit status 1.
+    """
+    me = get_ident()
+    if me in _TRANSACTIONS:
+        yield
+        return
+    tx = _TRANSACTIONS[me] = {"state": None, "config": None, "consumed": 0, "dirty": set(), "deferred": True, "base": {}}
+    status = None  # Stays None if the block raises
+    try:
+        yield
+        status = 0
+    except SystemExit as e:
+        # Mirrors the interpreter: None is 0, a non-integer (an error message) is 1
+        status = 0 if e.code is None else e.code if isinstance(e.code, int) else 1
+        raise
+    finally:
+        del _TRANSACTIONS[me]
+        if status in COMMIT_EXIT_STATUSES:
+            try: _commit_deferred(tx)
+            except (StateError, OSError) as e:
+                print(f"cc-sessions: this hook's state changes were not saved: {e}", file=sys.stderr)
+                if status == 0: sys.exit(1)
+
+def _commit_deferred(tx: Dict[str, Any]) -> None:
+    """Rebase what a hook_transaction() changed onto the files, unless someone else changed the same fields since it loaded them."""
+    changes = {kind: mine for kind in tx["dirty"] if (mine := _diff(tx["base"][kind], _flatten(tx[kind].to_dict())))}
+    if not changes: return
+
+    with _lock(LOCK_DIR):
+        current = {}
+        if "state" in changes: current["state"], consumed = _load_state_for_edit()
+        if "config" in changes: current["config"] = load_config()
+        # Fields another writer changed since the hook loaded them can't be merged, and the hook can't be re-run
+        for kind, mine in changes.items():
+            theirs = _diff(tx["base"][kind], _flatten(current[kind].to_dict()))
+            if (clashes := sorted(".".join(path) for path in mine if _overlaps({path: None}, theirs))):
+                raise StateError(f"{kind} changed concurrently: {', '.join(clashes)}")
+        if "state" in changes:
+            merged = current["state"].to_dict()
+            _apply(merged, changes["state"])
+            merged["revision"] = current["state"].revision + 1
+            _the_ol_in_out(STATE_FILE, merged)
+            if consumed: _drop_pending_changes(consumed)
+        if "config" in changes:
+            merged = current["config"].to_dict()
+            _apply(merged, changes["config"])
+            config = SessionsConfig.from_dict(merged)
+            _the_ol_in_out(CONFIG_FILE, config.to_dict())
+            _compile_bash_policy(config)
+
+@contextmanager
+def _transaction_edit(tx: Dict[str, Any], kind: str) -> Iterator[Any]:
+    """One edit inside a transaction: yields the shared object, restoring it if the edit raises."""
+    cls = SessionsState if kind == "state" else SessionsConfig
+    if tx[kind] is None and tx.get("deferred"):
+        # No lock held until exit: remember what was loaded so only our changes get committed
+        tx[kind] = load_state() if kind == "state" else load_config()
+        tx["base"][kind] = _flatten(tx[kind].to_dict())
+    elif tx[kind] is None:
+        if kind == "state": tx["state"], tx["consumed"] = _load_state_for_edit()
+        else: tx["config"] = load_config()
+    before = tx[kind].to_dict()
+    try: yield tx[kind]
+    except BaseException:  # sys.exit() from inside an edit writes nothing, as with edit_state() outside a transaction
+        tx[kind] = cls.from_dict(before)
+        raise
+    tx["dirty"].add(kind)
+
+def _compile_bash_policy(config: SessionsConfig) -> None:
+    """Precompile the Bash read/write rule trie that sessions_enforce loads."""
+    try: from .bash_policy import load_policy
+    except ImportError: from bash_policy import load_policy
+    blocked = config.blocked_actions
+    load_policy(CACHE_DIR, blocked.bash_read_patterns, blocked.bash_write_patterns, blocked.extrasafe)
 ##-##
 
 #-#
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from pathlib import Path
+import os, threading, time
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+try:
+    from .sessions_cache import cache_file, read_json, write_json
+    from .git_info import git_dirs, GIT_STATUS_MAX_AGE
+except ImportError:
+    from sessions_cache import cache_file, read_json, write_json
+    from git_info import git_dirs, GIT_STATUS_MAX_AGE
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+# Seconds each statusline segment may take before its last known value is shown instead (marked stale)
+SEGMENT_DEADLINES = {"state": 0.5, "context": 0.5, "git": 1.0, "tasks": 0.5}
+DEFAULT_SEGMENT_DEADLINE = 0.5
+#-#
+
+"""
+╔════════════════════════════════════════════════════════════════════════════════════════╗
+║ █████╗ ██████╗██╗  ██╗█████╗ ██████╗█████╗        █████╗ █████╗  █████╗██╗  ██╗██████╗ ║
+║ ██╔═██╗██╔═══╝███╗ ██║██╔═██╗██╔═══╝██╔═██╗      ██╔═══╝██╔══██╗██╔═══╝██║  ██║██╔═══╝ ║
+║ █████╔╝█████╗ ████╗██║██║ ██║█████╗ █████╔╝      ██║    ███████║██║    ███████║█████╗  ║
+║ ██╔═██╗██╔══╝ ██╔████║██║ ██║██╔══╝ ██╔═██╗      ██║    ██╔══██║██║    ██╔══██║██╔══╝  ║
+║ ██║ ██║██████╗██║╚███║█████╔╝██████╗██║ ██║      ╚█████╗██║  ██║╚█████╗██║  ██║██████╗ ║
+║ ╚═╝ ╚═╝╚═════╝╚═╝ ╚══╝╚════╝ ╚═════╝╚═╝ ╚═╝       ╚════╝╚═╝  ╚═╝ ╚════╝╚═╝  ╚═╝╚═════╝ ║
+╚════════════════════════════════════════════════════════════════════════════════════════╝
+Whole-output cache for statusline.py
+
+A render is stored in sessions/.cache/statusline-<session_id>.json together
+with a fingerprint of everything it was computed from: state/config mtimes,
+transcript size, tasks dir mtime, git index/HEAD mtimes, model name and cwd.
+A matching fingerprint reprints the stored text without importing
+shared_state, reading the transcript or scanning sessions/tasks.
+
+Working tree edits change none of those, so (like the git status cache) a
+render is reused for at most GIT_STATUS_MAX_AGE seconds.
+
+On a miss the slow segments (state, context, git, tasks) are computed
+concurrently, each against its own deadline. Their last good values and
+per-segment timings live in sessions/.cache/statusline-segments-<session_id>.json
+(see `sessions statusline timings`).
+
+Like sessions_cache, this module must not import shared_state.
+"""
+
+# ===== FUNCTIONS ===== #
+
+## ===== RENDER CACHE ===== ##
+def find_project_root() -> Optional[Path]:
+    """Same lookup as shared_state.find_project_root, but returns None instead of exiting."""
+    if (p := os.environ.get("CLAUDE_PROJECT_DIR")): return Path(p)
+    cur = Path.cwd()
+    for parent in (cur, *cur.parents):
+        if (parent / ".claude").exists(): return parent
+    return None
+
+def _stat(path: Any, attr: str = "st_mtime_ns") -> Optional[int]:
+    try: return getattr(os.stat(path), attr) if path else None
+    except OSError: return None
+
+def render_fingerprint(data: Dict[str, Any], project_root: Path) -> List[Any]:
+    """Cheap (stat-only) fingerprint of the statusline inputs for this stdin payload."""
+    cwd = data.get("cwd", ".")
+    sessions_dir = Path(project_root) / "sessions"
+
+    # Same walk as shared_state.find_git_repo
+    git_index = git_head = None
+    current = Path(cwd)
+    while True:
+        if (current / ".git").exists():
+            if (dirs := git_dirs(current)):
+                git_index, git_head = _stat(dirs["git_dir"] / "index"), _stat(dirs["git_dir"] / "HEAD")
+            break
+        if current == Path(project_root) or current.parent == current: break
+        current = current.parent
+
+    return [
+        _stat(sessions_dir / "sessions-state.json"),
+        _stat(sessions_dir / "sessions-config.json"),
+        _stat(data.get("transcript_path"), "st_size"),
+        _stat(sessions_dir / "tasks"),
+        git_index,
+        git_head,
+        data.get("model", {}).get("display_name", "unknown"),
+        cwd,
+    ]
+
+def cached_render(cache_dir: Path, session_id: str, fingerprint: List[Any], max_age: float = GIT_STATUS_MAX_AGE) -> Optional[str]:
+    """The stored render for this session if its fingerprint matches and it is fresh enough."""
+    cached = read_json(cache_file(cache_dir, "statusline", session_id))
+    if not isinstance(cached, dict) or time.time() - cached.get("rendered", 0) >= max_age: return None
+    if cached.get("fingerprint") != fingerprint: return None
+    return cached.get("output")
+
+def save_render(cache_dir: Path, session_id: str, fingerprint: List[Any], output: str) -> None:
+    write_json(cache_file(cache_dir, "statusline", session_id), {"rendered": time.time(), "fingerprint": fingerprint, "output": output})
+##-##
+
+## ===== SEGMENTS ===== ##
+def run_segments(providers: Dict[str, Callable[[], Any]], cache_dir: Path, session_id: str,
+                 deadlines: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, Any], Set[str]]:
+    """
+    Run every segment provider concurrently and collect what finishes before its deadline.
+
+    Each provider gets its own daemon thread (a ThreadPoolExecutor would be joined at
+    interpreter exit, so a hung `git` would still hold the statusline open). A provider
+    that misses its deadline contributes its last persisted value and is reported as stale;
+    one that raises contributes None.
+
+    Returns:
+        (values by segment name, names of stale segments)
+    """
+    deadlines = {**SEGMENT_DEADLINES, **(deadlines or {})}
+    path = cache_file(cache_dir, "statusline-segments", session_id)
+    previous = read_json(path)
+    last = previous.get("values", {}) if isinstance(previous, dict) else {}
+
+    finished: Dict[str, Tuple[Any, float]] = {}
+    done = {name: threading.Event() for name in providers}
+    def run(name: str, provider: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        try: value = provider()
+        except Exception: value = None
+        finished[name] = (value, time.perf_counter() - start)
+        done[name].set()
+
+    started = time.monotonic()
+    for name, provider in providers.items():
+        threading.Thread(target=run, args=(name, provider), name=f"statusline-{name}", daemon=True).start()
+
+    values: Dict[str, Any] = {}
+    stale: Set[str] = set()
+    timings: Dict[str, Optional[float]] = {}
+    for name in providers:
+        remaining = started + deadlines.get(name, DEFAULT_SEGMENT_DEADLINE) - time.monotonic()
+        if done[name].wait(max(0.0, remaining)):
+            values[name], elapsed = finished[name]
+            timings[name] = round(elapsed * 1000, 1)
+        else:
+            values[name] = last.get(name)
+            stale.add(name)
+            timings[name] = None
+
+    write_json(path, {
+        "session_id": session_id,
+        "rendered": time.time(),
+        "values": {**last, **{name: value for name, value in values.items() if name not in stale}},
+        "timings": timings,
+        "deadlines": {name: deadlines.get(name, DEFAULT_SEGMENT_DEADLINE) for name in providers},
+        "stale": sorted(stale),
+    })
+    return values, stale
+
+def segment_timings(cache_dir: Path) -> List[Dict[str, Any]]:
+    """Timings recorded by the most recent render of each session, newest first."""
+    renders = []
+    for path in Path(cache_dir).glob("statusline-segments-*.json"):
+        data = read_json(path)
+        if not isinstance(data, dict): continue
+        renders.append({key: data.get(key) for key in ("session_id", "rendered", "timings", "deadlines", "stale")})
+    return sorted(renders, key=lambda r: r.get("rendered") or 0, reverse=True)
+##-##
+
+#-#
@@ -2,103 +2,42 @@
 
 # ===== IMPORTS ===== #
 
+## ===== DAEMON HANDOFF ===== ##
+# Hand the whole invocation to the hook daemon when one is running (see hook_daemon.py)
+from hook_daemon import relay_to_daemon
+relay_to_daemon(__file__)
+##-##
+
 ## ===== STDLIB ===== ##
 import json, sys, math, bisect, os
 from collections import deque
-from pathlib import Path
-from datetime import datetime, timezone
 ##-##
 
 ## ===== 3RD-PARTY ===== ##
 ##-##
 
 ## ===== LOCAL ===== ##
-from shared_state import edit_state, PROJECT_ROOT
+from shared_state import edit_state, PROJECT_ROOT, CACHE_DIR
+from transcripts import find_current_transcript, iter_entries, iter_json_array, iter_chunks, store_chunk, save_snapshot, link_snapshot, evict_snapshots
 ##-##
 
 #-#
 
 # ===== FUNCTIONS ===== #
 
-def find_current_transcript(transcript_path, session_id, stale_threshold=30):
-    """
-    Detect stale transcripts and find the current one by session ID.
-
-    Args:
-        transcript_path: Path to the transcript file we received
-        session_id: Current session ID to match
-        stale_threshold: Seconds threshold for considering transcript stale
-
-    Returns:
-        Path to the current transcript (may be same as input if not stale)
-    """
-    if not transcript_path or not os.path.exists(transcript_path):
-        return transcript_path
-
-    try:
-        # Read last line of transcript to get last message timestamp
-        with open(transcript_path, 'r', encoding='utf-8', errors='backslashreplace') as f:
-            lines = f.readlines()
-            if not lines:
-                return transcript_path
-
-            last_line = lines[-1].strip()
-            if not last_line:
-                return transcript_path
-
-            last_msg = json.loads(last_line)
-            last_timestamp = last_msg.get('timestamp')
-
-            if not last_timestamp:
-                return transcript_path
-
-            # Parse ISO timestamp and compare to current time
-            last_time = datetime.fromisoformat(last_timestamp.replace('Z', '+00:00'))
-            current_time = datetime.now(timezone.utc)
-            age_seconds = (current_time - last_time).total_seconds()
-
-            # If transcript is fresh, return it
-            if age_seconds <= stale_threshold:
-                return transcript_path
-
-            # Transcript is stale - search for current one
-            transcript_dir = Path(transcript_path).parent
-            all_transcripts = sorted(
-                transcript_dir.glob('*.jsonl'),
-                key=lambda p: p.stat().st_mtime,
-                reverse=True
-            )[:5]  # Top 5 most recent
-
-            # Check each transcript for matching session ID
-            for candidate in all_transcripts:
-                try:
-                    with open(candidate, 'r', encoding='utf-8', errors='backslashreplace') as cf:
-                        candidate_lines = cf.readlines()
-                        if not candidate_lines:
-                            continue
-
-                        # Check last line for session ID
-                        candidate_last = json.loads(candidate_lines[-1].strip())
-                        candidate_session_id = candidate_last.get('sessionId')
-
-                        if candidate_session_id == session_id:
-                            # Verify this transcript is fresh
-                            candidate_timestamp = candidate_last.get('timestamp')
-                            if candidate_timestamp:
-                                candidate_time = datetime.fromisoformat(candidate_timestamp.replace('Z', '+00:00'))
-                                candidate_age = (current_time - candidate_time).total_seconds()
-
-                                if candidate_age <= stale_threshold:
-                                    return str(candidate)
-                except:
-                    continue
-
-            # No fresh transcript found, return original
-            return transcript_path
+def iter_work_entries(entries):
+    """Skip pre-work entries (up to and including the first Edit/MultiEdit/Write call), then yield clean role/content entries."""
+    entries = iter(entries)
+    for entry in entries:
+        message = entry.get('message')
+        if not message: continue
+        content = message.get('content')
+        if isinstance(content, list) and any(block.get('type') == 'tool_use' and block.get('name') in ['Edit', 'MultiEdit', 'Write'] for block in content): break
 
-    except:
-        # Any error, return original path
-        return transcript_path
+    for entry in entries:
+        message = entry.get('message')
+        message_type = entry.get('type')
+        if message and message_type in ['user', 'assistant']: yield { 'role': message.get('role'), 'content': message.get('content') }
 
 #-#
 
@@ -135,11 +74,7 @@ if not transcript_path: sys.exit(0)
 
 # Detect and recover from stale transcript
 if transcript_path:
-    transcript_path = find_current_transcript(transcript_path, session_id)
-
-# Get the transcript into memory
-with open(transcript_path, 'r', encoding='utf-8', errors='backslashreplace') as f: transcript = [json.loads(line) for line in f]
-transcript = deque(transcript)
+    transcript_path = find_current_transcript(transcript_path, session_id, CACHE_DIR)
 #-#
 
 """
@@ -165,35 +100,32 @@ This module handles PreToolUse processing for the Task tool:
 with edit_state() as s: s.flags.subagent = True; STATE = s
 #!<
 
-#!> Trunc + clean transcript
-# Remove any pre-work transcript entries
-start_found = False
-while not start_found and transcript:
-    entry = transcript.popleft()
-    message = entry.get('message')
-    if message:
-        content = message.get('content')
-        if isinstance(content, list):
-            for block in content:
-                if block.get('type') == 'tool_use' and block.get('name') in ['Edit', 'MultiEdit', 'Write']: start_found = True
+#!> Stream, clean and chunk the transcript into the snapshot store
+# Entries are read, cleaned, serialized and cut one at a time (see transcripts.py);
+# the chunks match json.dumps(clean_transcript, indent=2, ensure_ascii=False) cut at MAX_BYTES.
+# Chunks are content-addressed, so only chunks that changed since the last snapshot are written.
+MAX_BYTES = 24000
+usable_context = 160000
+if STATE.model == "sonnet": usable_context = 800000
 
-# Clean the transcript
-clean_transcript = deque()
-for entry in transcript:
-    message = entry.get('message')
-    message_type = entry.get('type')
+TRANSCRIPTS_DIR = PROJECT_ROOT / 'sessions' / 'transcripts'
+STORE_DIR = TRANSCRIPTS_DIR / '.store'
 
-    if message and message_type in ['user', 'assistant']:
-        content = message.get('content')
-        role = message.get('role')
-        clean_entry = { 'role': role, 'content': content }
-        clean_transcript.append(clean_entry)
+last_entry = deque(maxlen=1)
+clean_transcript = (last_entry.append(entry) or entry for entry in iter_work_entries(iter_entries(transcript_path)))
+chunk_ids = []
+for chunk in iter_chunks(iter_json_array(clean_transcript), MAX_BYTES):
+    if not last_entry: break  # nothing after the first edit - only the empty "[]" was produced
+    assert len(chunk) <= MAX_BYTES, "Chunking failed to enforce byte limit"
+    chunk_ids.append(store_chunk(STORE_DIR, chunk))
+
+if not last_entry: print("[Subagent] No relevant transcript entries found, skipping snapshot."); sys.exit(0)
+snapshot_id = save_snapshot(STORE_DIR, chunk_ids)
 #!<
 
 #!> Prepare subagent dir for transcript files
 subagent_type = 'shared'
-if not clean_transcript: print("[Subagent] No relevant transcript entries found, skipping snapshot."); sys.exit(0)
-task_call = clean_transcript[-1]
+task_call = last_entry[0]
 content = task_call.get('content')
 if isinstance(content, list):
     for block in content:
@@ -202,62 +134,15 @@ if isinstance(content, list):
             subagent_type = task_input.get('subagent_type', subagent_type)
 
 # Clear the current transcript directory
-BATCH_DIR = PROJECT_ROOT / 'sessions' / 'transcripts' / subagent_type
+BATCH_DIR = TRANSCRIPTS_DIR / subagent_type
 BATCH_DIR.mkdir(parents=True, exist_ok=True)
 for item in BATCH_DIR.iterdir():
     if item.is_file(): item.unlink()
 #!<
 
-#!> Chunk and save transcript batches
-MAX_BYTES = 24000
-usable_context = 160000
-if STATE.model == "sonnet": usable_context = 800000
-clean_transcript_text = json.dumps(list(clean_transcript), indent=2, ensure_ascii=False)
-
-chunks = []
-buf_chars = []
-buf_bytes = 0
-last_newline_idx = None
-last_space_idx = None
-
-for ch in clean_transcript_text:
-    ch_b = len(ch.encode("utf-8"))
-
-    # If overflowing, flush a chunk
-    if buf_bytes + ch_b > MAX_BYTES:
-        cut_idx = None
-        if last_newline_idx is not None: cut_idx = last_newline_idx
-        elif last_space_idx is not None: cut_idx = last_space_idx
-        if cut_idx is not None and cut_idx > 0:
-            # Emit chunk up to the breakpoint
-            chunks.append("".join(buf_chars[:cut_idx]))
-            remainder = buf_chars[cut_idx:]
-            buf_chars = remainder
-            buf_bytes = sum(len(c.encode("utf-8")) for c in buf_chars)
-        else:
-            # No breakpoints, hard cut what we got
-            if buf_chars: chunks.append("".join(buf_chars))
-            buf_chars = []
-            buf_bytes = 0
-
-        last_newline_idx = None
-        last_space_idx = None
-
-    buf_chars.append(ch)
-    buf_bytes += ch_b
-
-    if ch == "\n": last_newline_idx = len(buf_chars); last_space_idx = None
-    elif ch == " " and last_newline_idx is None: last_space_idx = len(buf_chars)
-
-# Flush any remaining buffer
-if buf_chars: chunks.append("".join(buf_chars))
-
-assert all(len(c.encode("utf-8")) <= MAX_BYTES for c in chunks), "Chunking failed to enforce byte limit"
-
-for idx, chunk in enumerate(chunks, start=1):
-    part_name = f"current_transcript_{idx:03d}.txt"
-    part_path = BATCH_DIR / part_name
-    with part_path.open('w', encoding='utf-8', newline="\n") as f: f.write(chunk)
+#!> Link snapshot into the subagent dir and trim the store
+link_snapshot(STORE_DIR, snapshot_id, BATCH_DIR)
+evict_snapshots(STORE_DIR, keep={snapshot_id})
 #!<
 
 #-#
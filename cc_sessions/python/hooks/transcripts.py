@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+
+# ===== IMPORTS ===== #
+
+## ===== STDLIB ===== ##
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Union
+from datetime import datetime, timezone
+from pathlib import Path
+import hashlib, json, mmap, os, time
+##-##
+
+## ===== 3RD-PARTY ===== ##
+##-##
+
+## ===== LOCAL ===== ##
+try: from .sessions_cache import cache_file, read_json, write_json
+except ImportError: from sessions_cache import cache_file, read_json, write_json
+##-##
+
+#-#
+
+# ===== GLOBALS ===== #
+# Bytes hashed from the start of the transcript to detect rotation/rewrites
+HEAD_BYTES = 256
+# Remembered session_id -> transcript path entries
+SESSION_MAP_LIMIT = 64
+# Snapshot store size cap and the age below which a chunk is considered in use
+SNAPSHOT_STORE_MAX_BYTES = 64 * 1024 * 1024
+SNAPSHOT_GRACE_SECONDS = 300
+#-#
+
+"""
+╔══════════════════════════════════════════════════════════════════════════════════╗
+║ ██████╗█████╗  █████╗ ██╗  ██╗██████╗ █████╗█████╗ ██████╗██████╗ ██████╗██████╗ ║
+║ ╚═██╔═╝██╔═██╗██╔══██╗███╗ ██║██╔═══╝██╔═══╝██╔═██╗╚═██╔═╝██╔══██╗╚═██╔═╝██╔═══╝ ║
+║   ██║  █████╔╝███████║████╗██║██████╗██║    █████╔╝  ██║  ██████╔╝  ██║  ██████╗ ║
+║   ██║  ██╔═██╗██╔══██║██╔████║╚═══██║██║    ██╔═██╗  ██║  ██╔═══╝   ██║  ╚═══██║ ║
+║   ██║  ██║ ██║██║  ██║██║╚███║██████║╚█████╗██║ ██║██████╗██║       ██║  ██████║ ║
+║   ╚═╝  ╚═╝ ╚═╝╚═╝  ╚═╝╚═╝ ╚══╝╚═════╝ ╚════╝╚═╝ ╚═╝╚═════╝╚═╝       ╚═╝  ╚═════╝ ║
+╚══════════════════════════════════════════════════════════════════════════════════╝
+Transcript helpers shared by hooks and the statusline
+
+Usage tracking is incremental: a cursor per session (sessions/.cache) records
+the byte offset already consumed plus the most recent main-chain `usage`
+record, so each call only parses bytes appended since the last one. The
+cursor resets when the file shrinks, is replaced (inode change) or its first
+bytes no longer match.
+
+Stale transcript recovery reads only the last record of each candidate (seeking
+backwards from EOF through an mmap) and remembers which file belongs to which
+session so the next lookup usually needs no directory scan at all.
+
+Subagent snapshots are produced by a streaming pipeline (iter_entries ->
+iter_json_array -> iter_chunks) so memory stays bounded by the largest single
+entry rather than a multiple of the whole transcript. Chunks land in a
+content-addressed store (sessions/transcripts/.store): files are named by
+their sha256 and a snapshot is a manifest listing chunk ids. Consecutive
+snapshots of a growing transcript share every chunk but the tail, and
+identical snapshots for different subagent types are one manifest. The
+sessions/transcripts/<subagent_type>/ views agents read are hardlinks into the
+store. Retention is a size cap with least-recently-used eviction.
+"""
+
+# ===== FUNCTIONS ===== #
+
+## ===== USAGE TRACKING ===== ##
+def _head_digest(f, length: int) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(length)).hexdigest()
+
+def _scan(chunk: bytes, cursor: Dict[str, Any]) -> bool:
+    """Fold one JSONL line into the cursor. Returns False only if the line could not be decoded."""
+    if b'"usage"' not in chunk: return True
+    try: data = json.loads(chunk.decode("utf-8", errors="backslashreplace"))
+    except ValueError: return False
+    if not isinstance(data, dict) or data.get("isSidechain", False): return True  # skip subagent calls
+    message = data.get("message")
+    if not isinstance(message, dict) or not message.get("usage"): return True
+    timestamp = data.get("timestamp")
+    if timestamp and (not cursor["timestamp"] or timestamp > cursor["timestamp"]):
+        cursor["timestamp"] = timestamp
+        cursor["usage"] = message["usage"]
+    return True
+
+def latest_usage(transcript_path: Union[str, Path], cache_dir: Path, session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Most recent main-chain usage record in a transcript, parsing only new bytes.
+
+    Args:
+        transcript_path: Path to the session's JSONL transcript
+        cache_dir: Directory holding the per-session cursor files
+        session_id: Cursor key (falls back to the transcript path)
+
+    Returns:
+        The `message.usage` dict of the newest main-chain entry, or None
+    """
+    path = Path(transcript_path)
+    try: st = path.stat()
+    except OSError: return None
+
+    cursor_path = cache_file(cache_dir, "transcript", session_id or str(path))
+    cursor = read_json(cursor_path)
+    fresh = {"path": str(path), "inode": st.st_ino, "offset": 0, "mtime_ns": 0, "head": "", "head_len": 0, "timestamp": None, "usage": None}
+    if (not isinstance(cursor, dict) or cursor.keys() != fresh.keys() or cursor["path"] != str(path)
+            or cursor["inode"] != st.st_ino or cursor["offset"] > st.st_size):
+        cursor = fresh
+
+    # Nothing appended or rewritten since the last call
+    if cursor["offset"] == st.st_size and cursor["mtime_ns"] == st.st_mtime_ns: return cursor["usage"]
+
+    try:
+        with open(path, "rb") as f:
+            if cursor["offset"] and _head_digest(f, cursor["head_len"]) != cursor["head"]: cursor = fresh
+            f.seek(cursor["offset"])
+            new = f.read(st.st_size - cursor["offset"])
+            head_len = min(st.st_size, HEAD_BYTES)
+            head = _head_digest(f, head_len)
+    except OSError: return cursor["usage"]
+
+    # Only consume complete lines; a trailing partial line is retried next call
+    end = new.rfind(b"\n") + 1
+    for line in new[:end].split(b"\n"): _scan(line, cursor)
+    tail = new[end:]
+    if tail.strip() and b'"usage"' in tail and _scan(tail, cursor): end = len(new)
+
+    cursor.update(offset=cursor["offset"] + end, mtime_ns=st.st_mtime_ns if end == len(new) else 0, head=head, head_len=head_len)
+    write_json(cursor_path, cursor)
+    return cursor["usage"]
+
+def get_context_length(transcript_path: Union[str, Path], cache_dir: Path, session_id: Optional[str] = None) -> int:
+    """Current context length (input + cache tokens, NOT output) from the newest main-chain usage record."""
+    usage = latest_usage(transcript_path, cache_dir, session_id)
+    if not usage: return 0
+    return usage.get('input_tokens', 0) + usage.get('cache_read_input_tokens', 0) + usage.get('cache_creation_input_tokens', 0)
+##-##
+
+## ===== TRANSCRIPT LOCATOR ===== ##
+def last_record(transcript_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """Decode the last non-blank line of a JSONL file without reading the rest of it."""
+    try:
+        with open(transcript_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > 0:
+                start = mm.rfind(b"\n", 0, end - 1) + 1 if end > 1 else 0
+                line = mm[start:end].strip()
+                if line: return json.loads(line.decode("utf-8", errors="backslashreplace"))
+                end = start
+    except (OSError, ValueError): pass  # ValueError: empty file (mmap) or invalid JSON
+    return None
+
+def _age_seconds(record: Optional[Dict[str, Any]], now: datetime) -> Optional[float]:
+    timestamp = record.get('timestamp') if isinstance(record, dict) else None
+    if not timestamp: return None
+    try: return (now - datetime.fromisoformat(timestamp.replace('Z', '+00:00'))).total_seconds()
+    except (ValueError, TypeError): return None
+
+def _remember(cache_dir: Optional[Path], session_map: Dict[str, str], session_id: str, transcript_path: str) -> None:
+    if not cache_dir or not session_id or session_map.get(session_id) == transcript_path: return
+    session_map.pop(session_id, None)
+    session_map[session_id] = transcript_path
+    while len(session_map) > SESSION_MAP_LIMIT: session_map.pop(next(iter(session_map)))
+    write_json(Path(cache_dir) / "transcript-sessions.json", session_map)
+
+def find_current_transcript(transcript_path, session_id, cache_dir: Optional[Path] = None, stale_threshold=30):
+    """
+    Detect stale transcripts and find the current one by session ID.
+
+    Args:
+        transcript_path: Path to the transcript file we received
+        session_id: Current session ID to match
+        cache_dir: Where the session_id -> transcript map is persisted (None disables it)
+        stale_threshold: Seconds threshold for considering transcript stale
+
+    Returns:
+        Path to the current transcript (may be same as input if not stale)
+    """
+    if not transcript_path: return transcript_path
+    try:
+        now = datetime.now(timezone.utc)
+        age = _age_seconds(last_record(transcript_path), now)
+
+        # Unreadable/undated transcripts and fresh ones are used as-is
+        if age is None or age <= stale_threshold: return transcript_path
+
+        session_map = read_json(Path(cache_dir) / "transcript-sessions.json") if cache_dir else None
+        if not isinstance(session_map, dict): session_map = {}
+
+        # Previously resolved transcript for this session first, then the 5 most recently modified
+        def candidates():
+            known = session_map.get(session_id)
+            if known and known != str(transcript_path): yield Path(known)
+            transcript_dir = Path(transcript_path).parent
+            yield from sorted(transcript_dir.glob('*.jsonl'), key=lambda p: p.stat().st_mtime, reverse=True)[:5]
+
+        for candidate in candidates():
+            record = last_record(candidate)
+            if not isinstance(record, dict) or record.get('sessionId') != session_id: continue
+            candidate_age = _age_seconds(record, now)
+            if candidate_age is not None and candidate_age <= stale_threshold:
+                _remember(cache_dir, session_map, session_id, str(candidate))
+                return str(candidate)
+
+        # No fresh transcript found, return original
+        return transcript_path
+    except Exception: return transcript_path # Any error, return original path
+##-##
+
+## ===== SUBAGENT SNAPSHOTS ===== ##
+def iter_entries(transcript_path: Union[str, Path]) -> Iterator[Any]:
+    """Decode a JSONL transcript one line at a time."""
+    with open(transcript_path, 'r', encoding='utf-8', errors='backslashreplace') as f:
+        for line in f: yield json.loads(line)
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[str]:
+    """
+    Serialize items incrementally, yielding exactly the text of
+    json.dumps(list(items), indent=2, ensure_ascii=False) for a non-empty list.
+    """
+    first = True
+    for item in items:
+        yield ("[\n  " if first else ",\n  ") + json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        first = False
+    yield "[]" if first else "\n]"
+
+def iter_chunks(pieces: Iterable[str], max_bytes: int) -> Iterator[bytes]:
+    """
+    Split streamed text into UTF-8 chunks of at most max_bytes.
+
+    A chunk is cut at the last newline seen since the previous cut, or at the
+    last space if no newline has been seen, else hard-cut at the byte limit.
+    Characters are never split. Output is identical to feeding the whole text
+    one character at a time through the original subagent chunker.
+    """
+    buf = bytearray()
+    last_newline = last_space = None  # cut offsets into buf (None = no breakpoint since last cut)
+
+    def mark(start: int) -> None:
+        nonlocal last_newline, last_space
+        nl = buf.rfind(b"\n", start)
+        if nl != -1: last_newline = nl + 1; last_space = None
+        elif last_newline is None:
+            sp = buf.rfind(b" ", start)
+            if sp != -1: last_space = sp + 1
+
+    for piece in pieces:
+        data = memoryview(piece.encode("utf-8"))
+        pos = 0
+        while pos < len(data):
+            room = max_bytes - len(buf)
+            end = pos + max(room, 0)
+            if end >= len(data):
+                start = len(buf); buf += data[pos:]; mark(start)
+                break
+            # Back up to a character boundary (skip UTF-8 continuation bytes)
+            while end > pos and (data[end] & 0xC0) == 0x80: end -= 1
+            if end > pos:
+                start = len(buf); buf += data[pos:end]; mark(start)
+                pos = end
+
+            # The next character overflows: flush a chunk
+            cut = last_newline if last_newline is not None else last_space
+            if cut:
+                yield bytes(buf[:cut]); del buf[:cut]
+            else:
+                if buf: yield bytes(buf)
+                buf.clear()
+            last_newline = last_space = None
+
+            # The overflowing character always goes into the new buffer
+            char_end = pos + 1
+            while char_end < len(data) and (data[char_end] & 0xC0) == 0x80: char_end += 1
+            start = len(buf); buf += data[pos:char_end]; mark(start)
+            pos = char_end
+
+    if buf: yield bytes(buf)
+##-##
+
+## ===== SNAPSHOT STORE ===== ##
+def store_chunk(store_dir: Path, data: bytes) -> str:
+    """Add a chunk to the store (no write if already present). Returns its id."""
+    chunk_id = hashlib.sha256(data).hexdigest()
+    path = Path(store_dir) / "chunks" / f"{chunk_id}.txt"
+    try: os.utime(path); return chunk_id  # already stored - just mark as recently used
+    except FileNotFoundError: pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{chunk_id}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return chunk_id
+
+def save_snapshot(store_dir: Path, chunk_ids: List[str]) -> str:
+    """Record a manifest for an ordered list of chunk ids. Identical snapshots share one manifest."""
+    snapshot_id = hashlib.sha256("\n".join(chunk_ids).encode("ascii")).hexdigest()[:32]
+    manifest = Path(store_dir) / "snapshots" / f"{snapshot_id}.json"
+    try: os.utime(manifest)
+    except FileNotFoundError: write_json(manifest, {"chunks": chunk_ids})
+    return snapshot_id
+
+def link_snapshot(store_dir: Path, snapshot_id: str, view_dir: Path) -> int:
+    """Materialize a snapshot as current_transcript_NNN.txt files (hardlinks, copies as fallback)."""
+    manifest = read_json(Path(store_dir) / "snapshots" / f"{snapshot_id}.json")
+    if not isinstance(manifest, dict): raise FileNotFoundError(f"Unknown transcript snapshot: {snapshot_id}")
+    view_dir.mkdir(parents=True, exist_ok=True)
+    for idx, chunk_id in enumerate(manifest["chunks"], start=1):
+        source = Path(store_dir) / "chunks" / f"{chunk_id}.txt"
+        target = view_dir / f"current_transcript_{idx:03d}.txt"
+        try: os.link(source, target)
+        except OSError:
+            import shutil
+            shutil.copyfile(source, target)
+    return len(manifest["chunks"])
+
+def evict_snapshots(store_dir: Path, max_bytes: int = SNAPSHOT_STORE_MAX_BYTES, keep: Collection[str] = ()) -> int:
+    """
+    Drop least-recently-used snapshots until the store fits in max_bytes.
+
+    Chunks are deleted once no remaining manifest references them. Anything
+    touched within SNAPSHOT_GRACE_SECONDS is left alone so a concurrent
+    snapshot that is still being written never loses its chunks.
+
+    Returns:
+        Number of bytes freed
+    """
+    chunks_dir, snapshots_dir = Path(store_dir) / "chunks", Path(store_dir) / "snapshots"
+    try: chunk_stats = {e.name[:-4]: e.stat() for e in os.scandir(chunks_dir) if e.name.endswith(".txt")}
+    except FileNotFoundError: return 0
+    total = sum(st.st_size for st in chunk_stats.values())
+    if total <= max_bytes: return 0
+
+    recent = time.time() - SNAPSHOT_GRACE_SECONDS
+    snapshots = []
+    refcount: Dict[str, int] = {}
+    try: entries = list(os.scandir(snapshots_dir))
+    except FileNotFoundError: entries = []
+    for entry in entries:
+        if not entry.name.endswith(".json"): continue
+        manifest = read_json(Path(entry.path))
+        chunk_ids = manifest.get("chunks", []) if isinstance(manifest, dict) else []
+        snapshots.append((entry.stat().st_mtime, entry.name[:-5], Path(entry.path), chunk_ids))
+        for chunk_id in chunk_ids: refcount[chunk_id] = refcount.get(chunk_id, 0) + 1
+
+    freed = 0
+    def drop(chunk_id: str) -> None:
+        nonlocal total, freed
+        st = chunk_stats.get(chunk_id)
+        if st is None or st.st_mtime >= recent: return
+        try: (chunks_dir / f"{chunk_id}.txt").unlink()
+        except FileNotFoundError: pass
+        total -= st.st_size; freed += st.st_size
+
+    # Orphaned chunks first (interrupted snapshots), then whole snapshots oldest first
+    for chunk_id in [c for c in chunk_stats if c not in refcount]: drop(chunk_id)
+    for mtime, snapshot_id, path, chunk_ids in sorted(snapshots):
+        if total <= max_bytes: break
+        if snapshot_id in keep or mtime >= recent: continue
+        try: path.unlink()
+        except FileNotFoundError: pass
+        for chunk_id in chunk_ids:
+            refcount[chunk_id] -= 1
+            if not refcount[chunk_id]: drop(chunk_id)
+    return freed
+##-##
+
+#-#
@@ -1,9 +1,16 @@
 # ===== IMPORTS ===== #
 
+## ===== DAEMON HANDOFF ===== ##
+# Hand the whole invocation to the hook daemon when one is running (see hooks/hook_daemon.py)
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hooks'))
+from hook_daemon import relay_to_daemon
+relay_to_daemon(__file__)
+##-##
+
 ## ===== STDLIB ===== ##
-import json, sys, subprocess, os
+import json, sys, os
 from pathlib import Path
-from datetime import datetime, timezone
 ##-##
 
 ## ===== WINDOWS UTF-8 STDOUT FIX ===== ##
@@ -15,6 +22,19 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace', line_buffering=True)
 ##-##
 
+## ===== RENDER CACHE ===== ##
+# Reprint the previous render when none of its inputs changed (see hooks/statusline_cache.py)
+from statusline_cache import find_project_root, render_fingerprint, cached_render, save_render, run_segments
+data = json.load(sys.stdin)
+render_root = find_project_root()
+if render_root:
+    render_cache_dir = render_root / "sessions" / ".cache"
+    cached_output = cached_render(render_cache_dir, data.get("session_id", "unknown"), render_fingerprint(data, render_root))
+    if cached_output is not None:
+        sys.stdout.write(cached_output)
+        sys.exit(0)
+##-##
+
 ## ===== 3RD-PARTY ===== ##
 ##-##
 
@@ -23,100 +43,25 @@ if 'CLAUDE_PROJECT_DIR' in os.environ:
     PROJECT_ROOT = Path(os.environ['CLAUDE_PROJECT_DIR']).resolve()
     sys.path.insert(0, str(PROJECT_ROOT))
     # Use local symlinked sessions package when in development mode
-    from sessions.hooks.shared_state import edit_state, Model, Mode, find_git_repo, load_state, IconStyle
+    from sessions.hooks.shared_state import edit_state, update_state, Model, Mode, find_git_repo, peek_state, IconStyle, CACHE_DIR, load_task_index
+    from sessions.hooks.transcripts import get_context_length, find_current_transcript
+    from sessions.hooks.git_info import git_status
 else:
     # Use installed cc-sessions package in production
-    from cc_sessions.hooks.shared_state import edit_state, Model, Mode, find_git_repo, load_state, IconStyle
+    from cc_sessions.hooks.shared_state import edit_state, update_state, Model, Mode, find_git_repo, peek_state, IconStyle, CACHE_DIR, load_task_index
+    from cc_sessions.hooks.transcripts import get_context_length, find_current_transcript
+    from cc_sessions.hooks.git_info import git_status
 ##-##
 
 #-#
 
-# ===== FUNCTIONS ===== #
-
-def find_current_transcript(transcript_path, session_id, stale_threshold=30):
-    """
-    Detect stale transcripts and find the current one by session ID.
-
-    Args:
-        transcript_path: Path to the transcript file we received
-        session_id: Current session ID to match
-        stale_threshold: Seconds threshold for considering transcript stale
-
-    Returns:
-        Path to the current transcript (may be same as input if not stale)
-    """
-    if not transcript_path or not os.path.exists(transcript_path):
-        return transcript_path
-
-    try:
-        # Read last line of transcript to get last message timestamp
-        with open(transcript_path, 'r', encoding='utf-8', errors='backslashreplace') as f:
-            lines = f.readlines()
-            if not lines: return transcript_path
-
-            last_line = lines[-1].strip()
-            if not last_line: return transcript_path
-
-            last_msg = json.loads(last_line)
-            last_timestamp = last_msg.get('timestamp')
-
-            if not last_timestamp: return transcript_path
-
-            # Parse ISO timestamp and compare to current time
-            last_time = datetime.fromisoformat(last_timestamp.replace('Z', '+00:00'))
-            current_time = datetime.now(timezone.utc)
-            age_seconds = (current_time - last_time).total_seconds()
-
-            # If transcript is fresh, return it
-            if age_seconds <= stale_threshold: return transcript_path
-
-            # Transcript is stale - search for current one
-            transcript_dir = Path(transcript_path).parent
-            all_transcripts = sorted(
-                transcript_dir.glob('*.jsonl'),
-                key=lambda p: p.stat().st_mtime,
-                reverse=True
-            )[:5]  # Top 5 most recent
-
-            # Check each transcript for matching session ID
-            for candidate in all_transcripts:
-                try:
-                    with open(candidate, 'r', encoding='utf-8', errors='backslashreplace') as cf:
-                        candidate_lines = cf.readlines()
-                        if not candidate_lines: continue
-
-                        # Check last line for session ID
-                        candidate_last = json.loads(candidate_lines[-1].strip())
-                        candidate_session_id = candidate_last.get('sessionId')
-
-                        if candidate_session_id == session_id:
-                            # Verify this transcript is fresh
-                            candidate_timestamp = candidate_last.get('timestamp')
-                            if candidate_timestamp:
-                                candidate_time = datetime.fromisoformat(candidate_timestamp.replace('Z', '+00:00'))
-                                candidate_age = (current_time - candidate_time).total_seconds()
-
-                                if candidate_age <= stale_threshold: return str(candidate)
-                except: continue
-
-            # No fresh transcript found, return original
-            return transcript_path
-
-    except: return transcript_path # Any error, return original path
-
-#-#
-
 # ===== GLOBALS ===== #
 
 #!> Parse input + set constants
-# read json input from stdin
-data = json.load(sys.stdin)
-
+# json input was read from stdin by the render cache check above
 cwd = data.get("cwd", ".")
 model_name = data.get("model", {}).get("display_name", "unknown")
 session_id = data.get("session_id", "unknown")
-
-task_dir = PROJECT_ROOT / "sessions" / "tasks"
 #!<
 
 #!> Colors/styles - with Windows ANSI detection
@@ -190,17 +135,13 @@ elif "opus" in model_name.lower(): curr_model = Model.OPUS
 else: curr_model = Model.UNKNOWN
 #!<
 
-#!> Update model in shared state
-STATE = load_state()
-if not STATE or STATE.model != curr_model:
-    with edit_state() as s: s.model = curr_model; STATE = s
-
-# Load config for icon style preference
+#!> Load config for icon style preference
+# Never waits on the state lock: this runs before any segment deadline applies
 if 'CLAUDE_PROJECT_DIR' in os.environ:
-    from sessions.hooks.shared_state import load_config
+    from sessions.hooks.shared_state import peek_config
 else:
-    from cc_sessions.hooks.shared_state import load_config
-CONFIG = load_config()
+    from cc_sessions.hooks.shared_state import peek_config
+CONFIG = peek_config()
 icon_style = CONFIG.features.icon_style if CONFIG else IconStyle.NERD_FONTS
 #!<
 
@@ -226,43 +167,56 @@ Shows:
 
 # ===== EXECUTION ===== #
 
-## ===== PROGRESS BAR ===== ##
+## ===== SEGMENT PROVIDERS ===== ##
+# Slow segments run concurrently, each with its own deadline (SEGMENT_DEADLINES in hooks/statusline_cache.py).
+# Values must be JSON-serializable: a segment that misses its deadline reuses its last persisted value.
+
+#!> Shared state (also records the current model)
+def state_segment():
+    # Never waits on the state lock: a writer's last atomic replace is read as-is
+    state = peek_state()
+    if not state or state.model != curr_model:
+        # Low-priority write: if a hook holds the state lock it is deferred to the next lock holder instead of waited on
+        state = update_state(lambda s: setattr(s, 'model', curr_model), blocking=False)
+    return {"mode": state.mode.value, "task": state.current_task.name}
+#!<
 
 #!> Pull context length from transcript
-context_length = None
-transcript_path = data.get('transcript_path', None)
-
-# Detect and recover from stale transcript
-if transcript_path:
-    transcript_path = find_current_transcript(transcript_path, session_id)
-
-if transcript_path:
-    try:
-        with open(transcript_path, 'r', encoding='utf-8', errors='backslashreplace') as f: lines = f.readlines()
-        most_recent_usage = None
-        most_recent_timestamp = None
-
-        for line in lines:
-            try:
-                data = json.loads(line.strip())
-                # Skip sidechain entries (subagent calls)
-                if data.get('isSidechain', False): continue
-
-                # Check for usage data in main-chain messages
-                if data.get('message', {}).get('usage'):
-                    timestamp = data.get('timestamp')
-                    if timestamp and (not most_recent_timestamp or timestamp > most_recent_timestamp):
-                        most_recent_timestamp = timestamp
-                        most_recent_usage = data['message']['usage']
-            except: continue
-
-        # Calculate context length (input + cache tokens only, NOT output)
-        if most_recent_usage:
-            context_length = (most_recent_usage.get('input_tokens', 0) + most_recent_usage.get('cache_read_input_tokens', 0) + most_recent_usage.get('cache_creation_input_tokens', 0))
-    except Exception as e:
-        pass
+def context_segment():
+    transcript_path = data.get('transcript_path', None)
+
+    # Detect and recover from stale transcript
+    if transcript_path:
+        transcript_path = find_current_transcript(transcript_path, session_id, CACHE_DIR)
+
+    # Incremental: only bytes appended since the last render are parsed
+    if transcript_path: return get_context_length(transcript_path, CACHE_DIR, session_id) or None
+    return None
+#!<
+
+#!> Git status (branch, upstream and edited count all come from one call)
+def git_segment():
+    git_path = find_git_repo(Path(cwd))
+    return git_status(git_path, CACHE_DIR) if git_path else None
 #!<
 
+#!> Open tasks in sessions/tasks (files + dirs)
+def tasks_segment():
+    return sum(1 for task in load_task_index()["tasks"].values() if task["kind"] in ("file", "dir"))
+#!<
+
+segments, stale_segments = run_segments(
+    {"state": state_segment, "context": context_segment, "git": git_segment, "tasks": tasks_segment},
+    CACHE_DIR, session_id)
+
+def stale_mark(segment):
+    """Marker appended to a segment that missed its deadline and shows its last known value."""
+    return f"{gray}*{reset}" if segment in stale_segments else ""
+##-##
+
+## ===== PROGRESS BAR ===== ##
+context_length = segments["context"]
+
 #!> Use context_length and context_limit to calculate context percentage
 if context_length and context_length < 17000: context_length = 17000
 if context_length and context_limit:
@@ -303,116 +257,70 @@ else:  # ASCII
 progress_bar.append(f"{reset}{l_gray}{context_icon} ")
 progress_bar.append(bar_color + ("█" * filled_blocks))
 progress_bar.append(gray + ("░" * empty_blocks))
-progress_bar.append(reset + f" {l_gray}{progress_pct}% ({formatted_tokens}/{formatted_limit}){reset}")
+progress_bar.append(reset + f" {l_gray}{progress_pct}% ({formatted_tokens}/{formatted_limit}){reset}" + stale_mark("context"))
 
 progress_bar_str = "".join(progress_bar)
 #!<
 ##-##
 
-## ===== GIT REPOSITORY ===== ##
-# Find git repository path for use in multiple sections
-git_path = find_git_repo(Path(cwd))
-##-##
-
 ## ===== GIT BRANCH & UPSTREAM TRACKING ===== ##
+# One `git status --porcelain=v2 --branch` (cached until the index/HEAD/refs change) feeds this and the edited count
+git_info = segments["git"]
 git_branch_info = None
 upstream_info = None
-if git_path:
-    try:
-        # Get current branch
-        # Use absolute paths to avoid Windows path issues
-        cwd_abs = str(Path(cwd).resolve())
-        branch_cmd = ["git", "-C", cwd_abs, "branch", "--show-current"]
-        branch = subprocess.check_output(branch_cmd, stderr=subprocess.PIPE, encoding='utf-8', errors='replace').strip()
-
-        if branch:
+if git_info:
+    branch = git_info["branch"]
+
+    if branch:
+        if icon_style == IconStyle.NERD_FONTS:
+            branch_icon = "󰘬 "
+        elif icon_style == IconStyle.EMOJI:
+            branch_icon = "Branch: "
+        else:  # ASCII
+            branch_icon = "Branch: "
+        git_branch_info = f"{l_gray}{branch_icon}{branch}{reset}" + stale_mark("git")
+
+        # Upstream tracking status (ahead/behind are None without an upstream)
+        upstream_parts = []
+        if git_info["ahead"]:
+            upstream_parts.append(f"↑ {git_info['ahead']}")
+        if git_info["behind"]:
+            upstream_parts.append(f"↓ {git_info['behind']}")
+        if upstream_parts:
+            upstream_info = f"{orange}{''.join(upstream_parts)}{reset}"
+    else:
+        # Detached HEAD - show commit hash with detached indicator
+        commit = (git_info["oid"] or "")[:7]
+        if commit:
             if icon_style == IconStyle.NERD_FONTS:
-                branch_icon = "󰘬 "
-            elif icon_style == IconStyle.EMOJI:
-                branch_icon = "Branch: "
-            else:  # ASCII
-                branch_icon = "Branch: "
-            git_branch_info = f"{l_gray}{branch_icon}{branch}{reset}"
-
-            # Get upstream tracking status
-            try:
-                ahead_cmd = ["git", "-C", cwd_abs, "rev-list", "--count", "@{u}..HEAD"]
-                ahead = int(subprocess.check_output(ahead_cmd, stderr=subprocess.PIPE, encoding='utf-8', errors='replace').strip())
-
-                behind_cmd = ["git", "-C", cwd_abs, "rev-list", "--count", "HEAD..@{u}"]
-                behind = int(subprocess.check_output(behind_cmd, stderr=subprocess.PIPE, encoding='utf-8', errors='replace').strip())
-
-                upstream_parts = []
-                if ahead > 0:
-                    upstream_parts.append(f"↑ {ahead}")
-                if behind > 0:
-                    upstream_parts.append(f"↓ {behind}")
-                if upstream_parts:
-                    upstream_info = f"{orange}{''.join(upstream_parts)}{reset}"
-            except:
-                # No upstream or error getting upstream status
-                upstream_info = None
-        else:
-            # Detached HEAD - show commit hash with detached indicator
-            commit_cmd = ["git", "-C", cwd_abs, "rev-parse", "--short", "HEAD"]
-            commit = subprocess.check_output(commit_cmd, stderr=subprocess.PIPE, encoding='utf-8', errors='replace').strip()
-            if commit:
-                if icon_style == IconStyle.NERD_FONTS:
-                    # Broken link icon to indicate detached
-                    git_branch_info = f"{l_gray}󰌺 @{commit}{reset}"
-                else:  # EMOJI or ASCII
-                    git_branch_info = f"{l_gray}@{commit} [detached]{reset}"
-    except (subprocess.CalledProcessError, OSError, ValueError) as e:
-        # Git command failed - common on Windows if git not in PATH or repo issues
-        git_branch_info = None
+                # Broken link icon to indicate detached
+                git_branch_info = f"{l_gray}󰌺 @{commit}{reset}" + stale_mark("git")
+            else:  # EMOJI or ASCII
+                git_branch_info = f"{l_gray}@{commit} [detached]{reset}" + stale_mark("git")
 ##-##
 
 ## ===== CURRENT TASK ===== ##
-curr_task = STATE.current_task.name if STATE else None
+state_info = segments["state"] or {"mode": Mode.NO.value, "task": None}
+curr_task = state_info["task"]
 ##-##
 
 ## ===== CURRENT MODE ===== ##
-curr_mode = "Implement" if STATE.mode == Mode.GO else "Discuss"
+curr_mode = "Implement" if state_info["mode"] == Mode.GO else "Discuss"
 if icon_style == IconStyle.NERD_FONTS:
-    mode_icon = "󰷫 " if STATE.mode == Mode.GO else "󰭹 "
+    mode_icon = "󰷫 " if state_info["mode"] == Mode.GO else "󰭹 "
 elif icon_style == IconStyle.EMOJI:
-    mode_icon = "🛠️: " if STATE.mode == Mode.GO else "💬:"
+    mode_icon = "🛠️: " if state_info["mode"] == Mode.GO else "💬:"
 else:  # ASCII
     mode_icon = "Mode:"
 ##-##
 
 ## ===== COUNT EDITED & UNCOMMITTED ===== ##
-# Use subprocess to count edited and uncommitted files (unstaged or staged)
-total_edited = 0
-if git_path:
-    try:
-        # Use absolute paths for Windows compatibility
-        cwd_abs = str(Path(cwd).resolve())
-
-        # Count unstaged changes
-        unstaged_cmd = ["git", "-C", cwd_abs, "diff", "--name-only"]
-        unstaged_files = subprocess.check_output(unstaged_cmd, stderr=subprocess.PIPE, encoding='utf-8', errors='replace').strip().split('\n')
-        unstaged_count = len([f for f in unstaged_files if f])  # Filter out empty strings
-
-        # Count staged changes
-        staged_cmd = ["git", "-C", cwd_abs, "diff", "--cached", "--name-only"]
-        staged_files = subprocess.check_output(staged_cmd, stderr=subprocess.PIPE, encoding='utf-8', errors='replace').strip().split('\n')
-        staged_count = len([f for f in staged_files if f])  # Filter out empty strings
-
-        total_edited = unstaged_count + staged_count
-    except (subprocess.CalledProcessError, OSError, ValueError):
-        # Git command failed - set to 0 and continue
-        total_edited = 0
+# Edited and uncommitted files (unstaged or staged), from the same git status as above
+total_edited = git_info["unstaged"] + git_info["staged"] if git_info else 0
 ##-##
 
 ## ===== COUNT OPEN TASKS ===== ##
-open_task_count = 0
-open_task_dir_count = 0
-
-if task_dir.exists() and task_dir.is_dir():
-    for file in task_dir.iterdir():
-        if file.is_file() and file.name != "TEMPLATE.md" and file.suffix == ".md": open_task_count += 1
-        if file.is_dir() and file.name not in ("done", "indexes"): open_task_dir_count += 1
+open_task_count = segments["tasks"] or 0
 ##-##
 
 ## ===== FINAL OUTPUT ===== ##
@@ -424,8 +332,8 @@ elif icon_style == IconStyle.EMOJI:
     task_icon = "⚙️ "
 else:  # ASCII
     task_icon = "Task: "
-task_part = f"{cyan}{task_icon}{curr_task}{reset}" if curr_task else f"{cyan}{task_icon}{gray}No Task{reset}"
-print(f"{context_part} | {task_part}")
+task_part = (f"{cyan}{task_icon}{curr_task}{reset}" if curr_task else f"{cyan}{task_icon}{gray}No Task{reset}") + stale_mark("state")
+line1 = f"{context_part} | {task_part}"
 
 # Line 2 - Mode | Edited & Uncommitted with upstream | Open Tasks | Git branch
 if icon_style == IconStyle.NERD_FONTS:
@@ -435,19 +343,25 @@ elif icon_style == IconStyle.EMOJI:
 else:  # ASCII
     tasks_icon = ""
 # Build uncommitted section with optional upstream indicators
-uncommitted_parts = [f"{orange}✎ {total_edited}{reset}"]
+uncommitted_parts = [f"{orange}✎ {total_edited}{reset}{stale_mark('git')}"]
 if upstream_info:
     uncommitted_parts.append(upstream_info)
 uncommitted_str = " ".join(uncommitted_parts)
 
 line2_parts = [
-    f"{purple}{mode_icon} {curr_mode}{reset}",
+    f"{purple}{mode_icon} {curr_mode}{reset}{stale_mark('state')}",
     uncommitted_str,
-    f"{cyan}{tasks_icon} {open_task_count + open_task_dir_count} open{reset}"
+    f"{cyan}{tasks_icon} {open_task_count} open{reset}{stale_mark('tasks')}"
 ]
 if git_branch_info:
     line2_parts.append(git_branch_info)
-print(" | ".join(line2_parts))
+line2 = " | ".join(line2_parts)
+
+output = f"{line1}\n{line2}\n"
+sys.stdout.write(output)
+# Fingerprinted after rendering: the render itself may touch state, the task index and the git index.
+# Renders with stale segments are not reused - the next one should pick up the late values.
+if render_root and not stale_segments: save_render(render_cache_dir, session_id, render_fingerprint(data, render_root), output)
 ##-##
 
 #-#